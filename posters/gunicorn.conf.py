@@ -0,0 +1,70 @@
+"""
+Gunicorn configuration (loaded from the working directory: 'gunicorn posters.wsgi:application').
+
+The application is loaded once in the master ('preload_app') and warmed up before the workers are forked
+(see 'posters.warmup'), so every worker starts with compiled templates, the URL resolver, etc.,
+sharing those pages copy-on-write. Per worker RSS and the first request latency are logged.
+Workers write their Prometheus samples to 'PROMETHEUS_MULTIPROC_DIR', '/metrics' aggregates them.
+"""
+import os
+import time
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', '3'))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+# Recycle workers to cap memory growth, jitter spreads the restarts.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+# Set before the application (and 'prometheus_client') is loaded.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/posters_metrics')
+
+
+def on_starting(server):
+    """Master, before the workers start: drop the metrics samples of the previous run."""
+    from posters.metrics import clear_multiprocess_directory
+
+    clear_multiprocess_directory()
+
+
+def when_ready(server):
+    """Master, after the (preloaded) application is loaded and before the workers are forked."""
+    if not preload_app:
+        return
+    from posters.warmup import warmup, get_memory_usage, format_memory_usage
+
+    durations = warmup(freeze=True)
+    server.log.info("Warmup before fork: %s", ', '.join(f"{step}={ms:.1f} ms" for step, ms in durations.items()))
+    server.log.info("Master memory after warmup: %s", format_memory_usage(get_memory_usage()))
+
+
+def post_worker_init(worker):
+    """Worker, after the application is loaded. Without 'preload_app' each worker warms itself up."""
+    from posters.warmup import warmup, get_memory_usage, format_memory_usage
+
+    if not preload_app:
+        warmup(freeze=False)
+    worker.first_request_reported = False
+    worker.log.info("Worker (pid %s) booted: %s", worker.pid, format_memory_usage(get_memory_usage()))
+
+
+def pre_request(worker, req):
+    worker.request_started = time.perf_counter()
+
+
+def post_request(worker, req, environ, resp):
+    if getattr(worker, 'first_request_reported', True):
+        return
+    from posters.warmup import get_memory_usage, format_memory_usage
+
+    worker.first_request_reported = True
+    worker.log.info(
+        "Worker (pid %s) first request %s %s: %.1f ms, %s",
+        worker.pid, req.method, req.path, (time.perf_counter() - worker.request_started) * 1000,
+        format_memory_usage(get_memory_usage()))
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
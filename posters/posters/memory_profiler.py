@@ -0,0 +1,112 @@
+"""
+Opt-in ('MEMORY_PROFILER_ENABLED') allocation tracking of the requests and the Celery tasks with 'tracemalloc'.
+
+Every request (task) records its peak allocation above the memory traced when it started and
+the allocation sites of the memory it left allocated (the top 'MEMORY_PROFILER_TOP_SITES' lines).
+Per URL name (task name) high-water marks are exported as the 'posters_memory_peak_bytes' gauge
+(the max across the workers) and a new high-water mark is logged with its top allocation sites.
+
+'tracemalloc' slows down allocations several times, enable it on a canary worker, not the whole fleet.
+The peak is process wide: with threaded workers concurrent requests add up.
+"""
+import linecache
+import logging
+import tracemalloc
+
+from django.conf import settings
+
+from .metrics import record_memory_peak
+
+
+logger = logging.getLogger(__name__)
+
+# Allocations of the tracker itself are not the view's.
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+)
+
+# (kind, name) -> the highest peak (bytes) seen by this process.
+HIGH_WATER_MARKS = {}
+
+
+class AllocationTracker:
+    """
+    Peak and retained allocations of a block of code.
+    :Param top_sites: Number of the top allocation sites of the retained memory, 0 skips the snapshots [default=10].
+    :Param frames: Frames stored per allocation when tracing starts [default=1].
+    """
+
+    def __init__(self, top_sites: int = 10, frames: int = 1) -> None:
+        self.top_sites = top_sites
+        self.frames = frames
+        self.peak = 0
+        self.retained = 0
+        self.sites = []
+
+    def __enter__(self) -> 'AllocationTracker':
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS) if self.top_sites else None
+        tracemalloc.reset_peak()
+        self.started_with = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = peak - self.started_with
+        self.retained = current - self.started_with
+        if self.snapshot is not None:
+            statistics = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS).compare_to(self.snapshot, 'lineno')
+            self.sites = [
+                (str(statistic.traceback[0]), statistic.size_diff)
+                for statistic in statistics[:self.top_sites] if statistic.size_diff > 0
+            ]
+            self.snapshot = None
+
+
+def make_allocation_tracker() -> AllocationTracker | None:
+    """Tracker configured by the settings, None when the memory profiler is off."""
+    if not getattr(settings, 'MEMORY_PROFILER_ENABLED', False):
+        return None
+    return AllocationTracker(
+        top_sites=getattr(settings, 'MEMORY_PROFILER_TOP_SITES', 10),
+        frames=getattr(settings, 'MEMORY_PROFILER_FRAMES', 1))
+
+
+def record_allocations(kind: str, name: str, tracker: AllocationTracker) -> None:
+    """
+    Export and log (with the allocation sites) the peak when it's a new high-water mark of the name.
+    :Param kind: 'view' or 'task'.
+    :Param name: URL name or task name.
+    """
+    if tracker.peak <= HIGH_WATER_MARKS.get((kind, name), 0):
+        return
+    HIGH_WATER_MARKS[(kind, name)] = tracker.peak
+    record_memory_peak(kind, name, tracker.peak)
+    logger.info(
+        "New memory high-water mark of the %s %s: peak %.1f KiB, retained %.1f KiB. Top allocation sites:\n%s",
+        kind, name, tracker.peak / 1024, tracker.retained / 1024,
+        '\n'.join(f"  {site}: {size / 1024:.1f} KiB" for site, size in tracker.sites) or '  -')
+
+
+class MemoryProfilerMiddleware:
+    """
+    This class purpose is to track the allocations of every request per URL name
+    when 'MEMORY_PROFILER_ENABLED' is set (see the module docstring).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tracker = make_allocation_tracker()
+        if tracker is None:
+            return self.get_response(request)
+
+        with tracker:
+            response = self.get_response(request)
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        record_allocations('view', resolver_match.view_name if resolver_match else 'unresolved', tracker)
+        return response
@@ -0,0 +1,163 @@
+"""
+Prometheus metrics of the web workers and the Celery workers.
+
+With several processes (gunicorn workers, Celery prefork children) every process writes its samples
+to 'PROMETHEUS_MULTIPROC_DIR' and the scrape aggregates them ('MultiProcessCollector').
+The directory must be set (and emptied) before the processes start: see 'gunicorn.conf.py'
+and 'posters.celery'. Without it the metrics of the current process are exported.
+"""
+import ipaddress
+import os
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, Http404
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess)
+
+from .query_budget import record_queries
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TASK_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+
+#region: METRICS
+
+REQUEST_LATENCY = Histogram(
+    'posters_http_request_duration_seconds', "Request latency by URL name.",
+    ['view', 'method', 'status'], buckets=LATENCY_BUCKETS)
+DB_QUERIES = Counter(
+    'posters_db_queries_total', "ORM queries by URL name.", ['view'])
+DB_QUERY_TIME = Counter(
+    'posters_db_query_duration_seconds_total', "Time spent in the ORM queries by URL name.", ['view'])
+CACHE_REQUESTS = Counter(
+    'posters_cache_requests_total', "Lookups of 'get_from_cache_or_query' by cache key family.",
+    ['family', 'result'])
+IMAGE_BYTES_SERVED = Counter(
+    'posters_image_bytes_served_total', "Image bytes served by the image endpoints.", ['endpoint'])
+TASK_LATENCY = Histogram(
+    'posters_celery_task_duration_seconds', "Celery task run time.",
+    ['task', 'state'], buckets=TASK_LATENCY_BUCKETS)
+CLEANUP_ROWS = Counter(
+    'posters_cleanup_rows_total', "Rows deleted by the cleanup tasks.", ['task', 'table'])
+CLEANUP_BYTES = Counter(
+    'posters_cleanup_bytes_total', "Media bytes freed by the cleanup tasks.", ['task'])
+CLEANUP_RUNS = Counter(
+    'posters_cleanup_runs_total', "Runs of the cleanup tasks.", ['task'])
+# Set by 'posters.memory_profiler' (opt-in), 'max' keeps the high-water mark across the workers.
+MEMORY_PEAK = Gauge(
+    'posters_memory_peak_bytes', "Highest peak allocation of a request (task) by URL name (task name).",
+    ['kind', 'name'], multiprocess_mode='max')
+
+#endregion
+
+#region: RECORDERS
+
+def get_cache_key_family(cache_key: str | None) -> str:
+    """Cache key without its variable part ('image_by_id=<path>' -> 'image_by_id')."""
+    if not cache_key:
+        return 'none'
+    return cache_key.split('=', 1)[0].split(':', 1)[0]
+
+
+def record_cache_lookup(cache_key: str | None, hit: bool) -> None:
+    CACHE_REQUESTS.labels(get_cache_key_family(cache_key), 'hit' if hit else 'miss').inc()
+
+
+def record_image_bytes(endpoint: str, response) -> None:
+    """Count the body size of an image response (set by 'FileResponse' for in-memory files)."""
+    content_length = response.get('Content-Length')
+    if content_length:
+        IMAGE_BYTES_SERVED.labels(endpoint).inc(int(content_length))
+
+
+def record_task_latency(task_name: str, state: str, seconds: float) -> None:
+    TASK_LATENCY.labels(task_name, state).observe(seconds)
+
+
+def record_cleanup(task_name: str, rows: dict[str, int], freed_bytes: int) -> None:
+    """
+    Count a cleanup task run with the rows it deleted and the media bytes it freed.
+    :Param rows: Table (e.g. 'posters_lite') -> deleted rows.
+    """
+    CLEANUP_RUNS.labels(task_name).inc()
+    for table, count in rows.items():
+        CLEANUP_ROWS.labels(task_name, table).inc(count)
+    CLEANUP_BYTES.labels(task_name).inc(freed_bytes)
+
+
+def record_memory_peak(kind: str, name: str, peak: int) -> None:
+    """Set the process high-water mark, the multiprocess 'max' mode aggregates the processes."""
+    MEMORY_PEAK.labels(kind, name).set(peak)
+
+
+class MetricsMiddleware:
+    """
+    This class purpose is to record the latency, the ORM query count and the DB time of every request
+    by URL name. It's the outermost middleware, so the time of all the other middlewares is included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'POSTERS_METRICS_ENABLED', False):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        view_name = resolver_match.view_name if resolver_match else 'unresolved'
+        REQUEST_LATENCY.labels(view_name, request.method, str(response.status_code)).observe(duration)
+        DB_QUERIES.labels(view_name).inc(recorder.count)
+        DB_QUERY_TIME.labels(view_name).inc(recorder.db_time_ms / 1000)
+        return response
+
+#endregion
+
+#region: EXPORT
+
+def get_registry() -> CollectorRegistry:
+    """Registry aggregating all the processes in the multiprocess mode, the default one otherwise."""
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def clear_multiprocess_directory() -> None:
+    """Remove the samples of the previous run. Called by the master process before its children start."""
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for file_name in os.listdir(directory):
+        if file_name.endswith('.db'):
+            os.remove(os.path.join(directory, file_name))
+
+
+def is_metrics_client_allowed(remote_address: str | None) -> bool:
+    try:
+        address = ipaddress.ip_address(remote_address)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network)
+               for network in getattr(settings, 'POSTERS_METRICS_ALLOWED_NETWORKS', ('127.0.0.0/8',)))
+
+
+def metrics_view(request):
+    """
+    Internal scrape endpoint. Clients outside 'POSTERS_METRICS_ALLOWED_NETWORKS' get 404,
+    so the endpoint doesn't exist for the public.
+    """
+    if not getattr(settings, 'POSTERS_METRICS_ENABLED', False) or not is_metrics_client_allowed(
+            request.META.get('REMOTE_ADDR')):
+        raise Http404
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
+
+#endregion
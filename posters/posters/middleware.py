@@ -1,17 +1,55 @@
-class EnsureSessionKeyMiddleware:
+from django.conf import settings
+
+from .routers import use_primary, unpin_primary, is_sticky_primary_session, PRIMARY_PIN_TOKENS_ATTR
+from .query_budget import record_queries, check_query_budget
+
+
+class ReplicaRoutingMiddleware:
     """
-    This class purpose is to ensure that the session_key is create for all Anonymous users within all project applications.
-    If the 'request.session.session_key' == None, than this middleware is responsible for creating the 'session_key' for the request. 
+    This class purpose is to pin reads to the primary database when the read-your-writes consistency is required:
+    for unsafe requests (POST, PUT, etc.) and within the sticky window after the client's write
+    (see 'posters.routers.pin_primary'). Otherwise reads of the listing models go to the read replicas.
     """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
 
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        # Ensure a session key is present
-        if not request.session.session_key:
-            request.session.create()  # Create a new session if it doesn't exist
+        pinned = request.method not in self.SAFE_METHODS or is_sticky_primary_session(request)
+        pins = []
+        setattr(request, PRIMARY_PIN_TOKENS_ATTR, pins)
+        with use_primary(pinned):
+            try:
+                return self.get_response(request)
+            finally:
+                # Pins of the request ('pin_primary') don't outlive it.
+                for token in reversed(pins):
+                    unpin_primary(token)
+
+
+class QueryBudgetMiddleware:
+    """
+    This class purpose is to count ORM queries and the total DB time per view and to compare them to
+    the budget declared per URL name ('QUERY_BUDGETS' in 'posters_app.urls' and 'user_account_app.urls').
+    Repeated SQL shapes are reported as N+1 patterns. Violations are logged as warnings,
+    or raised when 'QUERY_BUDGET_RAISE' is set (tests).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', False):
+            return self.get_response(request)
+
+        with record_queries() as recorder:
+            response = self.get_response(request)
 
-        # Proceed with the request processing
-        response = self.get_response(request)
+        resolver_match = getattr(request, 'resolver_match', None)
+        check_query_budget(
+            resolver_match.view_name if resolver_match else None,
+            recorder,
+            raise_exception=getattr(settings, 'QUERY_BUDGET_RAISE', False)
+        )
         return response
@@ -0,0 +1,176 @@
+"""
+Sampling profiler of the requests.
+
+A sampler thread snapshots the stack of the request thread every 'PROFILER_INTERVAL_MS' milliseconds.
+Samples are attributed to ORM, cache, template rendering or Python code and written per URL name
+as collapsed stacks ('<PROFILER_OUTPUT_DIR>/<url name>.collapsed'), the input format of flamegraph.pl
+and speedscope. Repeated stacks of later requests are appended, the renderers sum them.
+
+Requests are profiled with the probability 'PROFILER_SAMPLE_RATE' or when they carry a valid
+'X-Profile' header ('manage.py make_profile_token'). Otherwise the middleware costs one dict lookup.
+"""
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_SUMMARY_HEADER = 'X-Profile-Summary'
+PROFILE_TOKEN_SALT = 'posters.profiler'
+PROFILE_TOKEN_VALUE = 'profile'
+
+# Category of a sample: the first category (in this order) with a frame in the stack.
+# Cache comes first, so unpickling a cached QuerySet is the cache cost, not the ORM cost.
+CATEGORY_MODULES = (
+    ('cache', ('django.core.cache', 'django_redis', 'redis')),
+    ('orm', ('django.db', 'psycopg2', 'psycopg')),
+    ('template', ('django.template',)),
+)
+PYTHON_CATEGORY = 'python'
+
+
+#region: TOKENS
+
+def make_profile_token() -> str:
+    """Value of the 'X-Profile' header, valid for 'PROFILER_TOKEN_MAX_AGE' seconds."""
+    return signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).sign(PROFILE_TOKEN_VALUE)
+
+
+def is_profile_token_valid(token: str) -> bool:
+    try:
+        return signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).unsign(
+            token, max_age=getattr(settings, 'PROFILER_TOKEN_MAX_AGE', 60 * 60)) == PROFILE_TOKEN_VALUE
+    except signing.BadSignature:
+        return False
+
+#endregion
+
+#region: SAMPLER
+
+def get_frame_name(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+def get_category(frame_names: list[str]) -> str:
+    modules = [frame_name.partition(':')[0] for frame_name in frame_names]
+    for category, prefixes in CATEGORY_MODULES:
+        if any(module.startswith(prefixes) for module in modules):
+            return category
+    return PYTHON_CATEGORY
+
+
+class StackSampler:
+    """
+    Samples the stack of a thread from a background thread.
+    Frames above (and including) the frame running 'root_code' are dropped, so stacks start at the profiled call.
+    Each stack is weighted by the wall time since the previous sample.
+    :Param thread_id: Id of the sampled thread.
+    :Param root_code: Code object of the profiled call.
+    :Param interval: Seconds between the samples.
+    """
+
+    def __init__(self, thread_id: int, root_code, interval: float) -> None:
+        self.thread_id = thread_id
+        self.root_code = root_code
+        self.interval = interval
+        # Collapsed stack -> wall time in microseconds.
+        self.stacks = Counter()
+        self.categories = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='posters-profiler', daemon=True)
+
+    def __enter__(self) -> 'StackSampler':
+        # The sampler needs the GIL to wake up: the default switch interval (5 ms) would cap the sampling rate.
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self.switch_interval, self.interval / 2))
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stopped.set()
+        self.thread.join()
+        sys.setswitchinterval(self.switch_interval)
+
+    def run(self) -> None:
+        previous = time.perf_counter()
+        while not self.stopped.wait(self.interval):
+            now = time.perf_counter()
+            self.sample(int((now - previous) * 1_000_000))
+            previous = now
+
+    def sample(self, weight_us: int) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        frame_names = []
+        while frame is not None and frame.f_code is not self.root_code:
+            frame_names.append(get_frame_name(frame))
+            frame = frame.f_back
+        if not frame_names:
+            return
+        frame_names.reverse()
+        self.stacks[';'.join(frame_names)] += weight_us
+        self.categories[get_category(frame_names)] += weight_us
+
+#endregion
+
+#region: MIDDLEWARE
+
+def write_collapsed_stacks(view_name: str, stacks: Counter) -> str:
+    """
+    Append the stacks to the collapsed stacks file of the URL name (in one write, workers append concurrently).
+    Returns the file path.
+    """
+    output_dir = getattr(settings, 'PROFILER_OUTPUT_DIR', os.path.join(settings.BASE_DIR, 'profiles'))
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{view_name.replace(':', '.')}.collapsed")
+    with open(path, 'a') as collapsed_file:
+        collapsed_file.write(''.join(f"{stack} {weight}\n" for stack, weight in stacks.items()))
+    return path
+
+
+def format_categories(categories: Counter) -> str:
+    return '; '.join(f"{category}={weight / 1000:.1f}ms" for category, weight in categories.most_common())
+
+
+class SamplingProfilerMiddleware:
+    """
+    This class purpose is to profile a fraction of the requests ('PROFILER_SAMPLE_RATE') and the requests
+    with a signed 'X-Profile' header, writing collapsed stacks per URL name (see the module docstring).
+    The time split by category is logged and returned in the 'X-Profile-Summary' header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request.META.get(PROFILE_HEADER)
+        sample_rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0.0)
+        if token is None and not (sample_rate and random.random() < sample_rate):
+            return self.get_response(request)
+        if token is not None and not is_profile_token_valid(token):
+            return self.get_response(request)
+        return self.profile(request)
+
+    def profile(self, request):
+        interval = getattr(settings, 'PROFILER_INTERVAL_MS', 1) / 1000
+        with StackSampler(threading.get_ident(), sys._getframe().f_code, interval) as sampler:
+            response = self.get_response(request)
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        view_name = resolver_match.view_name if resolver_match else 'unresolved'
+        if sampler.stacks:
+            path = write_collapsed_stacks(view_name, sampler.stacks)
+            summary = format_categories(sampler.categories)
+            logger.info("Profiled %s %s (%s): %s", request.method, request.path, path, summary)
+            response[PROFILE_SUMMARY_HEADER] = summary
+        return response
+
+#endregion
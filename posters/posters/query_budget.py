@@ -0,0 +1,185 @@
+import re
+import time
+import logging
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+#region: EXCEPTIONS
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, view_name: str, report: str, message: str = 'The view exceeded its query budget') -> None:
+        self.view_name = view_name
+        self.report = report
+        self.message = message
+        super().__init__(self.view_name, self.message)
+
+    def __str__(self) -> str:
+        return f"[Exception MSG]: {self.message}\n[View]: ({self.view_name})\n{self.report}"
+
+#endregion
+
+#region: BUDGETS
+
+class QueryBudget:
+    """
+    Query budget of a view. Declared per URL name in 'QUERY_BUDGETS' of an app 'urls' module.
+    E.g. QUERY_BUDGETS = {'home': QueryBudget(queries=3)}.
+    """
+
+    def __init__(self, queries: int, db_time_ms: float | None = None) -> None:
+        """
+        :Param queries: Max number of ORM queries per request.
+        :Param db_time_ms: Max total DB time per request in milliseconds [default=None (not checked)].
+        """
+        self.queries = queries
+        self.db_time_ms = db_time_ms
+
+    def __repr__(self) -> str:
+        return f"QueryBudget(queries={self.queries}, db_time_ms={self.db_time_ms})"
+
+
+def get_query_budget(view_name: str | None) -> QueryBudget | None:
+    """
+    Find the budget of a view by its full URL name (e.g. 'posters_app:home').
+    The namespace is mapped to the urls module via the 'QUERY_BUDGET_URLCONFS' setting.
+    :Param view_name: 'ResolverMatch.view_name' of a request.
+    """
+    if not view_name:
+        return None
+
+    namespace, _, url_name = view_name.rpartition(':')
+    urlconf = getattr(settings, 'QUERY_BUDGET_URLCONFS', {}).get(namespace)
+    if urlconf is None:
+        return None
+
+    return getattr(import_module(urlconf), 'QUERY_BUDGETS', {}).get(url_name)
+
+#endregion
+
+#region: BUSINESS LOGIC
+
+def fingerprint_sql(sql: str) -> str:
+    """
+    Normalize SQL to its shape: literals and parameters are replaced by '?',
+    IN lists are collapsed, whitespaces are squeezed. Repeated shapes point to N+1 patterns.
+    :Param sql: Raw SQL as it is passed to the DB cursor.
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'%s|\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(...)', sql)
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+class QueryRecorder:
+    """
+    DB 'execute_wrapper' counting queries and the DB time.
+    Raw SQL is stored as is, fingerprints are computed only when a report is requested.
+    Transaction control statements (savepoints of 'atomic' blocks) are not counted.
+    """
+    IGNORED_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+    def __init__(self) -> None:
+        self.queries: list[tuple[str, float]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.startswith(self.IGNORED_STATEMENTS):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def db_time_ms(self) -> float:
+        return sum(duration for sql, duration in self.queries) * 1000
+
+    def repeated_queries(self, threshold: int | None = None) -> dict[str, int]:
+        """
+        SQL shapes executed at least 'threshold' times (N+1 candidates).
+        :Param threshold: [default=settings.QUERY_BUDGET_N_PLUS_ONE_THRESHOLD].
+        """
+        if threshold is None:
+            threshold = getattr(settings, 'QUERY_BUDGET_N_PLUS_ONE_THRESHOLD', 5)
+        shapes = Counter(fingerprint_sql(sql) for sql, duration in self.queries)
+        return {shape: count for shape, count in shapes.most_common() if count >= threshold}
+
+    def get_violations(self, budget: QueryBudget | None) -> list[str]:
+        """List of budget violations and N+1 patterns (empty if the request is fine)."""
+        violations = []
+        if budget is not None:
+            if self.count > budget.queries:
+                violations.append(f"{self.count} queries (budget {budget.queries})")
+            if budget.db_time_ms is not None and self.db_time_ms > budget.db_time_ms:
+                violations.append(f"{self.db_time_ms:.1f} ms of DB time (budget {budget.db_time_ms} ms)")
+        for shape, count in self.repeated_queries().items():
+            violations.append(f"N+1: {count} x {shape}")
+        return violations
+
+
+@contextmanager
+def record_queries():
+    """Record queries of all DB connections (primary and replicas) within the block."""
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+def check_query_budget(view_name: str | None, recorder: QueryRecorder, raise_exception: bool = False) -> list[str]:
+    """
+    Compare recorded queries to the view budget. Log a warning or raise 'QueryBudgetExceeded'.
+    :Param view_name: Full URL name of the view (e.g. 'posters_app:home').
+    :Param recorder: QueryRecorder of the request.
+    :Param raise_exception: Raise instead of logging [default=False].
+    """
+    violations = recorder.get_violations(get_query_budget(view_name))
+    if violations:
+        report = '\n'.join(violations)
+        if raise_exception:
+            raise QueryBudgetExceeded(view_name, report)
+        logger.warning("Query budget exceeded by (%s):\n%s", view_name, report)
+    return violations
+
+#endregion
+
+#region: TESTS HELPERS
+
+class QueryBudgetTestMixin:
+    """
+    Mixin for Django TestCase. Requests a URL with the test client and fails if the view
+    exceeds its declared budget or runs repeated SQL shapes (N+1).
+    """
+
+    def assertWithinQueryBudget(self, url: str, method: str = 'get', **kwargs):
+        """
+        :Param url: URL to request.
+        :Param method: Test client method [default='get'].
+        :Param kwargs: Extra arguments for the test client method.
+        """
+        with record_queries() as recorder:
+            response = getattr(self.client, method)(url, **kwargs)
+
+        view_name = response.resolver_match.view_name if response.resolver_match else None
+        budget = get_query_budget(view_name)
+        self.assertIsNotNone(budget, msg=f"No query budget is declared for ({view_name})")
+        violations = recorder.get_violations(budget)
+        self.assertFalse(violations, msg=f"({view_name}) {url}\n" + '\n'.join(
+            violations + [sql for sql, duration in recorder.queries]))
+        return response
+
+#endregion
@@ -0,0 +1,108 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+
+from django.conf import settings
+
+
+PRIMARY_DB_ALIAS = 'default'
+# Session key storing the timestamp until which the client reads from the primary.
+PRIMARY_STICKY_SESSION_KEY = '_primary_sticky_until'
+# Request attribute with the tokens of the pins set by 'pin_primary' (reset by 'ReplicaRoutingMiddleware').
+PRIMARY_PIN_TOKENS_ATTR = '_primary_pin_tokens'
+
+_use_primary: ContextVar[bool] = ContextVar('use_primary', default=False)
+
+
+#region: BUSINESS LOGIC
+
+def is_primary_pinned() -> bool:
+    """Whether reads of the current request (or task) must go to the primary database."""
+    return _use_primary.get()
+
+
+@contextmanager
+def use_primary(pinned: bool = True):
+    """
+    Route all reads within the block to the primary database.
+    E.g. 'with use_primary(): Poster.objects.get(id=poster_id)'.
+    :Param pinned: Whether reads are pinned to the primary within the block [default=True].
+    """
+    token = _use_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def pin_primary(request, seconds: int | None = None) -> Token:
+    """
+    Keep read-your-writes consistency for the author of a write.
+    Reads of the current request and of the requests within the sticky window go to the primary,
+    so the author doesn't see stale data while the replicas catch up.
+    The pin of the current request is reset by 'ReplicaRoutingMiddleware', outside a request
+    (tasks, commands) reset the returned token with 'unpin_primary' or use 'use_primary' instead.
+    :Param request: HttpRequest with a session.
+    :Param seconds: Length of the sticky window [default=settings.REPLICA_STICKY_SECONDS].
+    """
+    if seconds is None:
+        seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 15)
+
+    token = _use_primary.set(True)
+    pins = getattr(request, PRIMARY_PIN_TOKENS_ATTR, None)
+    if pins is not None:
+        pins.append(token)
+    request.session[PRIMARY_STICKY_SESSION_KEY] = time.time() + seconds
+    return token
+
+
+def unpin_primary(token: Token) -> None:
+    """Reset the pin set by 'pin_primary' (restores the routing before the pin)."""
+    _use_primary.reset(token)
+
+
+def is_sticky_primary_session(request) -> bool:
+    """Whether the request is within the sticky primary window set by 'pin_primary'."""
+    session = getattr(request, 'session', None)
+    # Don't touch (load) the session of clients without a session cookie.
+    if session is None or settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return False
+    return session.get(PRIMARY_STICKY_SESSION_KEY, 0) > time.time()
+
+#endregion
+
+#region: ROUTERS
+
+class PrimaryReplicaRouter:
+    """
+    Send reads of the listing, search and detail models ('REPLICA_ROUTED_APPS') to one of the read replicas
+    ('DATABASE_REPLICAS'). Writes, migrations and reads of other apps (auth, sessions, celery, etc.)
+    always go to the primary. If no replicas are configured, the router is a no-op.
+    """
+
+    def get_replicas(self) -> list[str]:
+        return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+    def is_routed(self, model) -> bool:
+        return model._meta.app_label in getattr(settings, 'REPLICA_ROUTED_APPS', ('posters_app',))
+
+    def db_for_read(self, model, **hints) -> str | None:
+        replicas = self.get_replicas()
+        if not replicas or not self.is_routed(model) or is_primary_pinned():
+            return PRIMARY_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints) -> str:
+        return PRIMARY_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        databases = {PRIMARY_DB_ALIAS, *self.get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, model_name: str | None = None, **hints) -> bool:
+        return db == PRIMARY_DB_ALIAS
+
+#endregion
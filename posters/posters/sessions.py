@@ -0,0 +1,95 @@
+from django.contrib.sessions.backends.cache import SessionStore as CacheSessionStore
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+
+# Session data key marking sessions that have a slim 'django_session' record.
+DB_RECORD_SESSION_KEY = '_has_db_record'
+
+
+#region: BUSINESS LOGIC
+
+def ensure_session_key(request) -> str:
+    """
+    Return the session key of the request, creating the session only when a flow actually needs
+    the key (e.g. 'PosterLite.owner' or 'Poster.client' ownership).
+    Read-only traffic never calls it, so it stays session-free: no 'django_session' INSERT
+    and no session cookie, which keeps anonymous responses cacheable.
+    With the Redis session engine ('POSTERS_SESSION_MODE=redis') the slim DB record is created as well,
+    since the key is going to be referenced by a foreign key.
+    :Param request: HttpRequest with a session (SessionMiddleware).
+    """
+    if not request.session.session_key:
+        request.session.create()
+    if hasattr(request.session, 'ensure_db_record'):
+        request.session.ensure_db_record()
+    return request.session.session_key
+
+#endregion
+
+#region: SESSION ENGINE
+
+class SessionStore(CacheSessionStore):
+    """
+    Session engine keeping the session data in the 'SESSION_CACHE_ALIAS' cache (Redis).
+    A slim 'django_session' row (empty data, expiry date only) exists only for sessions owning rows
+    that reference 'session_key' ('PosterLite.owner', 'Poster.client'), so session churn of anonymous
+    visitors and logins never writes to the primary DB.
+    Expired rows are swept in batches by the 'clear_expired_sessions' Celery task.
+    Usage: SESSION_ENGINE = 'posters.sessions'.
+    """
+    cache_key_prefix = 'posters.sessions'
+
+    def has_db_record(self) -> bool:
+        return bool(self._session.get(DB_RECORD_SESSION_KEY))
+
+    def ensure_db_record(self) -> None:
+        """Create the slim 'django_session' record of the session (once per session)."""
+        if self.has_db_record():
+            return
+        Session.objects.update_or_create(
+            session_key=self._get_or_create_session_key(),
+            defaults={'session_data': '', 'expire_date': self.get_expiry_date()})
+        self[DB_RECORD_SESSION_KEY] = True
+
+    def save(self, must_create: bool = False) -> None:
+        super().save(must_create=must_create)
+        # Keep the DB record alive while the session is active, so the cleanup job doesn't detach its rows.
+        if not must_create and self.has_db_record():
+            Session.objects.filter(session_key=self.session_key).update(expire_date=self.get_expiry_date())
+
+    def cycle_key(self) -> None:
+        """Keep a DB record for the new key (login), the record of the old key expires as in 'delete'."""
+        had_db_record = bool(self._session.pop(DB_RECORD_SESSION_KEY, False))
+        # 'cycle_key' deletes the old key by name, 'delete' can't tell whether it had a record.
+        self._old_key_has_db_record = had_db_record
+        try:
+            super().cycle_key()
+        finally:
+            del self._old_key_has_db_record
+        if had_db_record:
+            self.ensure_db_record()
+
+    def delete(self, session_key: str | None = None) -> None:
+        """
+        Delete the session from the cache. The DB record (if any) is only marked as expired:
+        its dependents are detached by the batched cleanup job instead of the request (e.g. logout).
+        """
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+            has_db_record = self.has_db_record()
+        else:
+            # Unknown for a key passed by name (except the old key of 'cycle_key'), the UPDATE is harmless.
+            has_db_record = getattr(self, '_old_key_has_db_record', True)
+        super().delete(session_key)
+        if has_db_record:
+            Session.objects.filter(session_key=session_key).update(expire_date=timezone.now())
+
+    @classmethod
+    def clear_expired(cls) -> None:
+        """Cache entries expire by TTL, DB records are swept by the 'clear_expired_sessions' Celery task."""
+        pass
+
+#endregion
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 from dotenv import load_dotenv, dotenv_values
+from celery.schedules import crontab
 import os
 
 # Load virtual environment variables
@@ -65,22 +66,36 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = 'bootstrap4'
 CRISPY_TEMPLATE_PACK = "bootstrap4"
 
 MIDDLEWARE = [
+    # Custom. Request latency and ORM queries per URL name for '/metrics' (outermost, times everything).
+    'posters.metrics.MetricsMiddleware',
+    # Custom. Samples stacks of a fraction of requests (or signed 'X-Profile' ones) into flame graph files.
+    'posters.profiler.SamplingProfilerMiddleware',
+    # Custom. Opt-in tracemalloc peak allocations per URL name.
+    'posters.memory_profiler.MemoryProfilerMiddleware',
+    # Custom. Marks the queries with the URL name for the slow query log.
+    'posters.slow_queries.SlowQueryOriginMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Custom. Counts ORM queries per view, with the queries of the middlewares below it (sessions, auth, etc.).
+    # The middlewares above it don't query the DB.
+    'posters.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    # Custom. Pins reads to the primary DB for writes and right after them.
+    'posters.middleware.ReplicaRoutingMiddleware',
     'django.middleware.locale.LocaleMiddleware',  # Localization middleware
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    # Custom. Avail for all project apps.
-    'posters.middleware.EnsureSessionKeyMiddleware',
 ]
 
 # DEBUG-TOOLBAR
-if DEBUG:
+# Development only, can be switched off under DEBUG as well ('DEBUG_TOOLBAR=False').
+DEBUG_TOOLBAR = DEBUG and os.getenv('DEBUG_TOOLBAR', 'True') == 'True'
+if DEBUG_TOOLBAR:
     INSTALLED_APPS += ['debug_toolbar']
     MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
+if DEBUG:
     INTERNAL_IPS = ["127.0.0.1",]
     ALLOWED_HOSTS += ['127.0.0.1', '[::1]']
 
@@ -93,7 +108,6 @@ TEMPLATES = [
         'DIRS': [
             BASE_DIR / 'templates'
         ],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -101,6 +115,13 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compiled templates are kept in memory (also under DEBUG), restart the server to reload them.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -112,7 +133,15 @@ CACHES = {
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
         }
-    }
+    },
+    # Session data of the Redis session engine ('POSTERS_SESSION_MODE=redis').
+    "sessions": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": f'{os.getenv("REDIS_LOCATION")}/3',
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        }
+    },
 }
 
 
@@ -133,6 +162,27 @@ DATABASES = {
     }
 }
 
+# READ REPLICAS
+# Comma separated list of 'host:port' of the streaming replicas, e.g. "localhost:5433,localhost:5434".
+# Reads of 'REPLICA_ROUTED_APPS' models go to a random replica (see 'posters.routers').
+DATABASE_REPLICAS = []
+for replica_number, replica_address in enumerate(
+        filter(None, os.getenv('POSTGRES_REPLICA_HOSTS', '').split(',')), start=1):
+    replica_host, _, replica_port = replica_address.strip().partition(':')
+    DATABASES[f'replica_{replica_number}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        # Replicas are read-only copies of the primary, tests must not create separate databases for them.
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{replica_number}')
+
+DATABASE_ROUTERS = ['posters.routers.PrimaryReplicaRouter']
+REPLICA_ROUTED_APPS = ('posters_app',)
+# Seconds the author reads from the primary after 'create_poster'/'edit_poster'.
+REPLICA_STICKY_SECONDS = 15
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -199,10 +249,111 @@ if not DEBUG:
 # endregion
 
 
+# QUERY BUDGETS
+# Budgets are declared per URL name in 'QUERY_BUDGETS' of the apps urls modules (see 'posters.query_budget').
+QUERY_BUDGET_ENABLED = os.getenv('QUERY_BUDGET_ENABLED', str(DEBUG)) == 'True'
+QUERY_BUDGET_RAISE = False  # Raise 'QueryBudgetExceeded' instead of logging a warning.
+QUERY_BUDGET_N_PLUS_ONE_THRESHOLD = 5  # Same SQL shape executed N times per request.
+QUERY_BUDGET_URLCONFS = {
+    'posters_app': 'posters_app.urls',
+    'user_account_app': 'user_account_app.urls',
+}
+
+
+# METRICS
+# Prometheus scrape endpoint '/metrics' (see 'posters.metrics'). Only clients from the listed networks
+# get it, keep it out of the public nginx locations: nginx itself is inside the docker network.
+# Multiple processes (gunicorn workers, Celery children) need 'PROMETHEUS_MULTIPROC_DIR' in the environment.
+POSTERS_METRICS_ENABLED = os.getenv('POSTERS_METRICS_ENABLED', 'True') == 'True'
+POSTERS_METRICS_ALLOWED_NETWORKS = os.getenv('POSTERS_METRICS_ALLOWED_NETWORKS', '127.0.0.0/8,::1/128').split(',')
+# Port of the Celery worker metrics server, the worker doesn't export metrics without it.
+CELERY_METRICS_PORT = os.getenv('CELERY_METRICS_PORT')
+
+
+# SAMPLING PROFILER
+# Collapsed stacks per URL name in 'PROFILER_OUTPUT_DIR' (see 'posters.profiler'), render them with
+# flamegraph.pl or speedscope. Requests with 'X-Profile: <manage.py make_profile_token>' are always profiled.
+PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', '0'))
+PROFILER_INTERVAL_MS = 1
+PROFILER_TOKEN_MAX_AGE = 60 * 60
+PROFILER_OUTPUT_DIR = os.getenv('PROFILER_OUTPUT_DIR', os.path.join(BASE_DIR, 'profiles'))
+
+
+# MEMORY PROFILER
+# tracemalloc peak allocation and top allocation sites per URL name and Celery task (see 'posters.memory_profiler').
+# Slows the process down, enable it on a canary worker. High-water marks: 'posters_memory_peak_bytes' in '/metrics'.
+MEMORY_PROFILER_ENABLED = os.getenv('MEMORY_PROFILER_ENABLED', 'False') == 'True'
+MEMORY_PROFILER_TOP_SITES = 10
+MEMORY_PROFILER_FRAMES = 1
+
+
+# SLOW QUERY LOG
+# Queries over the threshold with their view/task, 'QueryFetchers' method and a sample of
+# 'EXPLAIN (ANALYZE, BUFFERS)' plans, kept in a cache ring buffer (see 'posters.slow_queries').
+# Shown in the admin: 'Slow queries'.
+SLOW_QUERY_LOG_ENABLED = os.getenv('SLOW_QUERY_LOG_ENABLED', 'True') == 'True'
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '200'))
+# Opt-in: 'EXPLAIN ANALYZE' runs the sampled slow SELECT a second time (e.g. '0.01' while investigating).
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv('SLOW_QUERY_EXPLAIN_RATE', '0'))
+SLOW_QUERY_LOG_SIZE = 200
+SLOW_QUERY_LOG_TIMEOUT = 60 * 60 * 24 * 7
+
+
+# PAGINATION SETTINGS
+# 'exact' - Django Paginator (runs COUNT(*) on every page view).
+# 'approximate' - totals from 'pg_class.reltuples' or cached per category counts (estimates,
+#                 so only "next/prev" links are rendered).
+# 'count_free' - no totals, fetches (page size + 1) rows to detect the next page.
+POSTERS_PAGINATION_MODE = os.getenv('POSTERS_PAGINATION_MODE', 'exact')
+
+
+# LISTINGS WINDOW
+# Listings, search and category counts show posters created in the last N days (0 - all posters).
+# The created date bound keeps the listing scans on the recent end of the 'created' indexes.
+# Off by default: older active posters would disappear from the listings. When on, set it to at least
+# 'POSTERS_ARCHIVE_AGE_DAYS': active posters between the window and the archive age are neither listed
+# nor archived. Restored posters are listed for the window from the restore date.
+POSTERS_LISTING_WINDOW_DAYS = int(os.getenv('POSTERS_LISTING_WINDOW_DAYS', '0'))
+
+
+# ANONYMOUS PAGE CACHE
+# Rendered listing pages (home, categories, category) of anonymous visitors, zlib compressed.
+# Invalidated by poster writes (see 'posters_app.business_logic.page_cache_logic').
+POSTERS_PAGE_CACHE_ENABLED = os.getenv('POSTERS_PAGE_CACHE_ENABLED', 'True') == 'True'
+POSTERS_PAGE_CACHE_TIMEOUT = 60 * 5
+# Rendered home page cards, keyed by the poster card version (see 'posters_app.business_logic.poster_cards_logic').
+POSTER_CARD_CACHE_TIMEOUT = 60 * 60
+
+
+# POSTER PAGES SNAPSHOTS
+# Static HTML of the poster pages (as anonymous visitors see them) published by Celery tasks
+# on create/edit and removed on delete (see 'posters_app.business_logic.snapshot_logic').
+# nginx serves them directly to visitors without a session cookie, e.g.:
+#   location ~ ^/(en|ru)/posters/poster/\d+$ {
+#       if ($cookie_sessionid) { proxy_pass http://django_gunicorn:8000; break; }
+#       try_files /snapshots$uri/index.html @django;
+#   }
+POSTER_SNAPSHOTS_ENABLED = os.getenv('POSTER_SNAPSHOTS_ENABLED', 'False') == 'True'
+POSTER_SNAPSHOTS_ROOT = os.getenv('POSTER_SNAPSHOTS_ROOT', os.path.join(BASE_DIR, 'snapshots'))
+
+
 # SESSION SETTINGS
+# 'db' - sessions live in Postgres 'django_session'.
+# 'redis' - session data lives in the 'sessions' cache, a slim 'django_session' row is kept only for
+#           sessions owning 'PosterLite'/'Poster.client' rows (see 'posters.sessions').
+POSTERS_SESSION_MODE = os.getenv('POSTERS_SESSION_MODE', 'db')
+if POSTERS_SESSION_MODE == 'redis':
+    SESSION_ENGINE = 'posters.sessions'
+    SESSION_CACHE_ALIAS = 'sessions'
 
 SESSION_EXPIRE_ON_BROWSER_CLOSE = False
 
+# Expired 'django_session' rows cleanup ('clear_expired_sessions' task).
+# 'set_null' - detach 'PosterLite' rows of expired sessions, 'delete' - delete them with their images.
+SESSIONS_CLEANUP_ORPHANS_POLICY = 'set_null'
+SESSIONS_CLEANUP_BATCH_SIZE = 1000
+SESSIONS_CLEANUP_MAX_BATCHES = 50
+
 
 # region: Django SECURITY FOR PRODUCTION
 
@@ -235,6 +386,44 @@ CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND')
 CELERY_RESULT_EXPIRES = 3600
 CELERY_CACHE_BACKEND = os.getenv('CELERY_CACHE_BACKEND')
+CELERY_BEAT_SCHEDULE = {
+    # Off-peak purge of soft deleted posters (every 15 minutes between 02:00 and 05:59 UTC).
+    'purge-deleted-posters': {
+        'task': 'purge_deleted_posters',
+        'schedule': crontab(minute='*/15', hour='2-5'),
+    },
+    # Off-peak cleanup of expired sessions (hourly between 02:00 and 05:59 UTC).
+    'clear-expired-sessions': {
+        'task': 'clear_expired_sessions',
+        'schedule': crontab(minute=40, hour='2-5'),
+    },
+    # Expired lite posters cleanup (every 15 minutes, batches skip the locked rows).
+    'delete-expired-posters-lite': {
+        'task': 'delete_expired_posters_lite',
+        'schedule': crontab(minute='*/15'),
+    },
+    # Off-peak archival of old and inactive posters (hourly between 02:00 and 05:59 UTC).
+    'archive-posters': {
+        'task': 'archive_posters',
+        'schedule': crontab(minute=20, hour='2-5'),
+    },
+}
+
+# SOFT DELETED POSTERS PURGE
+POSTERS_PURGE_DELAY_HOURS = 24  # Soft deleted posters are kept (restorable) for this period.
+POSTERS_PURGE_BATCH_SIZE = 200
+POSTERS_PURGE_MAX_BATCHES = 25
+
+# EXPIRED LITE POSTERS CLEANUP ('PosterLite.expires', see 'POSTERLITE_LIFETIME')
+POSTERS_LITE_CLEANUP_BATCH_SIZE = 200
+POSTERS_LITE_CLEANUP_MAX_BATCHES = 25
+
+# POSTERS ARCHIVE
+# Posters moved to the archive tables by the 'archive_posters' task (0 - the threshold is off).
+POSTERS_ARCHIVE_INACTIVE_DAYS = int(os.getenv('POSTERS_ARCHIVE_INACTIVE_DAYS', '90'))
+POSTERS_ARCHIVE_AGE_DAYS = int(os.getenv('POSTERS_ARCHIVE_AGE_DAYS', '730'))
+POSTERS_ARCHIVE_BATCH_SIZE = 500
+POSTERS_ARCHIVE_MAX_BATCHES = 20
 
 
 # MAIL SERVICE
@@ -0,0 +1,184 @@
+"""
+Slow query log of the production load (unlike 'debug_toolbar' it doesn't need 'DEBUG').
+
+An 'execute_wrapper' installed on every DB connection times the queries. Queries slower than
+'SLOW_QUERY_THRESHOLD_MS' are stored with the originating view (Celery task), the 'QueryFetchers'
+method that built them and the SQL fingerprint in a ring buffer in the cache. An opt-in sample of the
+slow SELECTs ('SLOW_QUERY_EXPLAIN_RATE') is re-run with 'EXPLAIN (ANALYZE, BUFFERS)'.
+The log is shown in the admin ('Slow queries').
+"""
+import functools
+import logging
+import random
+import sys
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models.query import QuerySet
+
+from .query_budget import fingerprint_sql
+
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_LOG_KEY_PREFIX = 'slow_query_log'
+SLOW_QUERY_LOG_INDEX_KEY = f'{SLOW_QUERY_LOG_KEY_PREFIX}:index'
+SLOW_QUERY_SQL_MAX_LENGTH = 4000
+
+# 'view:<url name>' or 'task:<task name>' of the running code.
+CURRENT_ORIGIN: ContextVar[str | None] = ContextVar('slow_query_origin', default=None)
+# 'QueryFetchers' method running (for the queries it executes eagerly).
+CURRENT_FETCHER: ContextVar[str | None] = ContextVar('slow_query_fetcher', default=None)
+# Set while the log runs its own statements (EXPLAIN, a DB cache backend), they are not logged.
+RECORDING: ContextVar[bool] = ContextVar('slow_query_recording', default=False)
+
+
+#region: ORIGINS
+
+def tag_fetcher(func):
+    """
+    Mark the queries of a 'QueryFetchers' method: lazy QuerySets carry the method name on their 'Query'
+    (copied by every clone, so '.filter()' and slicing keep it), eager queries run within 'CURRENT_FETCHER'.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = CURRENT_FETCHER.set(func.__qualname__)
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            CURRENT_FETCHER.reset(token)
+        if isinstance(result, QuerySet):
+            result.query.fetcher = func.__qualname__
+        return result
+    return wrapper
+
+
+def get_fetcher() -> str | None:
+    """Fetcher of the executing query: the tag of the compiled 'Query' or the running fetcher."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code.co_name == 'execute_sql':
+            query = getattr(frame.f_locals.get('self'), 'query', None)
+            if getattr(query, 'fetcher', None):
+                return query.fetcher
+            break
+        frame = frame.f_back
+    return CURRENT_FETCHER.get()
+
+
+class SlowQueryOriginMiddleware:
+    """
+    This class purpose is to mark the queries of a request with its URL name for the slow query log.
+    The URL is resolved before 'process_view', so the queries of the other middlewares' request phase
+    are logged without an origin.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        token = getattr(request, '_slow_query_origin_token', None)
+        if token is not None:
+            CURRENT_ORIGIN.reset(token)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._slow_query_origin_token = CURRENT_ORIGIN.set(f"view:{request.resolver_match.view_name}")
+
+#endregion
+
+#region: RING BUFFER
+
+def get_slot_key(slot: int) -> str:
+    return f'{SLOW_QUERY_LOG_KEY_PREFIX}:{slot}'
+
+
+def push_slow_query(entry: dict) -> None:
+    """Store the entry in the next slot: an atomic counter picks it, the oldest entry is overwritten."""
+    cache.add(SLOW_QUERY_LOG_INDEX_KEY, 0, timeout=None)
+    index = cache.incr(SLOW_QUERY_LOG_INDEX_KEY)
+    cache.set(get_slot_key(index % settings.SLOW_QUERY_LOG_SIZE), entry,
+              timeout=getattr(settings, 'SLOW_QUERY_LOG_TIMEOUT', 60 * 60 * 24 * 7))
+
+
+def get_slow_queries() -> list[dict]:
+    """Logged slow queries, the newest first."""
+    entries = cache.get_many([get_slot_key(slot) for slot in range(settings.SLOW_QUERY_LOG_SIZE)])
+    return sorted(entries.values(), key=lambda entry: entry['time'], reverse=True)
+
+
+def clear_slow_queries() -> None:
+    cache.delete_many([get_slot_key(slot) for slot in range(settings.SLOW_QUERY_LOG_SIZE)])
+
+#endregion
+
+#region: EXECUTE WRAPPER
+
+def explain_analyze(connection, sql: str, params) -> str:
+    """
+    'EXPLAIN (ANALYZE, BUFFERS)' of a SELECT (executes it again). Runs in a savepoint,
+    so a failure doesn't break the transaction of the request.
+    """
+    try:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {sql}', params)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+    except DatabaseError as error:
+        return f'EXPLAIN failed: {error}'
+
+
+def should_explain(connection, sql: str, many: bool) -> bool:
+    # Only SELECTs: ANALYZE would run INSERT/UPDATE/DELETE a second time.
+    return (connection.vendor == 'postgresql' and not many
+            and sql.lstrip()[:6].upper() == 'SELECT'
+            and random.random() < getattr(settings, 'SLOW_QUERY_EXPLAIN_RATE', 0.0))
+
+
+def slow_query_log(execute, sql, params, many, context):
+    """DB 'execute_wrapper' logging the queries over 'SLOW_QUERY_THRESHOLD_MS'."""
+    if RECORDING.get() or not getattr(settings, 'SLOW_QUERY_LOG_ENABLED', False):
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration_ms = (time.perf_counter() - start) * 1000
+    if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return result
+
+    connection = context['connection']
+    token = RECORDING.set(True)
+    try:
+        entry = {
+            'time': time.time(),
+            'duration_ms': round(duration_ms, 2),
+            'database': connection.alias,
+            'origin': CURRENT_ORIGIN.get(),
+            'fetcher': get_fetcher(),
+            'fingerprint': fingerprint_sql(sql)[:SLOW_QUERY_SQL_MAX_LENGTH],
+            'sql': sql[:SLOW_QUERY_SQL_MAX_LENGTH],
+            'explain': explain_analyze(connection, sql, params) if should_explain(connection, sql, many) else None,
+        }
+        logger.warning("Slow query (%.1f ms, %s, %s): %s",
+                       duration_ms, entry['origin'], entry['fetcher'], entry['fingerprint'][:500])
+        push_slow_query(entry)
+    except Exception:
+        # The log must never fail the query.
+        logger.exception("Slow query log failed.")
+    finally:
+        RECORDING.reset(token)
+    return result
+
+
+def install_slow_query_log(sender, connection, **kwargs) -> None:
+    """
+    'connection_created' receiver. The wrapper goes first: 'connection.execute_wrapper()' blocks
+    (e.g. 'record_queries') open at the connection time pop the last one.
+    """
+    if slow_query_log not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, slow_query_log)
+
+#endregion
@@ -18,11 +18,11 @@ from django.contrib import admin
 from django.conf.urls.static import static
 from django.urls import path, include, re_path
 from django.conf import settings
-import debug_toolbar
 # NOTE: Add in production!
 from django.conf.urls.static import static
 from django.views.static import serve
 from django.conf.urls.i18n import i18n_patterns
+from .metrics import metrics_view
 
 
 urlpatterns = [
@@ -33,6 +33,8 @@ urlpatterns = [
     # path('posters/', include(('posters_app.urls', 'posters_app'), namespace='posters_app')),
     # path('user_account/', include(('user_account_app.urls', 'user_account_app'), namespace='user_account_app')),
     path('i18n/', include('django.conf.urls.i18n')),
+    # Internal Prometheus scrape endpoint.
+    path('metrics', metrics_view, name='metrics'),
     # path('user_auth/', include("django.contrib.auth.urls")),
 ]
 
@@ -44,9 +46,12 @@ urlpatterns += i18n_patterns (
 
 # NOTE: Comment in Production!
 if settings.DEBUG:
-    urlpatterns += [path('__debug__/', include(debug_toolbar.urls))]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
+# Imported only when enabled, so production workers never load the toolbar.
+if 'debug_toolbar' in settings.INSTALLED_APPS:
+    urlpatterns += [path('__debug__/', include('debug_toolbar.urls'))]
+
 if 'rosetta' in settings.INSTALLED_APPS:
     urlpatterns += [
         re_path(r'^rosetta/', include('rosetta.urls'))
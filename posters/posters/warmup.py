@@ -0,0 +1,136 @@
+import gc
+import logging
+import time
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Templates of the hot pages, compiled once by the cached template loader.
+WARMUP_TEMPLATES = (
+    'posters_base.html',
+    'posters_app/index.html',
+    'posters_app/poster_card.html',
+    'posters_app/pagination.html',
+    'posters_app/categories.html',
+    'posters_app/category.html',
+    'posters_app/poster.html',
+)
+
+
+#region: MEMORY
+
+def get_memory_usage() -> dict[str, int]:
+    """
+    Memory of the current process in KiB ('/proc/self/smaps_rollup', Linux).
+    'shared' is the memory still shared copy-on-write with the other workers, 'private' is the memory
+    the process has written to (or allocated) after the fork.
+    Empty dict if the platform doesn't provide the stats.
+    """
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared', 'Shared_Dirty': 'shared',
+              'Private_Clean': 'private', 'Private_Dirty': 'private'}
+    usage = {}
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            for line in smaps:
+                name, _, value = line.partition(':')
+                if name in fields:
+                    usage[fields[name]] = usage.get(fields[name], 0) + int(value.split()[0])
+    except OSError:
+        return {}
+    return usage
+
+
+def format_memory_usage(usage: dict[str, int]) -> str:
+    if not usage:
+        return 'memory stats are not available'
+    return ', '.join(f"{name}={value / 1024:.1f} MiB" for name, value in usage.items())
+
+#endregion
+
+#region: WARMUP
+
+def warmup_templates() -> None:
+    from django.template.loader import get_template
+
+    for template_name in WARMUP_TEMPLATES:
+        get_template(template_name)
+
+
+def warmup_urls() -> None:
+    from django.urls import get_resolver, reverse
+    from django.utils import translation
+
+    get_resolver().url_patterns
+    # Builds the reverse dictionaries of every language.
+    for language, _ in settings.LANGUAGES:
+        with translation.override(language):
+            reverse('posters_app:home')
+
+
+def warmup_phone_numbers() -> None:
+    from posters_app.business_logic.phone_number_logic import standardize_phone_number
+
+    # Loads the 'phonenumbers' metadata of the default region.
+    standardize_phone_number('+79265847523')
+
+
+def warmup_default_image() -> None:
+    from posters_app.business_logic.process_images_logic import get_default_image_data
+
+    try:
+        get_default_image_data()
+    except OSError:
+        logger.warning("Default image is missing, it's not preloaded.")
+
+
+def warmup_categories() -> None:
+    from posters_app.business_logic.view_logic import FrequentQueries
+
+    # Fills the shared (Redis) cache, so the first requests of new workers don't query the DB.
+    list(FrequentQueries.get_poster_categories_w_count())
+
+
+WARMUP_STEPS = (
+    warmup_templates,
+    warmup_urls,
+    warmup_phone_numbers,
+    warmup_default_image,
+    warmup_categories,
+)
+
+
+def warmup(freeze: bool = True) -> dict[str, float]:
+    """
+    Load the structures every request needs (templates, URL resolver, 'phonenumbers' metadata,
+    the default image, the categories list). Failed steps are logged and skipped.
+    Run it in the gunicorn master with 'preload_app' (see 'gunicorn.conf.py'): DB and cache connections
+    are closed afterwards, so forked workers never share sockets, and 'gc.freeze()' moves
+    the loaded objects to the permanent generation, so the GC of the workers doesn't touch
+    (and un-share) their pages.
+    Returns the duration of each step in milliseconds.
+    :Param freeze: Call 'gc.freeze()' after the warmup [default=True].
+    """
+    from django.core.cache import close_caches
+    from django.db import connections
+
+    durations = {}
+    for step in WARMUP_STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warmup step (%s) failed.", step.__name__)
+        durations[step.__name__] = (time.perf_counter() - start) * 1000
+
+    connections.close_all()
+    close_caches()
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+
+    return durations
+
+#endregion
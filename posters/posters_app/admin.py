@@ -1,9 +1,97 @@
+from datetime import datetime, timezone
+
+from django.conf import settings
 from django.contrib import admin
-from .models import Poster, PosterCategories, PosterImages, PosterLite, PosterLiteImages
+from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
+
+from posters.slow_queries import get_slow_queries, clear_slow_queries
+from .business_logic.archive_logic import restore_poster
+from .business_logic.phone_number_logic import standardize_phone_numbers
+from .models import (
+    Poster, PosterCategories, PosterImages, PosterLite, PosterLiteImages, ArchivedPoster, SlowQuery)
+from .tasks import publish_poster_snapshot
+
+
+@admin.action(description="Standardize phone numbers")
+def standardize_selected_phone_numbers(modeladmin, request, queryset) -> None:
+    """Standardize the phone numbers of the selected posters in one batch call and bulk UPDATEs."""
+    objects = list(queryset.only('id', 'phone_number'))
+    phone_numbers = standardize_phone_numbers([obj.phone_number for obj in objects])
+    changed, invalid = [], 0
+    for obj, phone_number in zip(objects, phone_numbers):
+        if phone_number is None:
+            invalid += 1
+        elif phone_number != obj.phone_number:
+            obj.phone_number = phone_number
+            changed.append(obj)
+    queryset.model.objects.bulk_update(changed, ['phone_number'], batch_size=1000)
+    modeladmin.message_user(request, f"Standardized {len(changed)} phone number(s), {invalid} invalid.")
+
 
 # Register your models here.
-admin.site.register(Poster)
+admin.site.register(Poster, actions=[standardize_selected_phone_numbers])
 admin.site.register(PosterCategories)
 admin.site.register(PosterImages)
-admin.site.register(PosterLite)
-admin.site.register(PosterLiteImages)
\ No newline at end of file
+admin.site.register(PosterLite, actions=[standardize_selected_phone_numbers])
+admin.site.register(PosterLiteImages)
+
+
+@admin.register(ArchivedPoster)
+class ArchivedPosterAdmin(admin.ModelAdmin):
+    """Archived posters (see 'posters_app.business_logic.archive_logic'), restored by the 'Restore' action."""
+    list_display = ('id', 'header', 'owner', 'status', 'created', 'archived')
+    list_select_related = ('owner',)
+    search_fields = ('=id', 'header')
+    actions = ('restore_posters',)
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+    @admin.action(description="Restore selected posters", permissions=('delete',))
+    def restore_posters(self, request, queryset) -> None:
+        poster_ids = list(queryset.values_list('id', flat=True))
+        for poster_id in poster_ids:
+            restore_poster(poster_id)
+            if settings.POSTER_SNAPSHOTS_ENABLED:
+                publish_poster_snapshot.delay(poster_id)
+        self.message_user(request, f"Restored {len(poster_ids)} poster(s).")
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    """Read-only page of the slow query log ring buffer (see 'posters.slow_queries')."""
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+    def has_delete_permission(self, request, obj=None) -> bool:
+        return request.user.is_superuser
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method == 'POST' and 'clear' in request.POST and self.has_delete_permission(request):
+            clear_slow_queries()
+            self.message_user(request, "The slow query log is cleared.")
+            return HttpResponseRedirect(request.path)
+
+        slow_queries = [
+            {**entry, 'logged_at': datetime.fromtimestamp(entry['time'], tz=timezone.utc)}
+            for entry in get_slow_queries()
+        ]
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Slow queries',
+            'opts': self.model._meta,
+            'slow_queries': slow_queries,
+            'threshold_ms': settings.SLOW_QUERY_THRESHOLD_MS,
+            'log_size': settings.SLOW_QUERY_LOG_SIZE,
+            'can_clear': self.has_delete_permission(request),
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, 'admin/posters_app/slow_queries.html', context)
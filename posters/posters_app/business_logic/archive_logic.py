@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..constants import RECOMMENDED_POSTERS_CACHE_KEY, CATEGORIES_CACHE_KEY
+from ..models import Poster, PosterImages, ArchivedPoster, ArchivedPosterImages
+from .page_cache_logic import invalidate_page_cache
+from .bulk_delete_logic import delete_rows
+from .snapshot_logic import remove_poster_snapshot
+
+
+def invalidate_listing_caches() -> None:
+    """Drop the cached recommendations, category counts and anonymous pages listing the moved posters."""
+    cache.delete_many([RECOMMENDED_POSTERS_CACHE_KEY, CATEGORIES_CACHE_KEY])
+    invalidate_page_cache()
+
+
+def get_archive_filter(now: datetime | None = None) -> Q:
+    """
+    Posters due for the archive: inactive for 'POSTERS_ARCHIVE_INACTIVE_DAYS' or older than
+    'POSTERS_ARCHIVE_AGE_DAYS' (0 - the threshold is off). Posters restored from the archive
+    are counted from the restore, so they are not archived again by the next run.
+    :Param now: Current timestamp [default=timezone.now()].
+    """
+    if now is None:
+        now = timezone.now()
+
+    due = Q(pk__in=[])
+    for days, condition in (
+            (getattr(settings, 'POSTERS_ARCHIVE_INACTIVE_DAYS', 0), Q(status=False)),
+            (getattr(settings, 'POSTERS_ARCHIVE_AGE_DAYS', 0), Q())):
+        if days:
+            bound = now - timedelta(days=days)
+            due |= condition & Q(created__lt=bound) & (Q(restored__isnull=True) | Q(restored__lt=bound))
+    return due
+
+
+def copy_rows(source: type[models.Model], target: type[models.Model], column: str, ids: list[int]) -> int:
+    """
+    Copy rows between a table and its archive table with one 'INSERT ... SELECT' (rows don't pass through Python).
+    Columns missing in the target are left to their defaults. Returns the number of copied rows.
+    :Param source: Model of the copied rows.
+    :Param target: Model of the table the rows are copied to.
+    :Param column: Column the rows are selected by.
+    :Param ids: Values of the column.
+    """
+    source_columns = {field.column for field in source._meta.concrete_fields}
+    columns = ', '.join(connection.ops.quote_name(field.column)
+                        for field in target._meta.concrete_fields if field.column in source_columns)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {connection.ops.quote_name(target._meta.db_table)} ({columns}) "
+            f"SELECT {columns} FROM {connection.ops.quote_name(source._meta.db_table)} "
+            f"WHERE {connection.ops.quote_name(column)} = ANY(%s)",
+            [ids]
+        )
+        return cursor.rowcount
+
+
+def archive_posters_batch(batch_size: int, now: datetime | None = None) -> dict[str, int]:
+    """
+    Move one batch of posters due for the archive ('get_archive_filter') with their image rows
+    to the archive tables. Soft deleted posters are left to the purge.
+    Rows are locked with 'SKIP LOCKED', so concurrent runs never wait for each other.
+    :Param batch_size: Max number of posters in the batch.
+    :Param now: Current timestamp [default=timezone.now()].
+    """
+    with transaction.atomic():
+        poster_ids = list(
+            Poster.alive.filter(get_archive_filter(now))
+            .select_for_update(skip_locked=True)
+            .order_by('created')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not poster_ids:
+            return {'posters': 0, 'images': 0}
+
+        copy_rows(Poster, ArchivedPoster, Poster._meta.pk.column, poster_ids)
+        images = copy_rows(PosterImages, ArchivedPosterImages, PosterImages.poster_id.field.column, poster_ids)
+        delete_rows(PosterImages, PosterImages.poster_id.field.column, poster_ids)
+        delete_rows(Poster, Poster._meta.pk.column, poster_ids)
+        transaction.on_commit(invalidate_listing_caches)
+
+        if settings.POSTER_SNAPSHOTS_ENABLED:
+            transaction.on_commit(lambda: [remove_poster_snapshot(poster_id) for poster_id in poster_ids])
+
+    return {'posters': len(poster_ids), 'images': images}
+
+
+def restore_poster(poster_id: int) -> Poster:
+    """
+    Move an archived poster with its image rows back to the 'Poster' table (the same id).
+    The poster is marked 'restored', so the archive job counts its thresholds from now.
+    Raises 'ArchivedPoster.DoesNotExist' if the poster is not archived.
+    :Param poster_id: Id of the archived poster.
+    """
+    with transaction.atomic():
+        archived_poster = ArchivedPoster.objects.select_for_update().get(id=poster_id)
+        copy_rows(ArchivedPoster, Poster, ArchivedPoster._meta.pk.column, [poster_id])
+        copy_rows(ArchivedPosterImages, PosterImages, ArchivedPosterImages.poster_id.field.column, [poster_id])
+        archived_poster.delete()
+        Poster.objects.filter(id=poster_id).update(restored=timezone.now())
+        transaction.on_commit(invalidate_listing_caches)
+
+    return Poster.objects.get(id=poster_id)
@@ -0,0 +1,179 @@
+import json
+import os
+import timeit
+from dataclasses import dataclass
+from typing import Callable
+
+from django.conf import settings
+
+
+# Baselines are committed with the code: re-record them ('run_benchmarks --update-baselines')
+# when a change makes a function intentionally slower (or faster).
+BENCHMARK_BASELINES_PATH = os.path.join(settings.BASE_DIR, 'posters_app', 'benchmark_baselines.json')
+# A benchmark fails when its normalized time is this many times its baseline.
+BENCHMARK_REGRESSION_THRESHOLD = 1.3
+BENCHMARK_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmarks'}}
+
+
+#region: BENCHMARKS
+
+@dataclass(frozen=True)
+class Benchmark:
+    """
+    A micro-benchmark of a hot function.
+    :Param name: Unique name, the key of the baseline.
+    :Param setup: Builds the inputs once, returns the zero argument callable that is timed.
+    """
+    name: str
+    setup: Callable[[], Callable[[], object]]
+
+
+def calibration_setup() -> Callable[[], object]:
+    """
+    Fixed pure Python workload. Timings are stored relative to it, so baselines recorded
+    on a developer machine stay comparable on a slower (or faster) CI runner.
+    """
+    values = list(range(200))
+    return lambda: sum(value * value for value in values if value % 3)
+
+
+# Formats users type in the create form.
+PHONE_NUMBERS = ('+79265847523', '8 (926) 584-75-23', '+7 926 584 75 23', '89265847523')
+
+
+def standardize_phone_number_setup() -> Callable[[], object]:
+    from .phone_number_logic import PhoneNumberNormalizer
+
+    # Without the cache: the 'phonenumbers' parsing cost of the new numbers.
+    normalize = PhoneNumberNormalizer(maxsize=0).normalize
+    return lambda: [normalize(phone_number) for phone_number in PHONE_NUMBERS]
+
+
+def standardize_phone_number_cached_setup() -> Callable[[], object]:
+    from .phone_number_logic import PhoneNumberNormalizer
+
+    # Re-saved posters: the numbers are already standardized and cached.
+    normalizer = PhoneNumberNormalizer()
+    phone_numbers = normalizer.normalize_many(PHONE_NUMBERS)
+    return lambda: [normalizer.normalize(phone_number) for phone_number in phone_numbers]
+
+
+def unique_image_name_setup() -> Callable[[], object]:
+    from .poster_image_name_logic import GetUniqueImageName
+
+    get_unique_image_name = GetUniqueImageName('poster_images')
+    return lambda: get_unique_image_name(None, 'IMG_20240512_183015.large.jpeg')
+
+
+def validate_currency_setup() -> Callable[[], object]:
+    from .poster_currency_logic import validate_currency, CURRENCY_CHOICES
+
+    currencies = [currency[0] for currency in CURRENCY_CHOICES]
+    return lambda: [validate_currency(currency) for currency in currencies]
+
+
+def get_from_cache_or_query_setup() -> Callable[[], object]:
+    from django.core.cache import cache
+    from .query_fetchers_logic import get_from_cache_or_query
+
+    # The cache hit path (the common case). 'run_benchmarks' swaps the default cache for a process local
+    # one: measures the wrapper and the (un)pickling of a categories sized payload, not the network.
+    payload = [{'name': f'Category {number}', 'posters_count': number} for number in range(20)]
+    cache.set('benchmark_cached', payload, 60)
+    return lambda: get_from_cache_or_query(fetch_func=lambda: payload, cache_key='benchmark_cached', cache_timeout=60)
+
+
+def apply_search_filter_setup() -> Callable[[], object]:
+    from django.db import connection
+    from posters_app.models import Poster
+    from .view_logic import SearchQueryEngine
+
+    # Query construction and SQL compilation only, the query is never executed.
+    queryset = Poster.alive.filter(status=True)
+    return lambda: SearchQueryEngine.apply_search_filter(
+        queryset, 'mountain bike').query.get_compiler(connection=connection).as_sql()
+
+
+CALIBRATION = Benchmark('calibration', calibration_setup)
+BENCHMARKS = (
+    Benchmark('standardize_phone_number', standardize_phone_number_setup),
+    Benchmark('standardize_phone_number (cached)', standardize_phone_number_cached_setup),
+    Benchmark('GetUniqueImageName.__call__', unique_image_name_setup),
+    Benchmark('validate_currency', validate_currency_setup),
+    Benchmark('get_from_cache_or_query', get_from_cache_or_query_setup),
+    Benchmark('SearchQueryEngine.apply_search_filter', apply_search_filter_setup),
+)
+
+#endregion
+
+#region: BUSINESS LOGIC
+
+def time_benchmark(benchmark: Benchmark, repeat: int = 5, min_duration: float = 0.2) -> float:
+    """
+    Best time of one call in microseconds.
+    The number of calls per measurement is doubled until one measurement takes 'min_duration',
+    the best of 'repeat' measurements is kept (the others are slowed down by the noise, not by the code).
+    :Param repeat: Number of measurements [default=5].
+    :Param min_duration: Minimal duration (in seconds) of one measurement [default=0.2].
+    """
+    timer = timeit.Timer(benchmark.setup())
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_duration:
+            break
+        number *= 2
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1_000_000
+
+
+def run_benchmarks(names: list[str] | None = None, repeat: int = 5, min_duration: float = 0.2) -> dict[str, dict]:
+    """
+    Run the benchmarks (all by default).
+    The default cache is replaced by a process local one for the run.
+    Returns {name: {'us': time of one call in us, 'normalized': time relative to the calibration}}.
+    :Param names: Names of the benchmarks to run [default=None].
+    """
+    from django.test import override_settings
+
+    calibration_us = time_benchmark(CALIBRATION, repeat, min_duration)
+    results = {}
+    with override_settings(CACHES=BENCHMARK_CACHES):
+        for benchmark in BENCHMARKS:
+            if names and benchmark.name not in names:
+                continue
+            benchmark_us = time_benchmark(benchmark, repeat, min_duration)
+            results[benchmark.name] = {'us': benchmark_us, 'normalized': benchmark_us / calibration_us}
+    return results
+
+
+def load_baselines(path: str = BENCHMARK_BASELINES_PATH) -> dict[str, float]:
+    try:
+        with open(path) as baselines_file:
+            return json.load(baselines_file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(results: dict[str, dict], path: str = BENCHMARK_BASELINES_PATH) -> None:
+    baselines = load_baselines(path)
+    baselines.update({name: round(result['normalized'], 4) for name, result in results.items()})
+    with open(path, 'w') as baselines_file:
+        json.dump(dict(sorted(baselines.items())), baselines_file, indent=2)
+        baselines_file.write('\n')
+
+
+def find_regressions(
+        results: dict[str, dict],
+        baselines: dict[str, float],
+        threshold: float = BENCHMARK_REGRESSION_THRESHOLD) -> dict[str, float]:
+    """
+    Benchmarks slower than their baseline by more than the threshold.
+    Returns {name: normalized time / baseline}. Benchmarks without a baseline are skipped.
+    """
+    regressions = {}
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline and result['normalized'] / baseline > threshold:
+            regressions[name] = result['normalized'] / baseline
+    return regressions
+
+#endregion
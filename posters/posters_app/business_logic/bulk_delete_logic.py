@@ -0,0 +1,20 @@
+from django.db import connection, models
+
+
+def delete_rows(model: type[models.Model], column: str, ids: list) -> int:
+    """
+    Delete rows with one 'DELETE ... WHERE column = ANY(ids)' for the batch jobs.
+    Unlike 'QuerySet.delete()' the rows are not loaded by the deletion collector (it loads them
+    when the model has dependents, e.g. 'Poster' <- 'PosterImages'): no signals, no 'on_delete' handling,
+    so the dependents must be deleted (detached) before. Returns the number of deleted rows.
+    :Param model: Model of the deleted rows.
+    :Param column: Column the rows are selected by.
+    :Param ids: Values of the column.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)} "
+            f"WHERE {connection.ops.quote_name(column)} = ANY(%s)",
+            [ids]
+        )
+        return cursor.rowcount
@@ -0,0 +1,400 @@
+import bisect
+import heapq
+import itertools
+import pickle
+import random
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Iterable, Iterator
+
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+
+from .query_fetchers_logic import get_from_cache_or_query
+from .process_images_logic import make_image_file_cache_key
+from ..constants import (
+    RECOMMENDED_POSTERS_CACHE_KEY,
+    CATEGORIES_CACHE_KEY,
+    ESTIMATED_POSTERS_COUNT_CACHE_KEY,
+    RECOMMENDED_POSTERS_CACHE_TIMEOUT,
+    CATEGORIES_CACHE_TIMEOUT,
+    ESTIMATED_POSTERS_COUNT_CACHE_TIMEOUT,
+    IMAGE_FILE_CACHE_TIMEOUT,
+)
+
+
+# Redis 'maxmemory-policy' values the simulated cache implements.
+EVICTION_POLICIES = ('allkeys-lru', 'allkeys-lfu', 'allkeys-random', 'volatile-ttl')
+# Keys sampled per eviction (Redis 'maxmemory-samples').
+EVICTION_SAMPLES = 5
+
+# Request line of the nginx 'combined' and the gunicorn default access log formats.
+ACCESS_LOG_PATTERN = re.compile(
+    r'\[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+) [^"]*" (?P<status>\d{3})')
+ACCESS_LOG_TIME_FORMAT = '%d/%b/%Y:%H:%M:%S %z'
+
+# Requested paths (without the language prefix) and the view they hit.
+ROUTE_PATTERNS = (
+    ('home', re.compile(r'^/posters/$')),
+    ('categories', re.compile(r'^/posters/categories/$')),
+    ('category', re.compile(r'^/posters/all/(?P<category_name>[^/]+)$')),
+    ('poster', re.compile(r'^/posters/poster/(?P<poster_id>\d+)$')),
+    ('image', re.compile(r'^/posters/get_poster_image/(?P<image_id>\d+)$')),
+)
+
+
+#region: SIMULATED CACHE
+
+class SimulatedCache(BaseCache):
+    """
+    In-memory model of the Redis cache driven by a simulated clock.
+    Sizes are the pickled value sizes (what 'django_redis' stores). Expired keys are dropped
+    when the clock passes their expiry ('advance', Redis active expiry); when 'max_memory' is exceeded keys are evicted the way Redis does it:
+    'EVICTION_SAMPLES' random keys are sampled and the worst one by the policy is evicted
+    (expired keys first).
+    """
+
+    def __init__(self, max_memory: int | None = None, policy: str = 'allkeys-lru', seed: int = 0) -> None:
+        super().__init__({})
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy ({policy}). Chose from {EVICTION_POLICIES}")
+        self.max_memory = max_memory
+        self.policy = policy
+        self.rng = random.Random(seed)
+        self.now = 0.0
+        # key -> [value, size, expires at, last access, accesses]
+        self.entries = {}
+        # Keys in a list as well, for O(1) random sampling.
+        self.keys = []
+        self.key_positions = {}
+        # (expires at, key), entries of overwritten keys are skipped.
+        self.expiry_heap = []
+        self.used_memory = 0
+        self.peak_memory = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'bytes_read': 0, 'bytes_written': 0}
+
+    def advance(self, now: float) -> None:
+        """Move the clock and drop the keys expired meanwhile."""
+        self.now = now
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self.expiry_heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] == expires_at:
+                self.remove(key)
+                self.stats['expired'] += 1
+
+    def get(self, key, default=None, version=None):
+        entry = self.entries.get(key)
+        if entry is not None and entry[2] is not None and entry[2] <= self.now:
+            self.remove(key)
+            self.stats['expired'] += 1
+            entry = None
+        if entry is None:
+            self.stats['misses'] += 1
+            return default
+        entry[3] = self.now
+        entry[4] += 1
+        self.stats['hits'] += 1
+        self.stats['bytes_read'] += entry[1]
+        return entry[0]
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        size = len(key) + len(value) if isinstance(value, bytes) else len(key) + len(pickle.dumps(value))
+        if key in self.entries:
+            self.remove(key)
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = 300
+        expires_at = None if timeout is None else self.now + timeout
+        self.entries[key] = [value, size, expires_at, self.now, 0]
+        if expires_at is not None:
+            heapq.heappush(self.expiry_heap, (expires_at, key))
+        self.key_positions[key] = len(self.keys)
+        self.keys.append(key)
+        self.used_memory += size
+        self.stats['bytes_written'] += size
+        self.evict()
+        self.peak_memory = max(self.peak_memory, self.used_memory)
+        return True
+
+    def delete(self, key, version=None):
+        if key not in self.entries:
+            return False
+        self.remove(key)
+        return True
+
+    def remove(self, key) -> None:
+        self.used_memory -= self.entries.pop(key)[1]
+        position = self.key_positions.pop(key)
+        last_key = self.keys.pop()
+        if last_key != key:
+            self.keys[position] = last_key
+            self.key_positions[last_key] = position
+
+    def evict(self) -> None:
+        while self.max_memory is not None and self.used_memory > self.max_memory and self.keys:
+            samples = [self.keys[self.rng.randrange(len(self.keys))] for _ in range(EVICTION_SAMPLES)]
+            self.remove(min(samples, key=self.eviction_rank))
+            self.stats['evictions'] += 1
+
+    def eviction_rank(self, key) -> tuple:
+        """The lowest rank is evicted first."""
+        _, _, expires_at, last_access, accesses = self.entries[key]
+        expired = expires_at is not None and expires_at <= self.now
+        if self.policy == 'allkeys-lru':
+            return (not expired, last_access)
+        if self.policy == 'allkeys-lfu':
+            return (not expired, accesses, last_access)
+        if self.policy == 'volatile-ttl':
+            return (not expired, expires_at if expires_at is not None else float('inf'))
+        return (not expired,)
+
+#endregion
+
+#region: TRACES
+
+@dataclass(frozen=True)
+class Access:
+    """One request of a trace: seconds from the trace start, view name and its arguments."""
+    time: float
+    view: str
+    arguments: dict = field(default_factory=dict)
+
+
+def route_path(path: str) -> tuple[str, dict] | None:
+    """View name and arguments of a requested path, None for the paths the caches don't serve."""
+    path = path.split('?', 1)[0]
+    # Drop the language prefix ('/en/posters/' -> '/posters/').
+    path = re.sub(r'^/[a-z]{2}(?:-[a-z]+)?(?=/)', '', path)
+    for view, pattern in ROUTE_PATTERNS:
+        match = pattern.match(path)
+        if match:
+            return view, match.groupdict()
+    return None
+
+
+def read_access_log(lines: Iterable[str]) -> Iterator[Access]:
+    """
+    Accesses of a recorded nginx ('combined') or gunicorn access log.
+    Only successful GET requests of the cached views are replayed.
+    :Param lines: Access log lines.
+    """
+    started_at = None
+    for line in lines:
+        match = ACCESS_LOG_PATTERN.search(line)
+        if not match or match['method'] != 'GET' or not match['status'].startswith('2'):
+            continue
+        route = route_path(match['path'])
+        if route is None:
+            continue
+        timestamp = datetime.strptime(match['time'], ACCESS_LOG_TIME_FORMAT).timestamp()
+        if started_at is None:
+            started_at = timestamp
+        yield Access(timestamp - started_at, *route)
+
+
+def zipf_cumulative_weights(size: int, exponent: float) -> list[float]:
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, size + 1)))
+
+
+def generate_zipf_trace(
+        requests: int,
+        requests_per_second: float = 20.0,
+        posters: int = 10000,
+        images: int = 20000,
+        categories: int = 20,
+        exponent: float = 1.1,
+        view_weights: dict[str, float] | None = None,
+        seed: int = 42) -> Iterator[Access]:
+    """
+    Synthetic trace: Poisson arrivals, posters, images and categories requested with Zipf popularity.
+    :Param requests: Number of requests.
+    :Param requests_per_second: Mean arrival rate [default=20].
+    :Param exponent: Zipf exponent, higher means a more skewed popularity [default=1.1].
+    :Param view_weights: Share of each view in the trace [default=None].
+    """
+    rng = random.Random(seed)
+    view_weights = view_weights or {'home': 0.3, 'categories': 0.05, 'category': 0.15, 'poster': 0.2, 'image': 0.3}
+    views, weights = list(view_weights), list(view_weights.values())
+    popularity = {size: zipf_cumulative_weights(size, exponent) for size in {posters, images, categories}}
+
+    def pick(size: int) -> int:
+        cumulative_weights = popularity[size]
+        return bisect.bisect_left(cumulative_weights, rng.random() * cumulative_weights[-1]) + 1
+
+    now = 0.0
+    for _ in range(requests):
+        now += rng.expovariate(requests_per_second)
+        view = rng.choices(views, weights)[0]
+        if view == 'category':
+            yield Access(now, view, {'category_name': f'category_{pick(categories)}'})
+        elif view == 'poster':
+            yield Access(now, view, {'poster_id': str(pick(posters))})
+        elif view == 'image':
+            yield Access(now, view, {'image_id': str(pick(images))})
+        else:
+            yield Access(now, view)
+
+#endregion
+
+#region: REPLAY
+
+# Cached layers, their current timeouts and the payload sizes (bytes) used when not measured.
+CACHE_LAYERS = {
+    'recommended_posters': {'timeout': RECOMMENDED_POSTERS_CACHE_TIMEOUT, 'size': 200_000},
+    'categories': {'timeout': CATEGORIES_CACHE_TIMEOUT, 'size': 4_000},
+    'estimated_posters_count': {'timeout': ESTIMATED_POSTERS_COUNT_CACHE_TIMEOUT, 'size': 8},
+    'image': {'timeout': IMAGE_FILE_CACHE_TIMEOUT, 'size': 60_000},
+}
+
+
+@dataclass
+class LayerStats:
+    hits: int = 0
+    misses: int = 0
+    # DB queries (storage reads for images) done on the misses.
+    fetches: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CacheReplay:
+    """
+    Replays a trace through 'get_from_cache_or_query' (the image cache included) on a 'SimulatedCache',
+    with the production cache keys. The fetch functions don't touch the DB (or the storage): they count
+    the queries (image reads) a miss costs and return a payload of the layer size. Uncached queries the views run on every request
+    (poster detail, category listing, image row lookup) are counted as well.
+    :Param timeouts: Timeout of each layer in seconds [default=current timeouts].
+    :Param sizes: Payload size of each layer in bytes [default='CACHE_LAYERS' sizes].
+    """
+
+    def __init__(
+            self,
+            cache_backend: SimulatedCache,
+            timeouts: dict[str, int] | None = None,
+            sizes: dict[str, int] | None = None) -> None:
+        self.cache_backend = cache_backend
+        self.timeouts = {layer: settings['timeout'] for layer, settings in CACHE_LAYERS.items()} | (timeouts or {})
+        self.sizes = {layer: settings['size'] for layer, settings in CACHE_LAYERS.items()} | (sizes or {})
+        self.layers = {layer: LayerStats() for layer in CACHE_LAYERS}
+        self.db_queries = 0
+        self.requests = 0
+
+    def lookup(self, layer: str, cache_key: str) -> None:
+        stats = self.layers[layer]
+        hits_before = self.cache_backend.stats['hits']
+
+        def fetch() -> bytes:
+            stats.fetches += 1
+            if layer != 'image':
+                self.db_queries += 1
+            return bytes(self.sizes[layer])
+
+        get_from_cache_or_query(fetch_func=fetch, cache_key=cache_key,
+                                cache_timeout=self.timeouts[layer], cache_backend=self.cache_backend)
+        if self.cache_backend.stats['hits'] > hits_before:
+            stats.hits += 1
+        else:
+            stats.misses += 1
+
+    def replay(self, accesses: Iterable[Access]) -> None:
+        for access in accesses:
+            self.cache_backend.advance(access.time)
+            self.requests += 1
+            if access.view == 'home':
+                self.lookup('recommended_posters', RECOMMENDED_POSTERS_CACHE_KEY)
+                self.lookup('estimated_posters_count', ESTIMATED_POSTERS_COUNT_CACHE_KEY)
+            elif access.view == 'categories':
+                self.lookup('categories', CATEGORIES_CACHE_KEY)
+            elif access.view == 'category':
+                # The listing itself isn't cached, the page total comes from the cached categories.
+                self.db_queries += 1
+                self.lookup('categories', CATEGORIES_CACHE_KEY)
+            elif access.view == 'poster':
+                self.db_queries += 1
+            elif access.view == 'image':
+                # The image row is looked up before the cache.
+                self.db_queries += 1
+                self.lookup('image', make_image_file_cache_key(access.arguments['image_id']))
+
+    def report(self) -> dict:
+        stats = self.cache_backend.stats
+        lookups = stats['hits'] + stats['misses']
+        return {
+            'requests': self.requests,
+            'hit_ratio': round(stats['hits'] / lookups, 4) if lookups else 0.0,
+            'db_queries': self.db_queries,
+            'db_queries_per_request': round(self.db_queries / self.requests, 3) if self.requests else 0.0,
+            'peak_memory_bytes': self.cache_backend.peak_memory,
+            'bytes_read': stats['bytes_read'],
+            'bytes_written': stats['bytes_written'],
+            'evictions': stats['evictions'],
+            'layers': {
+                layer: {'timeout': self.timeouts[layer], 'hit_ratio': round(layer_stats.hit_ratio, 4),
+                        'fetches': layer_stats.fetches}
+                for layer, layer_stats in self.layers.items()
+            },
+        }
+
+
+def measure_payload_sizes(image_samples: int = 100) -> dict[str, int]:
+    """
+    Pickled sizes of the cached query results in the current DB and the mean size of the image files.
+    :Param image_samples: Number of the newest images to average [default=100].
+    """
+    from django.core.files.storage import default_storage
+    from .query_fetchers_logic import QueryFetchers
+    from ..models import Poster, PosterImages
+
+    sizes = {
+        'recommended_posters': len(pickle.dumps(QueryFetchers.fetch_posters())),
+        'categories': len(pickle.dumps(QueryFetchers.fetch_categories_and_count_posters())),
+        'estimated_posters_count': len(pickle.dumps(QueryFetchers.fetch_estimated_rows_count(model=Poster) or 0)),
+    }
+    image_sizes = []
+    for image_path in PosterImages.objects.order_by('-id').values_list('image_path', flat=True)[:image_samples]:
+        try:
+            image_sizes.append(default_storage.size(image_path))
+        except OSError:
+            continue
+    if image_sizes:
+        sizes['image'] = sum(image_sizes) // len(image_sizes)
+    return sizes
+
+
+def make_scenarios(candidate_timeouts: dict[str, list[int]]) -> list[dict[str, int]]:
+    """
+    The current timeouts plus one scenario per candidate timeout of a layer (one layer changed at a time).
+    :Param candidate_timeouts: {layer: [timeouts to try]}.
+    """
+    current = {layer: settings['timeout'] for layer, settings in CACHE_LAYERS.items()}
+    scenarios = [current]
+    for layer, timeouts in candidate_timeouts.items():
+        for timeout in timeouts:
+            scenario = current | {layer: timeout}
+            if scenario not in scenarios:
+                scenarios.append(scenario)
+    return scenarios
+
+
+def simulate(
+        make_trace: Callable[[], Iterable[Access]],
+        scenarios: list[dict[str, int]],
+        policies: Iterable[str] = ('allkeys-lru',),
+        max_memory: int | None = None,
+        sizes: dict[str, int] | None = None) -> list[dict]:
+    """
+    Replay the trace for every timeouts scenario and eviction policy.
+    :Param make_trace: Returns a fresh iterable of the trace accesses.
+    :Param max_memory: Cache memory limit in bytes, None for unlimited [default=None].
+    """
+    reports = []
+    for timeouts, policy in itertools.product(scenarios, policies):
+        cache_replay = CacheReplay(SimulatedCache(max_memory, policy), timeouts, sizes)
+        cache_replay.replay(make_trace())
+        reports.append({'policy': policy, 'timeouts': timeouts, **cache_replay.report()})
+    return reports
+
+#endregion
@@ -0,0 +1,134 @@
+import hashlib
+import zlib
+
+from typing_extensions import Any
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.translation import get_language
+
+from ..constants import PAGE_CACHE_KEY_PREFIX, PAGE_CACHE_VERSION_KEY
+
+
+# Response header telling whether the page came from the anonymous page cache ('HIT'/'MISS').
+PAGE_CACHE_HEADER = 'X-Page-Cache'
+# The only query parameters listing pages depend on. Other parameters don't split the cache.
+PAGE_CACHE_QUERY_PARAMS = ('page', 'query')
+
+
+# region: BUSINESS LOGIC
+
+def get_page_cache_version() -> int:
+    """Current generation of the anonymous page cache. Bumped by every poster write."""
+    return cache.get_or_set(PAGE_CACHE_VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_page_cache() -> None:
+    """
+    Invalidate all cached anonymous pages at once by bumping the cache generation.
+    Entries of the old generation are never read again and expire by their TTL.
+    """
+    try:
+        cache.incr(PAGE_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(PAGE_CACHE_VERSION_KEY, 2, timeout=None)
+
+
+def is_page_cacheable(request: HttpRequest) -> bool:
+    """
+    Only GET/HEAD requests of anonymous visitors are served from the page cache:
+    the header of the page depends on the user, and authors must see their writes immediately.
+    """
+    return (
+        getattr(settings, 'POSTERS_PAGE_CACHE_ENABLED', True)
+        and request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+    )
+
+
+def make_page_cache_key(request: HttpRequest, view_name: str) -> str:
+    """
+    Cache key of an anonymous page: generation, language (the 'i18n_patterns' prefix), view,
+    path and the 'page'/'query' parameters.
+    :Param request: HttpRequest of the page.
+    :Param view_name: Name of the view, e.g. 'home'.
+    """
+    params = '&'.join(f"{name}={request.GET.get(name, '')}" for name in PAGE_CACHE_QUERY_PARAMS)
+    digest = hashlib.md5(f"{request.path}?{params}".encode(), usedforsecurity=False).hexdigest()
+    return f"{PAGE_CACHE_KEY_PREFIX}:{get_page_cache_version()}:{get_language()}:{view_name}:{digest}"
+
+
+def is_response_cacheable(request: HttpRequest, response: HttpResponse) -> bool:
+    """
+    Never store responses that are personal: ones setting cookies (e.g. a modified session)
+    or rendered with a CSRF token (the token of one visitor must not be served to others).
+    Listing pages use GET search forms without a token, so they are cached.
+    """
+    session = getattr(request, 'session', None)
+    return (
+        response.status_code == 200
+        and not response.cookies
+        and not (session is not None and session.modified)
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def store_page(cache_key: str, response: HttpResponse) -> None:
+    """Store the rendered page compressed with 'zlib'."""
+    cache.set(
+        cache_key,
+        (zlib.compress(response.content), response.get('Content-Type')),
+        timeout=getattr(settings, 'POSTERS_PAGE_CACHE_TIMEOUT', 60 * 5)
+    )
+
+
+def load_page(cache_key: str) -> HttpResponse | None:
+    """Build a response from the cached page or return None (cache miss)."""
+    cached_page = cache.get(cache_key)
+    if cached_page is None:
+        return None
+    content, content_type = cached_page
+    return HttpResponse(zlib.decompress(content), content_type=content_type)
+
+# endregion
+
+# region: VIEW MIXINS
+
+class AnonymousPageCacheMixin:
+    """
+    Serve whole rendered pages of anonymous visitors from the cache.
+    The key depends on the language, path, '?page' and '?query' only (see 'make_page_cache_key'),
+    all entries are invalidated by poster writes (see 'invalidate_page_cache').
+    Pages vary on 'Cookie', since logged in users get a personal (not cached) page.
+    """
+    page_cache_name: str | None = None
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if not is_page_cacheable(request):
+            response = super().dispatch(request, *args, **kwargs)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+
+        cache_key = make_page_cache_key(request, self.page_cache_name or type(self).__name__)
+        response = load_page(cache_key)
+        if response is not None:
+            response[PAGE_CACHE_HEADER] = 'HIT'
+            patch_vary_headers(response, ('Cookie',))
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        response[PAGE_CACHE_HEADER] = 'MISS'
+        patch_vary_headers(response, ('Cookie',))
+
+        def store_rendered_page(rendered_response: HttpResponse) -> None:
+            if is_response_cacheable(request, rendered_response):
+                store_page(cache_key, rendered_response)
+
+        if hasattr(response, 'add_post_render_callback') and not response.is_rendered:
+            response.add_post_render_callback(store_rendered_page)
+        else:
+            store_rendered_page(response)
+        return response
+
+# endregion
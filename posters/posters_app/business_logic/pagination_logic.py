@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from typing_extensions import Any, Callable, Sequence
+from django.conf import settings
+from django.core.paginator import Paginator, Page, EmptyPage, PageNotAnInteger
+from django.utils.functional import cached_property
+
+from ..constants import (
+    PAGINATION_MODE_EXACT,
+    PAGINATION_MODE_APPROXIMATE,
+    PAGINATION_MODE_COUNT_FREE,
+)
+
+
+# region: PAGES
+
+class CountFreePage(Page):
+    """
+    A page that knows whether the next page exists without knowing the total number of objects.
+    The paginator fetches 'per_page + 1' rows, the extra row (if any) only tells that the next page exists.
+    """
+
+    def __init__(self, object_list: Sequence, number: int, paginator: Paginator, has_next: bool) -> None:
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def start_index(self) -> int:
+        if not self.object_list:
+            return 0
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    def end_index(self) -> int:
+        if not self.object_list:
+            return 0
+        return self.start_index() + len(self.object_list) - 1
+
+# endregion
+
+# region: PAGINATORS
+
+class CountFreePaginator(Paginator):
+    """
+    Paginator that never runs 'COUNT(*)'.
+    Page ranges (total pages, "last" link) are not available in this mode, templates render "next/prev" only.
+    """
+    count_free = True
+    is_approximate = False
+
+    def validate_number(self, number: Any) -> int:
+        """Validate the page number without comparing it against the total number of pages."""
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number: Any) -> CountFreePage:
+        """
+        Fetch 'per_page + 1' objects of the requested page.
+        :Param number: Page number. E.g. '?page=1'.
+        """
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page + 1])
+
+        if not object_list and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+
+        return CountFreePage(
+            object_list[:self.per_page], number, self,
+            has_next=len(object_list) > self.per_page
+        )
+
+    def get_page(self, number: Any) -> CountFreePage:
+        """
+        Return a valid page, even if the page argument isn't a number or is out of range.
+        Unlike 'Paginator.get_page' falls back to the first page, since the last page is unknown.
+        """
+        try:
+            return self.page(number)
+        except (PageNotAnInteger, EmptyPage):
+            return self.page(1)
+
+
+class ApproximateCountPaginator(CountFreePaginator):
+    """
+    Paginator that takes the total number of objects from an estimate
+    (e.g. 'pg_class.reltuples' or cached per category counts) instead of 'COUNT(*)'.
+    Whether the next page exists is still detected by fetching 'per_page + 1' objects.
+    The estimate counts rows the listing doesn't show (inactive, soft deleted), so templates
+    render it as an approximate total ("~N posters") with "next/prev" links, not page ranges.
+    """
+    count_free = False
+    is_approximate = True
+
+    def __init__(self, object_list: Sequence, per_page: int, count_estimate: Callable[[], int], **kwargs: Any) -> None:
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_estimate = count_estimate
+
+    @cached_property
+    def count(self) -> int:
+        """Estimated total number of objects."""
+        return max(int(self.count_estimate() or 0), 0)
+
+# endregion
+
+# region: BUSINESS LOGIC
+
+def get_pagination_mode() -> str:
+    """Get the pagination mode from the project settings ('POSTERS_PAGINATION_MODE')."""
+    return getattr(settings, 'POSTERS_PAGINATION_MODE', PAGINATION_MODE_EXACT)
+
+
+def make_paginator(
+        object_list: Sequence,
+        per_page: int,
+        count_estimate: Callable[[], int] | None = None,
+        mode: str | None = None) -> Paginator:
+    """
+    Make a paginator according to the pagination mode.
+    If the 'approximate' mode is set, but there is no way to estimate the total number of objects
+    (e.g. search results), fall back to the 'count_free' mode.
+    :Param object_list: A QuerySet (or a list) to paginate.
+    :Param per_page: Number of elements on the page.
+    :Param count_estimate: A callable returning the estimated number of objects [default=None].
+    :Param mode: One of 'exact', 'approximate', 'count_free' [default=settings.POSTERS_PAGINATION_MODE].
+    """
+    mode = mode or get_pagination_mode()
+
+    if mode == PAGINATION_MODE_EXACT:
+        return Paginator(object_list, per_page)
+    if mode == PAGINATION_MODE_APPROXIMATE and count_estimate is not None:
+        return ApproximateCountPaginator(object_list, per_page, count_estimate=count_estimate)
+    if mode in (PAGINATION_MODE_APPROXIMATE, PAGINATION_MODE_COUNT_FREE):
+        return CountFreePaginator(object_list, per_page)
+
+    raise ValueError(
+        f"Pagination mode ({mode}) is not supported! "
+        f"Chose from ({PAGINATION_MODE_EXACT}, {PAGINATION_MODE_APPROXIMATE}, {PAGINATION_MODE_COUNT_FREE}).")
+
+# endregion
@@ -1,4 +1,7 @@
-import phonenumbers
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
 from django.core.exceptions import ValidationError
 
 
@@ -27,6 +30,91 @@ class InvalidPhoneNumberValidation(ValidationError):
 
 #region: BUSINESS LOGIC
 
+PHONE_NUMBERS_CACHE_SIZE = 4096
+# Cached result of the numbers 'phonenumbers' can't parse.
+PARSE_ERROR = object()
+
+
+class PhoneNumberNormalizer:
+    """
+    Standardizes phone numbers with a bounded LRU of the results (the same seller's number is parsed once).
+    A standardized number is cached as its own result, so re-saving a stored number skips the parsing.
+    :Param maxsize: Max number of cached results, 0 - no cache [default=PHONE_NUMBERS_CACHE_SIZE].
+    """
+
+    def __init__(self, maxsize: int = PHONE_NUMBERS_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, phone_number: str, region: str) -> str | None | object:
+        """Standardized number, None (not a valid number) or 'PARSE_ERROR'."""
+        # Imported on the first use: the metadata is heavy and most processes (Celery workers) never parse numbers.
+        import phonenumbers
+
+        try:
+            parsed_phone_number = phonenumbers.parse(phone_number, region=region)
+        except phonenumbers.NumberParseException:
+            return PARSE_ERROR
+        if not phonenumbers.is_valid_number(parsed_phone_number):
+            return None
+        return phonenumbers.format_number(parsed_phone_number, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
+
+    def lookup(self, phone_number: str, region: str) -> str | None | object:
+        key = (phone_number, region)
+        with self.lock:
+            if key in self.results:
+                self.hits += 1
+                self.results.move_to_end(key)
+                return self.results[key]
+            self.misses += 1
+
+        result = self.parse(phone_number, region)
+        if self.maxsize:
+            with self.lock:
+                self.results[key] = result
+                if isinstance(result, str):
+                    self.results[(result, region)] = result
+                while len(self.results) > self.maxsize:
+                    self.results.popitem(last=False)
+        return result
+
+    def normalize(self, phone_number: str, region: str = 'RU') -> str | None:
+        """
+        Standardized number, None if it's not a valid number.
+        Raises 'InvalidPhoneNumberException' if it can't be parsed.
+        """
+        result = self.lookup(phone_number, region)
+        if result is PARSE_ERROR:
+            raise InvalidPhoneNumberException(phone_number)
+        return result
+
+    def normalize_many(self, phone_numbers: Iterable[str], region: str = 'RU') -> list[str | None]:
+        """
+        Batch API (bulk imports, admin actions): standardized numbers in the input order,
+        None for the invalid ones. Repeated numbers are looked up once.
+        """
+        phone_numbers = list(phone_numbers)
+        results = {}
+        for phone_number in dict.fromkeys(phone_numbers):
+            result = self.lookup(phone_number, region)
+            results[phone_number] = None if result is PARSE_ERROR else result
+        return [results[phone_number] for phone_number in phone_numbers]
+
+    def cache_info(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.results), 'maxsize': self.maxsize}
+
+    def clear(self) -> None:
+        with self.lock:
+            self.results.clear()
+            self.hits = self.misses = 0
+
+
+PHONE_NUMBER_NORMALIZER = PhoneNumberNormalizer()
+
+
 def standardize_phone_number(phone_number: str, region='RU') -> str:
     """
     Standardize phone number before writing it to the database.
@@ -35,21 +123,16 @@ def standardize_phone_number(phone_number: str, region='RU') -> str:
     :Param phone_number: Users provided phone number.
     :Param region <default='RU'>: Region the number origin.
     """
-    
-    try:
-        phone_number = phonenumbers.parse(phone_number, region=region)
-
-        if phonenumbers.is_valid_number(phone_number):
-            formatted_phone_number = phonenumbers.format_number(
-                phone_number,
-                phonenumbers.PhoneNumberFormat.INTERNATIONAL
-            )
-            return formatted_phone_number
-        else:
-            return None
-        
-    except phonenumbers.NumberParseException:
-        raise InvalidPhoneNumberException(phone_number)
+    return PHONE_NUMBER_NORMALIZER.normalize(phone_number, region=region)
+
+
+def standardize_phone_numbers(phone_numbers: Iterable[str], region='RU') -> list[str | None]:
+    """
+    Standardize many phone numbers in one call, None for the invalid ones (see 'PhoneNumberNormalizer.normalize_many').
+    :Param phone_numbers: Phone numbers.
+    :Param region <default='RU'>: Region the numbers origin.
+    """
+    return PHONE_NUMBER_NORMALIZER.normalize_many(phone_numbers, region=region)
     
 #endregion
  
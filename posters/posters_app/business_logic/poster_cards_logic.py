@@ -0,0 +1,57 @@
+import hashlib
+
+from typing_extensions import Iterable
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import SafeString, mark_safe
+from django.utils.translation import get_language
+
+from ..constants import POSTER_CARD_CACHE_KEY_PREFIX
+
+
+POSTER_CARD_TEMPLATE = 'posters_app/poster_card.html'
+
+
+# region: BUSINESS LOGIC
+
+def get_poster_card_version(poster) -> str:
+    """
+    Version of a poster card: digest of the fields the card displays.
+    Editing any of them (or the first image) makes a new card version, so cached cards are never stale.
+    :Param poster: A poster annotated by 'QueryFetchers.fetch_posters'.
+    """
+    displayed = (poster.header, poster.price_rounded, poster.currency, poster.image_ids[0], poster.created)
+    return hashlib.md5(repr(displayed).encode(), usedforsecurity=False).hexdigest()
+
+
+def make_poster_card_cache_key(poster, language: str | None = None) -> str:
+    """
+    :Param poster: A poster annotated by 'QueryFetchers.fetch_posters'.
+    :Param language: Language of the card URLs ('i18n_patterns' prefix) [default=active language].
+    """
+    return f"{POSTER_CARD_CACHE_KEY_PREFIX}:{language or get_language()}:{poster.id}:{get_poster_card_version(poster)}"
+
+
+def render_poster_cards(posters: Iterable) -> list[SafeString]:
+    """
+    Render the cards of a page of posters in one pass.
+    Cards are fetched from the cache with a single 'get_many', only the missing ones are rendered
+    (including their '{% url %}' reverses) and stored back with a single 'set_many'.
+    :Param posters: Posters of the page annotated by 'QueryFetchers.fetch_posters'.
+    """
+    language = get_language()
+    cards_by_key = {make_poster_card_cache_key(poster, language): poster for poster in posters}
+    cached_cards = cache.get_many(cards_by_key.keys())
+
+    missing_cards = {}
+    if len(cached_cards) < len(cards_by_key):
+        template = get_template(POSTER_CARD_TEMPLATE)
+        for cache_key, poster in cards_by_key.items():
+            if cache_key not in cached_cards:
+                missing_cards[cache_key] = template.render({'poster': poster})
+        cache.set_many(missing_cards, timeout=getattr(settings, 'POSTER_CARD_CACHE_TIMEOUT', 60 * 60))
+
+    return [mark_safe(cached_cards.get(cache_key) or missing_cards[cache_key]) for cache_key in cards_by_key]
+
+# endregion
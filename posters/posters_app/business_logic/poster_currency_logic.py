@@ -7,7 +7,9 @@ CURRENCY_CHOICES = [
     ('RUB', 'Russian Rubble'),
     ('GBP', 'British pound'),
 ]
+# Built once, validate_currency runs on every poster save.
+CURRENCY_CODES = frozenset(currency[0] for currency in CURRENCY_CHOICES)
 
 def validate_currency(value: str) -> None:
-    if value not in [currency[0] for currency in CURRENCY_CHOICES]:
+    if value not in CURRENCY_CODES:
         raise ValidationError(f'{value} is not valid. Chose from {CURRENCY_CHOICES}')
\ No newline at end of file
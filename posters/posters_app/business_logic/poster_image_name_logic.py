@@ -40,10 +40,8 @@ class GetUniqueImageName:
         if not image_filename or image_filename == '':
             return os.path.join(self.model_instance, '')
         
-        splitted_image_name: list = image_filename.split('.')
-        image_extension = str(splitted_image_name[-1])
-        unique_string = str(uuid.uuid4().hex)
-        unique_image_name = unique_string + '.' + image_extension
+        image_extension = image_filename.rpartition('.')[2]
+        unique_image_name = uuid.uuid4().hex + '.' + image_extension
 
         return os.path.join(self.model_instance, unique_image_name)
 
@@ -0,0 +1,429 @@
+"""
+Bulk import/export of posters through Postgres 'COPY' ('import_posters' and 'export_posters' commands).
+
+Files are CSV (a header row, images joined by 'CSV_IMAGES_SEPARATOR') or NDJSON (one JSON object per line),
+with the 'EXPORT_COLUMNS' columns. Owners are referenced by username, categories by name.
+'Poster.save' is bypassed: phone numbers are standardized in worker processes, rows are copied
+into a staging table and inserted with 'ON CONFLICT (uuid) DO NOTHING', so a file can be imported again.
+"""
+import csv
+import io
+import itertools
+import json
+import os
+import tarfile
+import uuid
+import zipfile
+from concurrent.futures import Executor
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterable, Iterator, TextIO
+
+from django.contrib.auth.models import User
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import CharField, F, Func, OuterRef, Value
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..constants import RECOMMENDED_POSTERS_CACHE_KEY, CATEGORIES_CACHE_KEY, ESTIMATED_POSTERS_COUNT_CACHE_KEY
+from ..models import Poster, PosterCategories, PosterImages
+from .page_cache_logic import invalidate_page_cache
+from .phone_number_logic import standardize_phone_numbers
+from .poster_currency_logic import CURRENCY_CODES
+
+
+TRANSFER_FORMATS = ('csv', 'ndjson')
+# Exported column -> column of the export query.
+EXPORT_COLUMNS = {
+    'uuid': 'uuid',
+    'owner': 'owner_username',
+    'category': 'category_name',
+    'status': 'status',
+    'created': 'created',
+    'phone_number': 'phone_number',
+    'email': 'email',
+    'header': 'header',
+    'description': 'description',
+    'price': 'price',
+    'currency': 'currency',
+    'images': 'image_paths',
+}
+REQUIRED_COLUMNS = ('phone_number', 'header', 'description', 'price', 'currency')
+# 'Poster' columns written by the import (the others keep their defaults).
+IMPORT_COLUMNS = (
+    'uuid', 'owner_id', 'category_id', 'status', 'created', 'phone_number',
+    'email', 'header', 'description', 'price', 'currency')
+# Columns checked against the 'Poster' field max length (COPY fails the batch on a too long value).
+MAX_LENGTH_COLUMNS = ('phone_number', 'email', 'header', 'description')
+# 'status' values of the CSV ('COPY' writes 't'/'f') and NDJSON files.
+STATUS_VALUES = {'t': True, 'true': True, '1': True, 'f': False, 'false': False, '0': False}
+CSV_IMAGES_SEPARATOR = '|'
+IMPORTED_IMAGES_SUBDIRECTORY = 'poster_images/imported'
+PHONE_NUMBERS_CHUNK_SIZE = 1000
+
+
+def get_transfer_format(path: str, file_format: str | None = None) -> str:
+    """The given format or the one of the file extension ('.csv', '.ndjson', '.jsonl')."""
+    if file_format is None:
+        extension = os.path.splitext(path)[1].lower()
+        file_format = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}.get(extension)
+    if file_format not in TRANSFER_FORMATS:
+        raise ValueError(f"Unknown format of ({path}). Chose from {TRANSFER_FORMATS}.")
+    return file_format
+
+
+def refresh_catalog_caches() -> None:
+    """Fresh planner statistics and caches after a bulk write (it bypasses the signals)."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {Poster._meta.db_table}, {PosterImages._meta.db_table}")
+    cache.delete_many([RECOMMENDED_POSTERS_CACHE_KEY, CATEGORIES_CACHE_KEY, ESTIMATED_POSTERS_COUNT_CACHE_KEY])
+    invalidate_page_cache()
+
+
+#region: EXPORT
+
+class CopyTextUnescaper:
+    """
+    Writable file undoing the 'COPY ... TO STDOUT' text format escaping of a single JSON column.
+    JSON has no raw tabs or newlines, so doubled backslashes are the only escapes.
+    :Param output: Binary file the rows are written to.
+    """
+
+    def __init__(self, output: BinaryIO) -> None:
+        self.output = output
+        self.pending = b''
+
+    def write(self, data: bytes) -> None:
+        data = self.pending + bytes(data)
+        # An odd trailing backslash is the first half of a pair split between the chunks.
+        trailing_backslashes = len(data) - len(data.rstrip(b'\\'))
+        split = len(data) - trailing_backslashes % 2
+        data, self.pending = data[:split], data[split:]
+        self.output.write(data.replace(b'\\\\', b'\\'))
+
+
+def get_export_queryset(file_format: str) -> QuerySet:
+    """Not deleted posters with the owner username, the category name and the image paths."""
+    image_paths = ArraySubquery(
+        PosterImages.objects.filter(poster_id=OuterRef('pk')).order_by('id').values('image_path'))
+    if file_format == 'csv':
+        image_paths = Func(image_paths, Value(CSV_IMAGES_SEPARATOR), function='ARRAY_TO_STRING',
+                           output_field=CharField())
+    return Poster.alive.order_by('id').annotate(
+        owner_username=F('owner__username'),
+        category_name=F('category__name'),
+        image_paths=image_paths,
+    ).values(*EXPORT_COLUMNS.values())
+
+
+def export_posters(output: BinaryIO, file_format: str) -> int:
+    """
+    Stream all not deleted posters to the file with 'COPY ... TO STDOUT'. Returns the number of rows.
+    :Param output: Binary file.
+    :Param file_format: 'csv' or 'ndjson'.
+    """
+    sql, params = get_export_queryset(file_format).query.sql_with_params()
+    quote_name = connection.ops.quote_name
+    columns = ', '.join(f"{quote_name(column)} AS {quote_name(name)}" for name, column in EXPORT_COLUMNS.items())
+
+    with connection.cursor() as cursor:
+        query = cursor.mogrify(f"SELECT {columns} FROM ({sql}) posters", params).decode()
+        if file_format == 'csv':
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", output)
+        else:
+            cursor.copy_expert(f"COPY (SELECT row_to_json(export) FROM ({query}) export) TO STDOUT",
+                               CopyTextUnescaper(output))
+        return cursor.rowcount
+
+#endregion
+
+#region: IMPORT
+
+def read_records(input_file: TextIO, file_format: str) -> Iterator[dict]:
+    """Records of a CSV or NDJSON file, 'images' is always a list."""
+    if file_format == 'csv':
+        records = csv.DictReader(input_file)
+    else:
+        records = (json.loads(line) for line in input_file if line.strip())
+
+    for record in records:
+        images = record.get('images') or []
+        if isinstance(images, str):
+            images = images.split(CSV_IMAGES_SEPARATOR)
+        record['images'] = [image for image in images if image]
+        yield record
+
+
+def parse_status(value) -> bool | None:
+    """'status' of a record, None if it's not a boolean."""
+    if value in (None, ''):
+        return True
+    if isinstance(value, bool):
+        return value
+    return STATUS_VALUES.get(str(value).strip().lower())
+
+
+def parse_created(value, now: datetime) -> datetime | None:
+    """'created' of a record (naive values are in the current time zone), None if it's not a timestamp."""
+    if value in (None, ''):
+        return now
+    try:
+        created = parse_datetime(str(value))
+    except ValueError:
+        return None
+    if created is not None and timezone.is_naive(created):
+        created = timezone.make_aware(created)
+    return created
+
+
+def parse_price(value) -> Decimal | None:
+    """'price' of a record, None if it's not a number fitting 'Poster.price'."""
+    field = Poster._meta.get_field('price')
+    try:
+        price = Decimal(str(value))
+    except InvalidOperation:
+        return None
+    if not price.is_finite() or abs(price) >= 10 ** (field.max_digits - field.decimal_places):
+        return None
+    return price
+
+
+def standardize_phone_numbers_chunk(phone_numbers: list[str], region: str = 'RU') -> list[str | None]:
+    """Worker process function: standardized numbers, None for the invalid ones."""
+    return standardize_phone_numbers(phone_numbers, region=region)
+
+
+class ImagesSource:
+    """
+    Image files of the imported posters: a local directory, a '.zip' or a tar archive.
+    Without a source the image paths must already exist in the media storage.
+    Every image row gets its own stored copy, even when posters share a source file:
+    the image deleters (the purge, 'PosterImages.delete') don't count references.
+    :Param path: Directory or archive path [default=None].
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self.archive = None
+        # Paths stored by the running batch, deleted if the batch is rolled back.
+        self.stored = []
+        if path is None or os.path.isdir(path):
+            return
+        if zipfile.is_zipfile(path):
+            self.archive = zipfile.ZipFile(path)
+            self.read_member = self.archive.read
+        elif tarfile.is_tarfile(path):
+            self.archive = tarfile.open(path)
+            self.read_member = lambda name: self.archive.extractfile(name).read()
+        else:
+            raise ValueError(f"Images source ({path}) is neither a directory nor a zip/tar archive.")
+
+    def read(self, name: str) -> bytes | None:
+        if self.archive is not None:
+            try:
+                return self.read_member(name)
+            except (KeyError, AttributeError):
+                return None
+
+        # Image names come from the imported file, they must not point outside the directory.
+        directory = os.path.realpath(self.path)
+        image_path = os.path.realpath(os.path.join(directory, name))
+        if os.path.commonpath([directory, image_path]) != directory or not os.path.isfile(image_path):
+            return None
+        with open(image_path, 'rb') as image_file:
+            return image_file.read()
+
+    def store(self, name: str) -> str | None:
+        """Media storage path of a new copy of the image, None if the source doesn't have it."""
+        if self.path is None:
+            return name
+        image_data = self.read(name)
+        if image_data is None:
+            return None
+        stored_path = default_storage.save(
+            f"{IMPORTED_IMAGES_SUBDIRECTORY}/{os.path.basename(name)}", ContentFile(image_data),
+            max_length=PosterImages._meta.get_field('image_path').max_length)
+        self.stored.append(stored_path)
+        return stored_path
+
+    def commit(self) -> None:
+        """The batch is committed, its files are referenced by the image rows."""
+        self.stored = []
+
+    def discard(self) -> None:
+        """Delete the files stored by the batch (its rows were rolled back)."""
+        for stored_path in self.stored:
+            default_storage.delete(stored_path)
+        self.stored = []
+
+    def close(self) -> None:
+        if self.archive is not None:
+            self.archive.close()
+
+
+def copy_to_table(cursor, table: str, columns: Iterable[str], rows: Iterable[Iterable]) -> None:
+    """'COPY ... FROM STDIN' of the rows (None is NULL)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['' if value is None else value for value in row])
+    buffer.seek(0)
+    quote_name = connection.ops.quote_name
+    cursor.copy_expert(
+        f"COPY {quote_name(table)} ({', '.join(quote_name(column) for column in columns)}) "
+        f"FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+class PosterImporter:
+    """
+    Imports poster records in batches, one transaction per batch.
+    Categories are resolved through an in-memory name -> id map (missing ones are created),
+    owners through a username -> id map filled per batch.
+    :Param images_source: Source of the image files.
+    :Param executor: Process pool standardizing the phone numbers, None - in this process [default=None].
+    :Param default_owner: Username of the owner of the records with an unknown owner,
+    None - such records are rejected [default=None].
+    :Param region: Region of the phone numbers without a country code [default='RU'].
+    """
+
+    def __init__(self, images_source: ImagesSource, executor: Executor | None = None,
+                 default_owner: str | None = None, region: str = 'RU') -> None:
+        self.images_source = images_source
+        self.executor = executor
+        self.region = region
+        self.categories = dict(PosterCategories.objects.values_list('name', 'id'))
+        self.owners = {}
+        self.default_owner_id = User.objects.get(username=default_owner).id if default_owner else None
+        self.report = {'posters': 0, 'skipped': 0, 'rejected': 0, 'images': 0}
+
+    def import_records(self, records: Iterable[dict], batch_size: int = 10000) -> Iterator[dict[str, int]]:
+        """Import the records, yields the running report after every batch."""
+        records = iter(records)
+        while batch := list(itertools.islice(records, batch_size)):
+            self.import_batch(batch)
+            yield self.report
+
+    def standardize_phone_numbers(self, phone_numbers: list[str]) -> list[str | None]:
+        chunks = [phone_numbers[start:start + PHONE_NUMBERS_CHUNK_SIZE]
+                  for start in range(0, len(phone_numbers), PHONE_NUMBERS_CHUNK_SIZE)]
+        if self.executor is None:
+            results = (standardize_phone_numbers_chunk(chunk, self.region) for chunk in chunks)
+        else:
+            results = self.executor.map(standardize_phone_numbers_chunk, chunks, itertools.repeat(self.region))
+        return list(itertools.chain.from_iterable(results))
+
+    def resolve_owners(self, usernames: set[str]) -> None:
+        missing = usernames - self.owners.keys()
+        if missing:
+            self.owners.update(User.objects.filter(username__in=missing).values_list('username', 'id'))
+
+    def resolve_categories(self, names: set[str]) -> None:
+        missing = names - self.categories.keys()
+        if missing:
+            PosterCategories.objects.bulk_create(
+                [PosterCategories(name=name) for name in missing], ignore_conflicts=True)
+            self.categories.update(PosterCategories.objects.filter(name__in=missing).values_list('name', 'id'))
+
+    def make_row(self, record: dict, phone_number: str | None, now: datetime) -> tuple | None:
+        """
+        'IMPORT_COLUMNS' values of the record, None if it's rejected.
+        Values failing in 'COPY' would fail the whole batch, so every copied value is checked here.
+        """
+        owner_id = self.owners.get(record.get('owner'), self.default_owner_id)
+        if (owner_id is None or phone_number is None or record.get('currency') not in CURRENCY_CODES
+                or any(record.get(column) in (None, '') for column in REQUIRED_COLUMNS)):
+            return None
+        values = {column: str(record.get(column) or '') for column in MAX_LENGTH_COLUMNS}
+        values['phone_number'] = phone_number
+        if any(len(values[column]) > Poster._meta.get_field(column).max_length for column in MAX_LENGTH_COLUMNS):
+            return None
+        # Without an images source the paths are copied as they are.
+        if self.images_source.path is None and any(
+                len(image) > PosterImages._meta.get_field('image_path').max_length for image in record['images']):
+            return None
+        try:
+            poster_uuid = uuid.UUID(str(record['uuid'])) if record.get('uuid') else uuid.uuid4()
+        except ValueError:
+            return None
+        status = parse_status(record.get('status'))
+        created = parse_created(record.get('created'), now)
+        price = parse_price(record['price'])
+        if status is None or created is None or price is None:
+            return None
+        return (
+            poster_uuid,
+            owner_id,
+            self.categories.get(record.get('category')),
+            status,
+            created.isoformat(),
+            phone_number,
+            values['email'] or None,
+            values['header'],
+            values['description'],
+            price,
+            record['currency'],
+        )
+
+    def import_batch(self, records: list[dict]) -> None:
+        phone_numbers = self.standardize_phone_numbers([str(record.get('phone_number') or '') for record in records])
+        self.resolve_owners({record['owner'] for record in records if record.get('owner')})
+        self.resolve_categories({record['category'] for record in records if record.get('category')})
+
+        now = timezone.now()
+        rows, images = [], {}
+        for record, phone_number in zip(records, phone_numbers):
+            row = self.make_row(record, phone_number, now)
+            if row is None:
+                self.report['rejected'] += 1
+                continue
+            rows.append(row)
+            images[row[0]] = record['images']
+
+        if not rows:
+            return
+
+        try:
+            inserted, image_rows = self.copy_batch(rows, images)
+        except Exception:
+            # Image files stored for the rolled back rows would be orphaned.
+            self.images_source.discard()
+            raise
+        self.images_source.commit()
+
+        self.report['posters'] += len(inserted)
+        self.report['skipped'] += len(rows) - len(inserted)
+        self.report['images'] += len(image_rows)
+
+    def copy_batch(self, rows: list[tuple], images: dict[uuid.UUID, list[str]]) -> tuple[list, list]:
+        """Insert the rows and the image rows of the inserted posters in one transaction."""
+        poster_table = Poster._meta.db_table
+        quote_name = connection.ops.quote_name
+        columns = ', '.join(quote_name(column) for column in IMPORT_COLUMNS)
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Dropped explicitly: 'ON COMMIT DROP' would wait for an outer transaction.
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE poster_import AS "
+                f"SELECT {columns} FROM {quote_name(poster_table)} WITH NO DATA")
+            copy_to_table(cursor, 'poster_import', IMPORT_COLUMNS, rows)
+            cursor.execute(
+                f"INSERT INTO {quote_name(poster_table)} ({columns}) SELECT {columns} FROM poster_import "
+                f"ON CONFLICT (uuid) DO NOTHING RETURNING id, uuid")
+            inserted = cursor.fetchall()
+            cursor.execute("DROP TABLE poster_import")
+
+            image_rows = [
+                (poster_id, image_path)
+                for poster_id, poster_uuid in inserted
+                for image_path in map(self.images_source.store, images[uuid.UUID(str(poster_uuid))]) if image_path
+            ]
+            copy_to_table(cursor, PosterImages._meta.db_table,
+                          (PosterImages.poster_id.field.column, 'image_path'), image_rows)
+
+        return inserted, image_rows
+
+#endregion
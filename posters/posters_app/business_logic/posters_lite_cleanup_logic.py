@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import PosterLite, PosterLiteImages
+from .process_images_logic import delete_image_files
+from .bulk_delete_logic import delete_rows
+
+
+def delete_expired_posters_lite_batch(batch_size: int, expired_before=None) -> dict[str, int]:
+    """
+    Delete one batch of expired lite posters ('PosterLite.expires'), their image rows and image files.
+    Rows are locked with 'SKIP LOCKED', so concurrent runs (and edits of the locked rows) never wait for each other.
+    Files are deleted after the transaction is committed.
+    :Param batch_size: Max number of lite posters in the batch.
+    :Param expired_before: Delete lite posters expired before this timestamp [default=now].
+    """
+    if expired_before is None:
+        expired_before = timezone.now()
+
+    with transaction.atomic():
+        poster_lite_ids = list(
+            PosterLite.objects.filter(expires__lt=expired_before)
+            .select_for_update(skip_locked=True)
+            .order_by('expires')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not poster_lite_ids:
+            return {'posters_lite': 0, 'images': 0, 'bytes': 0}
+
+        image_paths = list(PosterLiteImages.objects.filter(
+            poster_id__in=poster_lite_ids).values_list('image_path', flat=True))
+        delete_rows(PosterLiteImages, PosterLiteImages.poster_id.field.column, poster_lite_ids)
+        delete_rows(PosterLite, PosterLite._meta.pk.column, poster_lite_ids)
+
+    return {
+        'posters_lite': len(poster_lite_ids),
+        'images': len(image_paths),
+        'bytes': delete_image_files(image_paths),
+    }
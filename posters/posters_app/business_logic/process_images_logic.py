@@ -2,17 +2,23 @@ from __future__ import annotations
 
 
 import io
+from functools import lru_cache
 
 from django.forms.models import BaseModelFormSet
 from django.shortcuts import get_object_or_404
 from django.http.response import FileResponse
 from django.db import models
-from django.core.cache import cache
+from django.core.cache.backends.base import BaseCache
+from django.core.files.storage import default_storage
+from typing_extensions import Iterable
 
 from ..constants import (
     DEFAULT_IMAGE,
-    DEFAULT_IMAGE_FULL_PATH)
+    DEFAULT_IMAGE_FULL_PATH,
+    IMAGE_FILE_CACHE_KEY_PREFIX,
+    IMAGE_FILE_CACHE_TIMEOUT)
 from ..models import PosterImages
+from .query_fetchers_logic import get_from_cache_or_query
 
 
 def get_default_image_response(default_image_full_path: str = DEFAULT_IMAGE_FULL_PATH, content_type: str = 'image/jpeg') -> FileResponse:
@@ -23,11 +29,20 @@ def get_default_image_response(default_image_full_path: str = DEFAULT_IMAGE_FULL
     :Param content_type: the default image content type. Default is 'image/jpeg'.
     """
     return FileResponse(
-        io.BytesIO(get_image_data(default_image_full_path)),
+        io.BytesIO(get_default_image_data(default_image_full_path)),
         content_type='image/jpeg'
     )
 
 
+@lru_cache(maxsize=4)
+def get_default_image_data(default_image_full_path: str = DEFAULT_IMAGE_FULL_PATH) -> bytes:
+    """
+    Bytes of the default image, read once per process (loaded before the fork by 'posters.warmup').
+    :Param default_image_full_path: The full path to the default image.
+    """
+    return get_image_data(default_image_full_path)
+
+
 def get_image_data(image_path: str) -> bytes:
     """
     Read image data using a context manager and return image data in bytes..
@@ -74,17 +89,34 @@ def get_safe_image_path_by_image_path(
     return image.image_path.path
 
 
+def make_image_file_cache_key(image_path: str) -> str:
+    return f'{IMAGE_FILE_CACHE_KEY_PREFIX}={image_path}'
+
+
+def get_cached_image_data(
+        image_path: str,
+        cache_backend: BaseCache | None = None,
+        cache_timeout: int = IMAGE_FILE_CACHE_TIMEOUT) -> bytes:
+    """
+    Image bytes from the cache, read from the storage on a miss.
+    :Param image_path: Full path to the image.
+    :Param cache_backend: Cache to use instead of the default one, e.g. a simulated cache [default=None].
+    :Param cache_timeout: Timeout for the cache entry (in seconds) [default=IMAGE_FILE_CACHE_TIMEOUT].
+    """
+    return get_from_cache_or_query(
+        fetch_func=lambda: get_image_data(image_path=image_path),
+        cache_key=make_image_file_cache_key(image_path),
+        cache_enabled=True,
+        cache_timeout=cache_timeout,
+        cache_backend=cache_backend
+    )
+
+
 def get_image_by_image_id_response(image_id: int | None) -> FileResponse:
     try:
         image_path = get_safe_image_path_by_image_id(
             PosterImages, image_id=image_id)
-
-        # Caching
-        image_file_cache_key = f'image_by_id={image_path}'
-        image_file_data = cache.get(image_file_cache_key)
-        if not image_file_data:
-            image_file_data = get_image_data(image_path=image_path)
-            cache.set(image_file_cache_key, image_file_data, 60*3)
+        image_file_data = get_cached_image_data(image_path)
 
         return FileResponse(io.BytesIO(image_file_data), content_type='image/jpeg')
     except PosterImages.DoesNotExist:
@@ -106,6 +138,26 @@ def get_image_by_image_path_response(image_path: str) -> FileResponse:
         return get_default_image_response()
 
 
+def delete_image_files(image_paths: Iterable[str]) -> int:
+    """
+    Delete image files from the media storage. The default image is never deleted.
+    Returns the number of freed bytes.
+    :Param image_paths: Image paths as they are stored in the 'ImageField' field in a model.
+    """
+    freed_bytes = 0
+    for image_path in set(image_paths):
+        if not image_path or image_path in (DEFAULT_IMAGE, DEFAULT_IMAGE_FULL_PATH):
+            continue
+        try:
+            freed_bytes += default_storage.size(image_path)
+            default_storage.delete(image_path)
+        except (OSError, ValueError):
+            # Already deleted or the path is outside the media storage.
+            continue
+
+    return freed_bytes
+
+
 def save_image_for_poster(image: models.Model, poster: models.Model) -> None:
     """
     Save image model instance for a specific poster.
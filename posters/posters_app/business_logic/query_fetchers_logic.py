@@ -1,10 +1,20 @@
 from dataclasses import Field
+from datetime import timedelta
 from typing_extensions import Any, Callable
-from django.db.models import F, Func, DecimalField, DateTimeField, Q, Count
+from django.db.models import (
+    F, Func, DecimalField, DateTimeField, IntegerField, Q, Count, OuterRef, Subquery, Value)
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.db.models.query import QuerySet
-from ..models import Poster, PosterCategories
-from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import connection, models
+from django.conf import settings
+from django.utils import timezone
+from ..models import Poster, PosterCategories, PosterImages, ArchivedPoster
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.fields import ArrayField
 from django.core.cache import cache
+from django.core.cache.backends.base import BaseCache
+from posters.metrics import record_cache_lookup
+from posters.slow_queries import tag_fetcher
 
 
 # region: SQL functions
@@ -26,6 +36,38 @@ class RoundDecimal(Func):
             output_field = DecimalField()
         super().__init__(*expressions, output_field=output_field, **extra)
         self.template = f"%(function)s(%(expressions)s, {decimal_places})"
+
+
+def poster_image_ids() -> Coalesce:
+    """
+    ARRAY of the poster's image ids built by a correlated subquery (uses the 'poster_id' FK index).
+    Unlike 'ArrayAgg' over a JOIN it doesn't require 'GROUP BY', so listings can be read
+    straight from the '(..., created DESC)' indexes without sorting.
+    Posters without images get 'ARRAY[NULL]', the same as 'ArrayAgg' over the LEFT JOIN.
+    """
+    int_array = ArrayField(IntegerField())
+    return Coalesce(
+        NullIf(
+            ArraySubquery(PosterImages.objects.filter(
+                poster_id=OuterRef('pk')).order_by().values('id')),
+            Value([], output_field=int_array)
+        ),
+        Cast(Value([None]), output_field=int_array),
+        output_field=int_array
+    )
+
+
+def listing_window() -> Q:
+    """
+    Created date bound of the listings ('POSTERS_LISTING_WINDOW_DAYS', 0 - no bound).
+    Posters restored from the archive keep their 'created', they are listed for the window from the restore.
+    The bound is truncated to the day, so the SQL (and the cached querysets) stay the same for a day.
+    """
+    window_days = getattr(settings, 'POSTERS_LISTING_WINDOW_DAYS', 0)
+    if not window_days:
+        return Q()
+    bound = (timezone.now() - timedelta(days=window_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return Q(created__gte=bound) | Q(restored__gte=bound)
 # endregion
 
 
@@ -45,19 +87,21 @@ class QueryFetchers:
             print(f" - {method}")
 
     @staticmethod
+    @tag_fetcher
     def fetch_posters() -> QuerySet:
-        """Helper function to fetch recommended posters."""
-        return Poster.objects.annotate(
-            image_ids=ArrayAgg('poster_images__id'),
+        """Helper function to fetch recommended posters (active, listed in 'listing_window', the newest first)."""
+        return Poster.alive.filter(listing_window(), status=True).annotate(
+            image_ids=poster_image_ids(),
             formatted_created=FormatTimestamp(
                 'created', format_style='YYYY-MM-DD HH24:MI'),
             price_rounded=RoundDecimal('price', decimal_places=2)
-        )
+        ).order_by('-created')
 
     @staticmethod
+    @tag_fetcher
     def fetch_poster_by_id(poster_id) -> QuerySet:
-        return Poster.objects.filter(id=poster_id, status=True).annotate(
-            image_ids=ArrayAgg('poster_images__id'),
+        return Poster.alive.filter(id=poster_id, status=True).annotate(
+            image_ids=poster_image_ids(),
             formatted_created=FormatTimestamp(
                 'created', format_style='YYYY-MM-DD HH24:MI'),
             price_rounded=RoundDecimal('price', decimal_places=2),
@@ -65,48 +109,89 @@ class QueryFetchers:
         ).first()
 
     @staticmethod
+    @tag_fetcher
     def fetch_posters_by_category(category_name) -> QuerySet:
-        """Retrieve a Queryset of posters filtered by category."""
-        return Poster.objects.filter(category__name=category_name).annotate(
-            image_ids=ArrayAgg('poster_images__id'),
+        """
+        Retrieve a Queryset of active posters (in 'listing_window') filtered by category (the newest first).
+        The category id is resolved by a scalar subquery, so posters are read
+        in the '(category_id, status, created DESC)' index order.
+        """
+        category_id = PosterCategories.objects.filter(name=category_name).values('id')[:1]
+        return Poster.alive.filter(listing_window(), category=Subquery(category_id), status=True).annotate(
+            image_ids=poster_image_ids(),
             formatted_created=FormatTimestamp(
                 'created', format_style='YYYY-MM-DD HH24:MI'),
             price_rounded=RoundDecimal('price', decimal_places=2)
-        )
+        ).order_by('-created')
 
     @staticmethod
+    @tag_fetcher
     def fetch_categories_and_count_posters() -> QuerySet:
-        """Retrieve categories and count number of posters in each category."""
+        """Retrieve categories and count number of active posters (in 'listing_window') in each category."""
+        posters_count = Poster.alive.filter(listing_window(), category=OuterRef('pk'), status=True).order_by().values(
+            'category').annotate(posters_count=Count('*')).values('posters_count')
         return PosterCategories.objects.annotate(
-            posters_in_category=(Count('poster')))
-    
+            posters_in_category=Coalesce(Subquery(posters_count), 0)).order_by('name')
+
     @staticmethod
+    @tag_fetcher
     def fetch_users_posters(user_id: int) -> QuerySet:
-        """Fetch posters filtered by user id."""
-        return Poster.objects.filter(owner=user_id)
+        """Fetch posters filtered by user id (the newest first)."""
+        return Poster.alive.filter(owner=user_id).order_by('-created')
+
+    @staticmethod
+    @tag_fetcher
+    def fetch_users_archived_posters(user_id: int) -> QuerySet:
+        """Fetch archived posters filtered by user id (the newest first)."""
+        return ArchivedPoster.objects.filter(owner=user_id).order_by('-created')
+
+    @staticmethod
+    @tag_fetcher
+    def fetch_estimated_rows_count(model: models.Model) -> int | None:
+        """
+        Fetch the planner's estimate of rows in the model table ('pg_class.reltuples').
+        Return None if the table has never been analyzed (vacuumed) yet.
+        :Param model: A Django ORM model.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
 
 
 def get_from_cache_or_query(
         fetch_func: Callable,
         cache_key: str | None = None,
         cache_enabled: bool = True,
-        cache_timeout: int = 60) -> QuerySet:
+        cache_timeout: int = 60,
+        cache_backend: BaseCache | None = None) -> QuerySet:
     """
     Handles retrieving from cache or querying the database if not cached.
     :param fetch_func: Function to fetch data if cache is empty.
     :param cache_key: Cache key for the query result [default=None].
     :param cache_enabled: Whether caching is enabled or not [default=True].
     :param cache_timeout: Timeout for the cache entry (in seconds) [default=60].
+    :param cache_backend: Cache to use instead of the default one, e.g. a simulated cache [default=None].
     :return: QuerySet with the result of the fetch_func.
     """
 
     if not cache_enabled:
         return fetch_func()
 
-    cached_data = cache.get(cache_key)
+    if cache_backend is None:
+        cache_backend = cache
+    cached_data = cache_backend.get(cache_key)
+    if cache_backend is cache:
+        record_cache_lookup(cache_key, hit=bool(cached_data))
 
     if not cached_data:
         cached_data = fetch_func()
-        cache.set(cache_key, cached_data, cache_timeout)
+        cache_backend.set(cache_key, cached_data, cache_timeout)
 
     return cached_data
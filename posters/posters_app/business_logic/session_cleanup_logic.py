@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.utils import timezone
+
+from ..constants import SESSION_ORPHANS_SET_NULL, SESSION_ORPHANS_DELETE
+from ..models import Poster, PosterLite, PosterLiteImages
+from .process_images_logic import delete_image_files
+from .bulk_delete_logic import delete_rows
+
+
+def get_orphans_policy() -> str:
+    """What happens to 'PosterLite' rows of expired sessions ('SESSIONS_CLEANUP_ORPHANS_POLICY')."""
+    return getattr(settings, 'SESSIONS_CLEANUP_ORPHANS_POLICY', SESSION_ORPHANS_SET_NULL)
+
+
+def clear_expired_sessions_batch(batch_size: int, expired_before=None, orphans_policy: str | None = None) -> dict[str, int]:
+    """
+    Delete one batch of expired 'django_session' rows and detach (or delete) their dependents.
+    Rows are locked with 'SKIP LOCKED', so concurrent runs never wait for each other.
+    Dependents are updated with one statement per relation for the whole batch.
+    Image files of deleted lite posters are deleted after the transaction is committed.
+    :Param batch_size: Max number of sessions in the batch.
+    :Param expired_before: Delete sessions expired before this timestamp [default=now].
+    :Param orphans_policy: 'set_null' or 'delete' [default=settings.SESSIONS_CLEANUP_ORPHANS_POLICY].
+    """
+    if expired_before is None:
+        expired_before = timezone.now()
+    orphans_policy = orphans_policy or get_orphans_policy()
+    if orphans_policy not in (SESSION_ORPHANS_SET_NULL, SESSION_ORPHANS_DELETE):
+        raise ValueError(
+            f"Orphans policy ({orphans_policy}) is not supported! "
+            f"Chose from ({SESSION_ORPHANS_SET_NULL}, {SESSION_ORPHANS_DELETE}).")
+
+    image_paths = []
+    with transaction.atomic():
+        session_keys = list(
+            Session.objects.filter(expire_date__lt=expired_before)
+            .select_for_update(skip_locked=True)
+            .order_by('expire_date')
+            .values_list('session_key', flat=True)[:batch_size]
+        )
+        if not session_keys:
+            return {'sessions': 0, 'posters_lite': 0, 'images': 0, 'bytes': 0}
+
+        if orphans_policy == SESSION_ORPHANS_DELETE:
+            poster_lite_ids = list(PosterLite.objects.filter(
+                owner__in=session_keys).values_list('id', flat=True))
+            image_paths = list(PosterLiteImages.objects.filter(
+                poster_id__in=poster_lite_ids).values_list('image_path', flat=True))
+            delete_rows(PosterLiteImages, PosterLiteImages.poster_id.field.column, poster_lite_ids)
+            delete_rows(PosterLite, PosterLite._meta.pk.column, poster_lite_ids)
+            posters_lite = len(poster_lite_ids)
+        else:
+            posters_lite = PosterLite.objects.filter(owner__in=session_keys).update(owner=None)
+
+        PosterLite.objects.filter(client__in=session_keys).update(client=None)
+        Poster.objects.filter(client__in=session_keys).update(client=None)
+        # The dependents are detached above.
+        delete_rows(Session, Session._meta.pk.column, session_keys)
+
+    return {
+        'sessions': len(session_keys),
+        'posters_lite': posters_lite,
+        'images': len(image_paths),
+        'bytes': delete_image_files(image_paths),
+    }
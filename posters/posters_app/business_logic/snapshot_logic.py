@@ -0,0 +1,110 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import reverse
+from django.utils import translation
+
+from posters.routers import use_primary
+from ..models import Poster
+
+
+# region: PATHS
+
+def get_snapshots_root() -> str:
+    """Directory served by nginx ('POSTER_SNAPSHOTS_ROOT')."""
+    return str(settings.POSTER_SNAPSHOTS_ROOT)
+
+
+def get_snapshot_path(poster_id: int, language: str) -> str:
+    """
+    Snapshot file of a poster page, mirrors the page URL, so nginx can look it up by '$uri'.
+    E.g. '/en/posters/poster/5' -> '<POSTER_SNAPSHOTS_ROOT>/en/posters/poster/5/index.html'.
+    :Param poster_id: Poster id.
+    :Param language: Language code (the 'i18n_patterns' prefix).
+    """
+    with translation.override(language):
+        url_path = reverse('posters_app:poster_view', args=(poster_id,))
+    return os.path.join(get_snapshots_root(), url_path.strip('/'), 'index.html')
+
+# endregion
+
+# region: BUSINESS LOGIC
+
+def render_poster_snapshot(poster_id: int, language: str) -> str:
+    """
+    Render the 'PosterView' page as an anonymous visitor sees it (no owner panel, no CSRF token).
+    :Param poster_id: Id of an active poster.
+    :Param language: Language code the page is rendered in.
+    """
+    # Imported here, 'views' imports the tasks scheduling the snapshots.
+    from ..views import PosterView
+
+    with translation.override(language):
+        request = HttpRequest()
+        request.method = 'GET'
+        request.path = request.path_info = reverse('posters_app:poster_view', args=(poster_id,))
+        request.user = AnonymousUser()
+        response = PosterView.as_view()(request, poster_id=poster_id)
+        response.render()
+    return response.content.decode(response.charset)
+
+
+def write_file_atomically(path: str, content: str) -> None:
+    """
+    Write a file via a temporary file in the same directory and 'os.replace',
+    so readers (nginx) see either the old or the new file, never a partial one.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-', suffix='.tmp')
+    try:
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as snapshot_file:
+            snapshot_file.write(content)
+        # 'mkstemp' creates files readable by the owner only.
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def remove_poster_snapshot(poster_id: int) -> int:
+    """
+    Remove snapshots of a poster in all languages. Returns the number of removed files.
+    :Param poster_id: Poster id.
+    """
+    removed = 0
+    for language, _ in settings.LANGUAGES:
+        try:
+            os.remove(get_snapshot_path(poster_id, language))
+            removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+def publish_poster_snapshot(poster_id: int) -> int:
+    """
+    Render snapshots of a poster in all languages ('LANGUAGES').
+    Inactive or deleted posters get their snapshots removed instead.
+    The poster is read from the primary DB, replicas may not have the write yet.
+    Returns the number of written files.
+    :Param poster_id: Poster id.
+    """
+    with use_primary():
+        if not Poster.alive.filter(id=poster_id, status=True).exists():
+            remove_poster_snapshot(poster_id)
+            return 0
+
+        for language, _ in settings.LANGUAGES:
+            write_file_atomically(
+                get_snapshot_path(poster_id, language),
+                render_poster_snapshot(poster_id, language)
+            )
+    return len(settings.LANGUAGES)
+
+# endregion
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Poster, PosterImages
+from .process_images_logic import delete_image_files
+from .bulk_delete_logic import delete_rows
+
+
+def get_purge_threshold() -> timedelta:
+    """Soft deleted posters older than this delay are purged ('POSTERS_PURGE_DELAY_HOURS')."""
+    return timedelta(hours=getattr(settings, 'POSTERS_PURGE_DELAY_HOURS', 24))
+
+
+def purge_deleted_posters_batch(batch_size: int, deleted_before=None) -> dict[str, int]:
+    """
+    Hard delete one batch of soft deleted posters, their image rows and image files.
+    Rows are locked with 'SKIP LOCKED', so concurrent purges never wait for each other.
+    Files are deleted after the transaction is committed.
+    :Param batch_size: Max number of posters in the batch.
+    :Param deleted_before: Purge posters deleted before this timestamp [default=now - POSTERS_PURGE_DELAY_HOURS].
+    """
+    if deleted_before is None:
+        deleted_before = timezone.now() - get_purge_threshold()
+
+    with transaction.atomic():
+        poster_ids = list(
+            Poster.objects.filter(deleted__lt=deleted_before)
+            .select_for_update(skip_locked=True)
+            .order_by('deleted')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not poster_ids:
+            return {'posters': 0, 'images': 0, 'bytes': 0}
+
+        image_paths = list(PosterImages.objects.filter(
+            poster_id__in=poster_ids).values_list('image_path', flat=True))
+        # Soft deleted posters are not listed anymore, the page cache doesn't change.
+        delete_rows(PosterImages, PosterImages.poster_id.field.column, poster_ids)
+        delete_rows(Poster, Poster._meta.pk.column, poster_ids)
+
+    return {
+        'posters': len(poster_ids),
+        'images': len(image_paths),
+        'bytes': delete_image_files(image_paths),
+    }
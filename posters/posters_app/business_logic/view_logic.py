@@ -3,10 +3,15 @@
 from django.db.models import Q
 from django.db.models.query import QuerySet
 from .query_fetchers_logic import QueryFetchers, get_from_cache_or_query
+from ..models import Poster
 
 from ..constants import (
     CATEGORIES_CACHE_KEY,
     RECOMMENDED_POSTERS_CACHE_KEY,
+    ESTIMATED_POSTERS_COUNT_CACHE_KEY,
+    RECOMMENDED_POSTERS_CACHE_TIMEOUT,
+    CATEGORIES_CACHE_TIMEOUT,
+    ESTIMATED_POSTERS_COUNT_CACHE_TIMEOUT,
 )
 
 
@@ -36,7 +41,7 @@ class FrequentQueries:
             fetch_func=QueryFetchers.fetch_posters,
             cache_key=RECOMMENDED_POSTERS_CACHE_KEY,
             cache_enabled=True,
-            cache_timeout=60 * 3
+            cache_timeout=RECOMMENDED_POSTERS_CACHE_TIMEOUT
         )
 
     def get_active_poster(poster_id: int) -> QuerySet:
@@ -61,7 +66,7 @@ class FrequentQueries:
             fetch_func=QueryFetchers.fetch_categories_and_count_posters,
             cache_enabled=True,
             cache_key=CATEGORIES_CACHE_KEY,
-            cache_timeout=60
+            cache_timeout=CATEGORIES_CACHE_TIMEOUT
         )
 
     def get_users_posters(user_id: int) -> QuerySet:
@@ -71,3 +76,31 @@ class FrequentQueries:
                 user_id=user_id),
             cache_enabled=False
         )
+
+    def get_users_archived_posters(user_id: int) -> QuerySet:
+        """Get users archived posters (a lazy queryset, evaluated only where it is rendered)."""
+        return get_from_cache_or_query(
+            fetch_func=lambda: QueryFetchers.fetch_users_archived_posters(
+                user_id=user_id),
+            cache_enabled=False
+        )
+
+    def get_estimated_posters_count() -> int:
+        """
+        Get the estimated number of posters (used by the 'approximate' pagination mode).
+        If the table statistics are not collected yet, fall back to the exact count.
+        """
+        return get_from_cache_or_query(
+            fetch_func=lambda: QueryFetchers.fetch_estimated_rows_count(
+                model=Poster) or Poster.alive.count(),
+            cache_key=ESTIMATED_POSTERS_COUNT_CACHE_KEY,
+            cache_enabled=True,
+            cache_timeout=ESTIMATED_POSTERS_COUNT_CACHE_TIMEOUT
+        )
+
+    def get_posters_in_category_count(category_name: str) -> int:
+        """Get the number of posters in a category from the cached categories counts."""
+        for category in FrequentQueries.get_poster_categories_w_count():
+            if category.name == category_name:
+                return category.posters_in_category
+        return 0
@@ -6,6 +6,30 @@ RECOMMENDED_POSTERS_CACHE_KEY = 'recommended_posters_cached'
 POSTER_VIEW_CACHE_KEY = 'poster_view_query_cached'
 CATEGORIES_CACHE_KEY = 'categories_cached'
 POSTERS_IN_CAT_QUERY_CACHE_KEY = 'posters_in_category_cached'
+ESTIMATED_POSTERS_COUNT_CACHE_KEY = 'estimated_posters_count_cached'
+IMAGE_FILE_CACHE_KEY_PREFIX = 'image_by_id'
+
+# Cache timeouts (in seconds), tuned with 'manage.py simulate_cache'.
+RECOMMENDED_POSTERS_CACHE_TIMEOUT = 60 * 3
+CATEGORIES_CACHE_TIMEOUT = 60
+ESTIMATED_POSTERS_COUNT_CACHE_TIMEOUT = 60 * 5
+IMAGE_FILE_CACHE_TIMEOUT = 60 * 3
 
 DEFAULT_IMAGE = "poster_images/default_image.jpg"
-DEFAULT_IMAGE_FULL_PATH = os.path.join(settings.MEDIA_ROOT, DEFAULT_IMAGE)
\ No newline at end of file
+DEFAULT_IMAGE_FULL_PATH = os.path.join(settings.MEDIA_ROOT, DEFAULT_IMAGE)
+
+# Pagination modes ('POSTERS_PAGINATION_MODE' setting).
+PAGINATION_MODE_EXACT = 'exact'
+PAGINATION_MODE_APPROXIMATE = 'approximate'
+PAGINATION_MODE_COUNT_FREE = 'count_free'
+
+# What happens to 'PosterLite' rows of expired sessions ('SESSIONS_CLEANUP_ORPHANS_POLICY' setting).
+SESSION_ORPHANS_SET_NULL = 'set_null'
+SESSION_ORPHANS_DELETE = 'delete'
+
+# Anonymous full-page cache.
+PAGE_CACHE_KEY_PREFIX = 'anonymous_page_cached'
+PAGE_CACHE_VERSION_KEY = 'anonymous_page_cache_version'
+
+# Fragment cache of the home page poster cards.
+POSTER_CARD_CACHE_KEY_PREFIX = 'poster_card_cached'
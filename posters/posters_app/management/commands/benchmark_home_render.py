@@ -0,0 +1,60 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from posters_app.views import HomePageView
+from posters_app.business_logic.poster_cards_logic import make_poster_card_cache_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the home page render time per page. "
+        "'cold' renders every poster card (as before the fragment cache), 'warm' takes the cards from the cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=3, help="Number of pages to render [default=3].")
+        parser.add_argument('--iterations', type=int, default=50, help="Renders per page and mode [default=50].")
+        parser.add_argument('--language', default='en', help="Language prefix of the page [default='en'].")
+
+    def handle(self, *args, **options):
+        view = HomePageView.as_view()
+        factory = RequestFactory()
+
+        # The anonymous page cache would short-circuit the rendering.
+        with override_settings(POSTERS_PAGE_CACHE_ENABLED=False), translation.override(options['language']):
+            url = reverse('posters_app:home')
+            self.stdout.write(f"{'page':>5} {'cold ms':>10} {'warm ms':>10} {'speedup':>8}")
+
+            for page_number in range(1, options['pages'] + 1):
+                request = factory.get(url, {'page': page_number})
+                request.user = AnonymousUser()
+                response = view(request)
+                response.render()
+                card_keys = [make_poster_card_cache_key(poster)
+                             for poster in response.context_data['page_obj'].object_list]
+
+                cold = self.measure(view, request, options['iterations'], card_keys=card_keys)
+                warm = self.measure(view, request, options['iterations'])
+                self.stdout.write(
+                    f"{page_number:>5} {cold:>10.2f} {warm:>10.2f} {cold / warm if warm else 0:>7.1f}x")
+
+    def measure(self, view, request, iterations: int, card_keys: list[str] | None = None) -> float:
+        """
+        Median time (ms) of rendering the page.
+        :Param card_keys: Poster card cache keys deleted before every render (cold cards) [default=None].
+        """
+        timings = []
+        for _ in range(iterations):
+            if card_keys:
+                cache.delete_many(card_keys)
+            start = time.perf_counter()
+            view(request).render()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,32 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posters_app.business_logic.poster_transfer_logic import TRANSFER_FORMATS, get_transfer_format, export_posters
+
+
+class Command(BaseCommand):
+    help = (
+        "Export all not deleted posters (with owner usernames, category names and image paths) "
+        "to CSV or NDJSON, streamed by Postgres COPY."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Output file, '-' for stdout.")
+        parser.add_argument('--format', choices=TRANSFER_FORMATS,
+                            help="File format [default=by the file extension, csv for stdout].")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            file_format = get_transfer_format(path, options['format'] or ('csv' if path == '-' else None))
+        except ValueError as error:
+            raise CommandError(error)
+
+        if path == '-':
+            exported = export_posters(sys.stdout.buffer, file_format)
+            sys.stdout.buffer.flush()
+        else:
+            with open(path, 'wb') as output:
+                exported = export_posters(output, file_format)
+        self.stderr.write(self.style.SUCCESS(f"Exported {exported} posters ({file_format})."))
@@ -0,0 +1,65 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from posters_app.business_logic.poster_transfer_logic import (
+    TRANSFER_FORMATS,
+    ImagesSource,
+    PosterImporter,
+    get_transfer_format,
+    read_records,
+    refresh_catalog_caches,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import posters from CSV or NDJSON (the 'export_posters' format) through Postgres COPY. "
+        "Phone numbers are standardized in worker processes, posters with an already imported uuid are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, '-' for stdin.")
+        parser.add_argument('--format', choices=TRANSFER_FORMATS,
+                            help="File format [default=by the file extension, csv for stdin].")
+        parser.add_argument('--images', help="Directory or zip/tar archive with the image files. "
+                                             "Without it the image paths must exist in the media storage.")
+        parser.add_argument('--default-owner', help="Username owning the posters with an unknown owner "
+                                                    "[default=such posters are rejected].")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help="Phone number worker processes, 0 - standardize in this process [default=CPU count].")
+        parser.add_argument('--batch-size', type=int, default=10000, help="Posters per transaction [default=10000].")
+        parser.add_argument('--region', default='RU', help="Region of the phone numbers without a country code [default=RU].")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            file_format = get_transfer_format(path, options['format'] or ('csv' if path == '-' else None))
+            images_source = ImagesSource(options['images'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        executor = ProcessPoolExecutor(options['workers']) if options['workers'] else None
+        input_file = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            importer = PosterImporter(images_source, executor=executor,
+                                      default_owner=options['default_owner'], region=options['region'])
+            for report in importer.import_records(read_records(input_file, file_format), options['batch_size']):
+                self.stdout.write(f"Imported {report['posters']} posters...")
+        except User.DoesNotExist:
+            raise CommandError(f"User ({options['default_owner']}) doesn't exist.")
+        finally:
+            if input_file is not sys.stdin:
+                input_file.close()
+            images_source.close()
+            if executor is not None:
+                executor.shutdown()
+
+        refresh_catalog_caches()
+        report = importer.report
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['posters']} posters with {report['images']} images, "
+            f"skipped {report['skipped']} already imported, rejected {report['rejected']} invalid."))
@@ -0,0 +1,180 @@
+import json
+import math
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db.models import Count
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import translation
+
+from posters_app.models import Poster, PosterImages
+from .seed_catalog import SEED_WORDS
+
+
+ENDPOINTS = ('home', 'category', 'search', 'poster', 'image')
+# Posters per page of 'HomePageView' and 'CategoryView'.
+HOME_PAGE_SIZE = 9
+CATEGORY_PAGE_SIZE = 10
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile.
+    :Param sorted_values: Ascending values.
+    :Param percent: E.g. 95.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: list[float], errors: int, duration: float) -> dict:
+    """Throughput and latency percentiles (ms) of one endpoint."""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / duration, 2) if duration else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the home, category, search, poster detail and image endpoints of a running server "
+        "with concurrent clients and report throughput and p50/p95/p99 latency per endpoint as JSON. "
+        "URLs are sampled from the catalog in the database (see 'seed_catalog')."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help="Server under test [default=http://127.0.0.1:8000].")
+        parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS),
+                            help="Endpoints to drive [default=all].")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per endpoint [default=500].")
+        parser.add_argument('--concurrency', type=int, default=10, help="Concurrent clients [default=10].")
+        parser.add_argument('--warmup', type=int, default=20, help="Unmeasured requests per endpoint [default=20].")
+        parser.add_argument('--language', default='en', help="Language prefix of the URLs [default='en'].")
+        parser.add_argument('--timeout', type=float, default=10.0, help="Request timeout in seconds [default=10].")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed of the URL sampling [default=42].")
+        parser.add_argument('--output', help="Write the JSON report to this file as well.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.rng_lock = threading.Lock()
+        self.base_url = options['base_url'].rstrip('/')
+        self.timeout = options['timeout']
+
+        with translation.override(options['language']):
+            self.load_catalog()
+
+        results = {}
+        for endpoint in options['endpoints']:
+            make_url = getattr(self, f"{endpoint}_url")
+            for _ in range(options['warmup']):
+                self.request(make_url())
+            results[endpoint] = self.run_endpoint(make_url, options['requests'], options['concurrency'])
+
+        report = {
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'commit': self.get_commit(),
+            'base_url': self.base_url,
+            'requests_per_endpoint': options['requests'],
+            'concurrency': options['concurrency'],
+            'catalog': {'posters': len(self.poster_ids), 'categories': len(self.category_names),
+                        'images': len(self.image_ids)},
+            'endpoints': results,
+        }
+        report_json = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(report_json)
+        self.stdout.write(report_json)
+
+    # region: URLS
+
+    def load_catalog(self) -> None:
+        """Ids and names the URLs are sampled from, plus the URL prefixes (reversed once)."""
+        self.poster_ids = list(Poster.alive.filter(status=True).values_list('id', flat=True)[:100000])
+        # Categories with active posters and their number of pages (out of range pages are 404).
+        self.category_pages = {
+            category['category__name']: max(-(-category['posters'] // CATEGORY_PAGE_SIZE), 1)
+            for category in Poster.alive.filter(status=True, category__isnull=False)
+            .values('category__name').annotate(posters=Count('id'))
+        }
+        self.category_names = list(self.category_pages)
+        self.image_ids = list(PosterImages.objects.values_list('id', flat=True)[:100000])
+        if not self.poster_ids or not self.category_names:
+            raise CommandError("The catalog is empty. Run 'manage.py seed_catalog' first.")
+        self.home_path = reverse('posters_app:home')
+        self.category_paths = {name: reverse('posters_app:list_posters_in_category', args=(name,))
+                               for name in self.category_names}
+        self.poster_path = reverse('posters_app:poster_view', args=(0,))[:-1]
+        self.image_path = reverse('posters_app:get_image_by_image_id', args=(0,))[:-1]
+        self.pages = max(-(-len(self.poster_ids) // HOME_PAGE_SIZE), 1)
+
+    def choice(self, sequence):
+        with self.rng_lock:
+            return self.rng.choice(sequence)
+
+    def page(self, pages: int) -> int:
+        # Most visitors read the first pages.
+        with self.rng_lock:
+            return min(int(self.rng.paretovariate(1.5)), pages)
+
+    def home_url(self) -> str:
+        return f"{self.base_url}{self.home_path}?page={self.page(self.pages)}"
+
+    def category_url(self) -> str:
+        category_name = self.choice(self.category_names)
+        return f"{self.base_url}{self.category_paths[category_name]}?page={self.page(self.category_pages[category_name])}"
+
+    def search_url(self) -> str:
+        return f"{self.base_url}{self.home_path}?query={self.choice(SEED_WORDS)}"
+
+    def poster_url(self) -> str:
+        return f"{self.base_url}{self.poster_path}{self.choice(self.poster_ids)}"
+
+    def image_url(self) -> str:
+        return f"{self.base_url}{self.image_path}{self.choice(self.image_ids or [0])}"
+
+    # endregion
+
+    def request(self, url: str) -> tuple[float, bool]:
+        """Latency (ms) of a GET request and whether it succeeded (2xx/3xx)."""
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                response.read()
+                ok = response.status < 400
+        except (urllib.error.URLError, TimeoutError, ConnectionError):
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    def run_endpoint(self, make_url, requests: int, concurrency: int) -> dict:
+        urls = [make_url() for _ in range(requests)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            responses = list(executor.map(self.request, urls))
+        duration = time.perf_counter() - start
+
+        latencies = [latency for latency, ok in responses if ok]
+        return summarize(latencies, errors=len(responses) - len(latencies), duration=duration)
+
+    def get_commit(self) -> str | None:
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
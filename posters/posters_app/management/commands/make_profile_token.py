@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posters.profiler import make_profile_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a signed 'X-Profile' header value. Requests carrying it are profiled by "
+        "'posters.profiler.SamplingProfilerMiddleware' regardless of 'PROFILER_SAMPLE_RATE'."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_profile_token())
+        self.stderr.write(f"Valid for {settings.PROFILER_TOKEN_MAX_AGE} seconds, e.g.: "
+                          f"curl -H 'X-Profile: <token>' http://127.0.0.1:8000/en/posters/")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posters.metrics import get_registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the memory high-water marks per URL name and Celery task recorded by the memory profiler "
+        "('MEMORY_PROFILER_ENABLED'), the max across the processes sharing 'PROMETHEUS_MULTIPROC_DIR'."
+    )
+
+    def handle(self, *args, **options):
+        peaks = [
+            (sample.labels['kind'], sample.labels['name'], sample.value)
+            for metric in get_registry().collect() if metric.name == 'posters_memory_peak_bytes'
+            for sample in metric.samples
+        ]
+        if not peaks:
+            self.stdout.write("No high-water marks recorded. Is 'MEMORY_PROFILER_ENABLED' set for the workers?")
+            return
+
+        self.stdout.write(f"{'kind':<6} {'name':<50} {'peak MiB':>10}")
+        for kind, name, peak in sorted(peaks, key=lambda peak: peak[2], reverse=True):
+            self.stdout.write(f"{kind:<6} {name:<50} {peak / 2 ** 20:>10.2f}")
@@ -0,0 +1,101 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Code run in a fresh interpreter ('-X importtime') to boot each entry point.
+ENTRY_POINTS = {
+    # gunicorn worker: WSGI application + URLconf (loaded on the first request otherwise).
+    'web': (
+        "import posters.wsgi\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+    ),
+    # Celery worker: app + task modules of all installed apps.
+    'worker': (
+        "from posters.celery import app\n"
+        "import django\n"
+        "django.setup()\n"
+        "app.loader.import_default_modules()\n"
+    ),
+}
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """
+    Parse the '-X importtime' report.
+    Returns (module, self time in us, cumulative time in us) in the import order.
+    :Param stderr: stderr of 'python -X importtime'.
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|', 2)
+        modules.append((module.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Report per-module import cost of the web (gunicorn) and worker (Celery) entry points "
+        "measured by 'python -X importtime' in a fresh interpreter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entry-point', choices=[*ENTRY_POINTS, 'all'], default='all',
+                            help="Entry point to profile [default='all'].")
+        parser.add_argument('--top', type=int, default=20, help="Number of the most expensive packages [default=20].")
+        parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        entry_points = list(ENTRY_POINTS) if options['entry_point'] == 'all' else [options['entry_point']]
+        report = {entry_point: self.profile(entry_point, options['top']) for entry_point in entry_points}
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        for entry_point, entry_report in report.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{entry_point}: {entry_report['total_ms']:.1f} ms, {entry_report['modules']} modules"))
+            self.stdout.write(f"{'package':<40} {'self ms':>10} {'cumulative ms':>14}")
+            for package in entry_report['packages']:
+                self.stdout.write(f"{package['package']:<40} {package['self_ms']:>10.1f} {package['cumulative_ms']:>14.1f}")
+
+    def profile(self, entry_point: str, top: int) -> dict:
+        """
+        Import cost of an entry point grouped by top level packages.
+        'self' is the sum of the package modules own time, 'cumulative' is the time of the package
+        top level import (including its dependencies, as seen by the first importer).
+        """
+        environment = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'posters.settings')}
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', ENTRY_POINTS[entry_point]],
+            cwd=settings.BASE_DIR, env=environment, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise CommandError(f"Entry point ({entry_point}) failed to boot:\n{completed.stderr[-2000:]}")
+
+        modules = parse_importtime(completed.stderr)
+        self_us = defaultdict(int)
+        cumulative_us = defaultdict(int)
+        for module, module_self_us, module_cumulative_us in modules:
+            package = module.split('.')[0]
+            self_us[package] += module_self_us
+            if module == package:
+                cumulative_us[package] = max(cumulative_us[package], module_cumulative_us)
+
+        packages = sorted(self_us, key=lambda package: self_us[package], reverse=True)[:top]
+        return {
+            'total_ms': sum(self_us.values()) / 1000,
+            'modules': len(modules),
+            'packages': [
+                {'package': package, 'self_ms': self_us[package] / 1000, 'cumulative_ms': cumulative_us[package] / 1000}
+                for package in packages
+            ],
+        }
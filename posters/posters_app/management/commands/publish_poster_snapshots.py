@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posters_app.models import Poster
+from posters_app.business_logic.snapshot_logic import publish_poster_snapshot, get_snapshots_root
+
+
+class Command(BaseCommand):
+    help = "Render static snapshots of all active poster pages (initial publishing or after a template change)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Poster ids fetched per query [default=500].")
+
+    def handle(self, *args, **options):
+        written = 0
+        poster_ids = Poster.alive.filter(status=True).values_list('id', flat=True)
+        for poster_id in poster_ids.iterator(chunk_size=options['chunk_size']):
+            written += publish_poster_snapshot(poster_id)
+
+        self.stdout.write(self.style.SUCCESS(f"Published {written} snapshots to ({get_snapshots_root()})."))
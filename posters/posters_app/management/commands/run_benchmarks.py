@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posters_app.business_logic.benchmark_logic import (
+    BENCHMARKS,
+    BENCHMARK_REGRESSION_THRESHOLD,
+    run_benchmarks,
+    load_baselines,
+    save_baselines,
+    find_regressions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot business logic functions (timeit) and compare them with the stored baselines. "
+        "Fails when a function is slower than its baseline by more than the threshold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', nargs='+', choices=[benchmark.name for benchmark in BENCHMARKS],
+                            help="Benchmarks to run [default=all].")
+        parser.add_argument('--repeat', type=int, default=5, help="Measurements per benchmark, the best is kept [default=5].")
+        parser.add_argument('--min-duration', type=float, default=0.2,
+                            help="Minimal duration of one measurement in seconds [default=0.2].")
+        parser.add_argument('--threshold', type=float, default=BENCHMARK_REGRESSION_THRESHOLD,
+                            help=f"Allowed ratio to the baseline [default={BENCHMARK_REGRESSION_THRESHOLD}].")
+        parser.add_argument('--update-baselines', action='store_true', help="Store the results as the new baselines.")
+        parser.add_argument('--json', action='store_true', help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        results = run_benchmarks(options['only'], options['repeat'], options['min_duration'])
+        baselines = load_baselines()
+
+        if options['json']:
+            self.stdout.write(json.dumps(
+                {name: {**result, 'baseline': baselines.get(name)} for name, result in results.items()}, indent=2))
+        else:
+            self.stdout.write(f"{'benchmark':<40} {'us/call':>10} {'normalized':>11} {'baseline':>10} {'ratio':>7}")
+            for name, result in results.items():
+                baseline = baselines.get(name)
+                ratio = f"{result['normalized'] / baseline:.2f}" if baseline else '-'
+                self.stdout.write(
+                    f"{name:<40} {result['us']:>10.2f} {result['normalized']:>11.4f} {baseline or '-':>10} {ratio:>7}")
+
+        if options['update_baselines']:
+            save_baselines(results)
+            self.stdout.write(self.style.SUCCESS("Baselines updated."))
+            return
+
+        regressions = find_regressions(results, baselines, options['threshold'])
+        if regressions:
+            raise CommandError("Performance regressions: " + ', '.join(
+                f"{name} ({ratio:.2f}x the baseline)" for name, ratio in regressions.items()))
+        self.stdout.write(self.style.SUCCESS("No regressions."))
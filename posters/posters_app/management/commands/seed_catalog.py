@@ -0,0 +1,120 @@
+import io
+import random
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posters_app.models import Poster, PosterCategories, PosterImages
+from posters_app.business_logic.poster_currency_logic import CURRENCY_CHOICES
+from posters_app.business_logic.poster_transfer_logic import refresh_catalog_caches
+
+
+SEED_USERNAME_PREFIX = 'seed_user_'
+SEED_CATEGORY_PREFIX = 'Seed category '
+SEED_IMAGES_SUBDIRECTORY = 'poster_images/seed'
+# Words of the generated headers/descriptions, the load test searches by them.
+SEED_WORDS = (
+    'phone', 'laptop', 'bicycle', 'sofa', 'guitar', 'camera', 'table', 'jacket',
+    'monitor', 'lamp', 'book', 'watch', 'tent', 'printer', 'speaker', 'chair',
+)
+# Already standardized: 'bulk_create' doesn't call 'Poster.save'.
+SEED_PHONE_NUMBER = '+7 926 584-75-23'
+
+
+def make_seed_image(rng: random.Random, size: tuple[int, int] = (320, 240)) -> bytes:
+    """A small JPEG filled with a random color."""
+    from PIL import Image
+
+    image = Image.new('RGB', size, tuple(rng.randrange(256) for _ in range(3)))
+    image_bytes = io.BytesIO()
+    image.save(image_bytes, format='JPEG', quality=70)
+    return image_bytes.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic catalog (users, categories, posters, images) for load tests. "
+        "The same '--seed' always produces the same catalog."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posters', type=int, default=10000, help="Number of posters [default=10000].")
+        parser.add_argument('--categories', type=int, default=20, help="Number of categories [default=20].")
+        parser.add_argument('--users', type=int, default=200, help="Number of users [default=200].")
+        parser.add_argument('--images-per-poster', type=int, default=2, help="Image rows per poster [default=2].")
+        parser.add_argument('--image-files', type=int, default=50,
+                            help="Distinct image files, shared by the image rows [default=50].")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per INSERT [default=2000].")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed [default=42].")
+        parser.add_argument('--clear', action='store_true', help="Delete the previously seeded catalog first.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+
+        if options['clear']:
+            self.clear()
+
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [User(username=f"{SEED_USERNAME_PREFIX}{number}") for number in range(options['users'])],
+                batch_size=batch_size, ignore_conflicts=True)
+            users = list(User.objects.filter(username__startswith=SEED_USERNAME_PREFIX).values_list('id', flat=True))
+
+            PosterCategories.objects.bulk_create(
+                [PosterCategories(name=f"{SEED_CATEGORY_PREFIX}{number}") for number in range(options['categories'])],
+                batch_size=batch_size, ignore_conflicts=True)
+            categories = list(PosterCategories.objects.filter(
+                name__startswith=SEED_CATEGORY_PREFIX).values_list('id', flat=True))
+
+            image_paths = [
+                default_storage.save(f"{SEED_IMAGES_SUBDIRECTORY}/{options['seed']}_{number}.jpg",
+                                     ContentFile(make_seed_image(rng)))
+                for number in range(options['image_files'])
+            ]
+
+            created = 0
+            while created < options['posters']:
+                chunk = min(batch_size, options['posters'] - created)
+                posters = Poster.objects.bulk_create([self.make_poster(rng, users, categories) for _ in range(chunk)])
+                PosterImages.objects.bulk_create([
+                    PosterImages(poster_id=poster, image_path=rng.choice(image_paths))
+                    for poster in posters for _ in range(options['images_per_poster'])
+                ], batch_size=batch_size)
+                created += chunk
+                self.stdout.write(f"Seeded {created}/{options['posters']} posters...")
+
+        # Fresh planner statistics, the approximate pagination reads 'pg_class.reltuples'.
+        refresh_catalog_caches()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {options['posters']} posters, {len(categories)} categories, {len(users)} users, "
+            f"{len(image_paths)} image files."))
+
+    def make_poster(self, rng: random.Random, users: list[int], categories: list[int]) -> Poster:
+        words = rng.sample(SEED_WORDS, 3)
+        return Poster(
+            owner_id=rng.choice(users),
+            category_id=rng.choice(categories),
+            phone_number=SEED_PHONE_NUMBER,
+            header=' '.join(words[:2]).capitalize(),
+            description=f"Selling a {' and a '.join(words)} in a good condition.",
+            price=Decimal(rng.randrange(100, 1000000)) / 100,
+            currency=rng.choice(CURRENCY_CHOICES)[0],
+        )
+
+    def clear(self) -> None:
+        """Delete the seeded users (their posters cascade), categories and image files."""
+        seeded_posters = Poster.objects.filter(owner__username__startswith=SEED_USERNAME_PREFIX)
+        PosterImages.objects.filter(poster_id__in=seeded_posters).delete()
+        seeded_posters.delete()
+        User.objects.filter(username__startswith=SEED_USERNAME_PREFIX).delete()
+        PosterCategories.objects.filter(name__startswith=SEED_CATEGORY_PREFIX).delete()
+        if default_storage.exists(SEED_IMAGES_SUBDIRECTORY):
+            for file_name in default_storage.listdir(SEED_IMAGES_SUBDIRECTORY)[1]:
+                default_storage.delete(f"{SEED_IMAGES_SUBDIRECTORY}/{file_name}")
+        self.stdout.write("Cleared the seeded catalog.")
@@ -0,0 +1,87 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posters_app.business_logic.cache_simulation_logic import (
+    CACHE_LAYERS,
+    EVICTION_POLICIES,
+    generate_zipf_trace,
+    read_access_log,
+    make_scenarios,
+    measure_payload_sizes,
+    simulate,
+)
+
+
+def parse_layer_values(values: list[str]) -> dict[str, list[int]]:
+    """Parse 'layer=value,value' arguments."""
+    layer_values = {}
+    for value in values or []:
+        layer, _, numbers = value.partition('=')
+        if layer not in CACHE_LAYERS or not numbers:
+            raise CommandError(f"Invalid value ({value}). Expected <layer>=<n>[,<n>...], layers: {', '.join(CACHE_LAYERS)}")
+        layer_values[layer] = [int(number) for number in numbers.split(',')]
+    return layer_values
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a recorded nginx/gunicorn access log (or a synthetic Zipf trace) through the cache layers "
+        "offline and report hit ratio, cache memory/traffic and DB queries for candidate timeouts "
+        "and eviction policies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--access-log', help="Access log to replay. Without it a Zipf trace is generated.")
+        parser.add_argument('--requests', type=int, default=100000, help="Zipf trace: number of requests [default=100000].")
+        parser.add_argument('--rps', type=float, default=20.0, help="Zipf trace: requests per second [default=20].")
+        parser.add_argument('--posters', type=int, default=10000, help="Zipf trace: number of posters [default=10000].")
+        parser.add_argument('--images', type=int, default=20000, help="Zipf trace: number of images [default=20000].")
+        parser.add_argument('--categories', type=int, default=20, help="Zipf trace: number of categories [default=20].")
+        parser.add_argument('--zipf-exponent', type=float, default=1.1, help="Zipf trace: popularity skew [default=1.1].")
+        parser.add_argument('--seed', type=int, default=42, help="Zipf trace: random seed [default=42].")
+        parser.add_argument('--ttl', action='append', metavar='LAYER=SECONDS[,SECONDS...]',
+                            help=f"Candidate timeouts of a layer, repeatable. Layers: {', '.join(CACHE_LAYERS)}.")
+        parser.add_argument('--size', action='append', metavar='LAYER=BYTES',
+                            help="Payload size of a layer, repeatable.")
+        parser.add_argument('--measure-sizes', action='store_true',
+                            help="Measure the payload sizes in the current DB and media storage.")
+        parser.add_argument('--policies', nargs='+', choices=EVICTION_POLICIES, default=['allkeys-lru'],
+                            help="Eviction policies [default=allkeys-lru].")
+        parser.add_argument('--max-memory', type=int, help="Cache memory limit in bytes [default=unlimited].")
+        parser.add_argument('--json', action='store_true', help="Print the reports as JSON.")
+
+    def handle(self, *args, **options):
+        sizes = measure_payload_sizes() if options['measure_sizes'] else {}
+        sizes |= {layer: values[0] for layer, values in parse_layer_values(options['size']).items()}
+        scenarios = make_scenarios(parse_layer_values(options['ttl']))
+
+        if options['access_log']:
+            def make_trace():
+                with open(options['access_log']) as access_log:
+                    yield from read_access_log(access_log)
+        else:
+            def make_trace():
+                return generate_zipf_trace(
+                    options['requests'], options['rps'], options['posters'], options['images'],
+                    options['categories'], options['zipf_exponent'], seed=options['seed'])
+
+        reports = simulate(make_trace, scenarios, options['policies'], options['max_memory'], sizes)
+
+        if options['json']:
+            self.stdout.write(json.dumps(reports, indent=2))
+            return
+
+        layers = list(CACHE_LAYERS)
+        self.stdout.write(
+            f"{'policy':<15} " + ' '.join(f"{layer[:12] + ' ttl':>16}" for layer in layers) +
+            f" {'hit ratio':>9} " + ' '.join(f"{layer[:12] + ' hit':>16}" for layer in layers) +
+            f" {'db q/req':>8} {'peak MiB':>9} {'read MiB':>9} {'evictions':>9}")
+        for report in reports:
+            self.stdout.write(
+                f"{report['policy']:<15} " +
+                ' '.join(f"{report['timeouts'][layer]:>16}" for layer in layers) +
+                f" {report['hit_ratio']:>9.3f} " +
+                ' '.join(f"{report['layers'][layer]['hit_ratio']:>16.3f}" for layer in layers) +
+                f" {report['db_queries_per_request']:>8.3f} {report['peak_memory_bytes'] / 2 ** 20:>9.2f}"
+                f" {report['bytes_read'] / 2 ** 20:>9.1f} {report['evictions']:>9}")
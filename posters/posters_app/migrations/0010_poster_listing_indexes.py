@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-19 16:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posters_app', '0009_alter_posterliteimages_poster_id'),
+        ('sessions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='poster',
+            index=models.Index(fields=['status', '-created'], name='poster_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poster',
+            index=models.Index(fields=['category', 'status', '-created'], name='poster_cat_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poster',
+            index=models.Index(fields=['owner', '-created'], name='poster_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poster',
+            index=models.Index(condition=models.Q(('deleted__isnull', True), ('status', True)), fields=['-created'], name='poster_active_created_idx'),
+        ),
+    ]
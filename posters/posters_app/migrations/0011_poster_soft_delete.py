@@ -0,0 +1,36 @@
+# Generated by Django 5.1 on 2026-10-19 16:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posters_app', '0010_poster_listing_indexes'),
+        ('sessions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='poster',
+            name='poster_cat_status_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='poster',
+            name='poster_owner_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='poster',
+            index=models.Index(condition=models.Q(('deleted__isnull', True)), fields=['category', 'status', '-created'], name='poster_cat_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poster',
+            index=models.Index(condition=models.Q(('deleted__isnull', True)), fields=['owner', '-created'], name='poster_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poster',
+            index=models.Index(condition=models.Q(('deleted__isnull', False)), fields=['deleted'], name='poster_deleted_idx'),
+        ),
+    ]
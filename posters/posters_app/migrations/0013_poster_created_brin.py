@@ -0,0 +1,21 @@
+# Generated by Django 5.1 on 2026-10-19 17:02
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posters_app', '0012_slow_query'),
+        ('sessions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='poster',
+            index=django.contrib.postgres.indexes.BrinIndex(autosummarize=True, fields=['created'], name='poster_created_brin_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1 on 2026-10-19 17:04
+
+import django.db.models.deletion
+import django.db.models.functions.datetime
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posters_app', '0013_poster_created_brin'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poster',
+            name='restored',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedPoster',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('uuid', models.UUIDField(editable=False, unique=True)),
+                ('status', models.BooleanField()),
+                ('created', models.DateTimeField()),
+                ('archived', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+                ('phone_number', models.CharField(max_length=20)),
+                ('email', models.EmailField(blank=True, max_length=255, null=True)),
+                ('header', models.CharField(max_length=255)),
+                ('description', models.TextField(max_length=10000)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=9)),
+                ('currency', models.CharField(max_length=3)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_posters', to='posters_app.postercategories')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_posters', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedPosterImages',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('image_path', models.CharField(max_length=100)),
+                ('poster_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_images', to='posters_app.archivedposter')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedposter',
+            index=models.Index(fields=['owner', '-created'], name='archived_poster_owner_idx'),
+        ),
+    ]
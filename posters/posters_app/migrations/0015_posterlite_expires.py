@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-19 17:05
+
+import posters_app.business_logic.posters_lite_logic
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_expires_from_created(apps, schema_editor):
+    """Existing lite posters expire 'POSTERLITE_LIFETIME' after they were created, not after the migration."""
+    PosterLite = apps.get_model('posters_app', 'PosterLite')
+    PosterLite.objects.update(
+        expires=F('created') + posters_app.business_logic.posters_lite_logic.POSTERLITE_LIFETIME)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posters_app', '0014_poster_archive'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posterlite',
+            name='expires',
+            field=models.DateTimeField(default=posters_app.business_logic.posters_lite_logic.get_expire_timestamp),
+        ),
+        migrations.RunPython(set_expires_from_created, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='posterlite',
+            index=models.Index(fields=['expires'], name='posterlite_expires_idx'),
+        ),
+    ]
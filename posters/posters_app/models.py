@@ -2,21 +2,98 @@ import uuid
 import os
 from decimal import Decimal
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import BrinIndex
 from django.contrib.sessions.models import Session
 from django.db.models import CharField
+from django.db.models.functions import Now
+from django.utils import timezone
 
 from .business_logic.phone_number_logic import standardize_phone_number, validate_phone_number
 from .business_logic.poster_image_name_logic import GetUniqueImageName, validate_image_size
 from .business_logic.poster_currency_logic import validate_currency, CURRENCY_CHOICES
 from .business_logic.posters_lite_logic import get_expire_timestamp
+from .business_logic.page_cache_logic import invalidate_page_cache
 
 from .constants import DEFAULT_IMAGE, DEFAULT_IMAGE_FULL_PATH
 
 # Create your models here.
 
 
+# region: MIXINS ###
+
+class DirtyFieldsMixin(models.Model):
+    """
+    Tracks the fields changed since the instance was loaded from the DB (or last saved).
+    'save()' of a loaded instance writes only the changed columns ('update_fields') and skips
+    the UPDATE (and the save signals) when nothing changed. 'get_dirty_fields()' still returns
+    the change set in the 'pre_save'/'post_save' receivers, which also get it as 'update_fields'.
+    New, unpickled (e.g. cached) instances and explicit 'update_fields' are saved as usual.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.reset_dirty_fields()
+        return instance
+
+    def reset_dirty_fields(self, fields=None) -> None:
+        """
+        Take the current values (deferred fields excluded) as the saved ones.
+        :Param fields: Names of the written (refreshed) fields, the other fields stay dirty [default=None - all].
+        """
+        attnames = None if fields is None else {self._meta.get_field(name).attname for name in fields}
+        loaded_values = {} if attnames is None else dict(self.__dict__.get('_loaded_values', {}))
+        for field in self._meta.concrete_fields:
+            if field.attname in self.__dict__ and (attnames is None or field.attname in attnames):
+                loaded_values[field.attname] = self.__dict__[field.attname]
+        self._loaded_values = loaded_values
+
+    def is_tracked(self) -> bool:
+        return not self._state.adding and '_loaded_values' in self.__dict__
+
+    def get_dirty_fields(self) -> dict[str, object]:
+        """Changed fields: {name: saved value}. All loaded fields for untracked instances."""
+        loaded_values = self.__dict__.get('_loaded_values', {}) if self.is_tracked() else {}
+        missing = object()
+        return {
+            field.name: loaded_values.get(field.attname)
+            for field in self._meta.concrete_fields
+            # Deferred fields are not loaded, so they are not changed.
+            if field.attname in self.__dict__
+            and loaded_values.get(field.attname, missing) != self.__dict__[field.attname]
+        }
+
+    def is_field_dirty(self, field_name: str) -> bool:
+        return field_name in self.get_dirty_fields()
+
+    def save(self, *args, **kwargs):
+        if self.is_tracked() and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            dirty_fields = self.get_dirty_fields()
+            if not dirty_fields:
+                return
+            if self._meta.pk.name not in dirty_fields:
+                kwargs['update_fields'] = dirty_fields.keys()
+        super().save(*args, **kwargs)
+        self.reset_dirty_fields(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None, *args, **kwargs):
+        super().refresh_from_db(using, fields, *args, **kwargs)
+        # Loading a deferred field refreshes only that field, the pending edits of the others stay dirty.
+        self.reset_dirty_fields(fields)
+
+    def __getstate__(self):
+        # The saved values would double the cached payload (e.g. the descriptions of cached listings).
+        state = super().__getstate__()
+        state.pop('_loaded_values', None)
+        return state
+
+# endregion
+
 # region: SHARED MODELS ###
 
 class PosterCategories(models.Model):
@@ -26,12 +103,40 @@ class PosterCategories(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(invalidate_page_cache)
+        return result
+
 
 # endregion
 
 # region: POSTER MODELS ###
 
-class Poster(models.Model):
+class PosterQuerySet(models.QuerySet):
+    def soft_delete(self) -> int:
+        """
+        Mark posters as deleted with a single UPDATE. Rows and image files are purged later
+        by the 'purge_deleted_posters' Celery task.
+        Returns the number of marked posters.
+        """
+        return self.update(deleted=timezone.now(), status=False)
+
+    def delete(self) -> tuple[int, dict[str, int]]:
+        # Deletes don't send signals to the page cache receivers (they would disable the fast delete).
+        result = super().delete()
+        transaction.on_commit(invalidate_page_cache)
+        return result
+
+
+class AlivePosterManager(models.Manager.from_queryset(PosterQuerySet)):
+    """Posters that are not (soft) deleted. All the fetchers read through this manager."""
+
+    def get_queryset(self) -> PosterQuerySet:
+        return super().get_queryset().filter(deleted__isnull=True)
+
+
+class Poster(DirtyFieldsMixin, models.Model):
     id = models.AutoField(primary_key=True)
     uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='owned_posters')
@@ -40,12 +145,14 @@ class Poster(models.Model):
     # (22.08.24) <devbackend_22_08_models>.
     created = models.DateTimeField(auto_now_add=True)
     deleted = models.DateTimeField(null=True, blank=True)
+    # Set when the poster is restored from the archive, the archive job skips it for its thresholds.
+    restored = models.DateTimeField(null=True, blank=True)
     # NOTE: ADD VALIDATORS TO THE PHONE_NUMBER FIELD. IN ORDER TO HAVE A CLEAR ERROR\
     # (23.08.24)<devbackend_23_08_migrated>.
     phone_number = models.CharField(max_length=20, validators=[validate_phone_number])
     email = models.EmailField(max_length=255, null=True, blank=True)
     # NOTE: MAKE SURE SESSION IS AVAILABLE BEFORE ANY VIEW REQUEST IT, OTHERWISE IT WILL RAISE SESSION DOES NOT EXIST ERROR.\
-    # THIS SETTING IS DONE VIA CUSTOM SESSION MIDDLEWARE! (22.08.24) <devbackend_22_08_models>.
+    # USE 'posters.sessions.ensure_session_key(request)', SESSIONS ARE CREATED LAZILY! (22.08.24) <devbackend_22_08_models>.
     client = models.ForeignKey(Session, on_delete=models.SET_NULL, null=True, blank=True, db_column='client',
                                to_field='session_key')
     header = models.CharField(max_length=255)
@@ -54,6 +161,28 @@ class Poster(models.Model):
     price = models.DecimalField(max_digits=9, decimal_places=2)
     currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, validators=[validate_currency, ])
 
+    objects = models.Manager.from_queryset(PosterQuerySet)()
+    alive = AlivePosterManager()
+
+    class Meta:
+        # NOTE: Indexes for the hot listing queries (see 'QueryFetchers').
+        # Partial indexes on 'deleted IS NULL' back the 'alive' manager.
+        indexes = [
+            models.Index(fields=['status', '-created'], name='poster_status_created_idx'),
+            models.Index(fields=['category', 'status', '-created'], name='poster_cat_status_created_idx',
+                         condition=models.Q(deleted__isnull=True)),
+            models.Index(fields=['owner', '-created'], name='poster_owner_created_idx',
+                         condition=models.Q(deleted__isnull=True)),
+            models.Index(fields=['-created'], name='poster_active_created_idx',
+                         condition=models.Q(status=True, deleted__isnull=True)),
+            # Soft deleted posters waiting for the purge.
+            models.Index(fields=['deleted'], name='poster_deleted_idx',
+                         condition=models.Q(deleted__isnull=False)),
+            # Rows are appended in the 'created' order, so a few KB of block ranges skip the old part
+            # of the heap for the created date bounded scans (search, 'listing_window').
+            BrinIndex(fields=['created'], name='poster_created_brin_idx', autosummarize=True),
+        ]
+
     def __repr__(self) -> str:
         return f"id: ({self.id}) header: ({self.header}) status: ({self.status})"
 
@@ -61,7 +190,8 @@ class Poster(models.Model):
         return self.header
 
     def save(self, *args, **kwargs):
-        self.phone_number = standardize_phone_number(self.phone_number)
+        if self.is_field_dirty('phone_number'):
+            self.phone_number = standardize_phone_number(self.phone_number)
 
         # NOTE: Unable to create new posters, when this code is enabled !. <devbackend_09_09_tech_loan>.
         # if not self.poster_images.exists():
@@ -70,7 +200,9 @@ class Poster(models.Model):
         super().save(*args, **kwargs)
 
     def delete(self, *args, **kwargs):
-        super().delete(*args, **kwargs)
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(invalidate_page_cache)
+        return result
 
 
 class PosterImages(models.Model):
@@ -89,23 +221,26 @@ class PosterImages(models.Model):
             if str(self.image_path.name) not in str(DEFAULT_IMAGE_FULL_PATH) and os.path.isfile(self.image_path.path):
                 os.remove(self.image_path.path)
 
-        super().delete(*args, **kwargs)
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(invalidate_page_cache)
+        return result
 
 
 # endregion
 
 # region: POSTE LITE MODELS ###
 
-class PosterLite(models.Model):
+class PosterLite(DirtyFieldsMixin, models.Model):
     id = models.AutoField(primary_key=True)
     uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     # NOTE: Write an auto cleaner for lite posters where the owner session_key was deleted. (Or change on_delete=models.CASCADE)\
     # (23.08.24) <devbackend_23_08_migrated>.
+    # USE 'posters.sessions.ensure_session_key(request)' FOR 'owner' AND 'client', SESSIONS ARE CREATED LAZILY!
     owner = models.ForeignKey(Session, on_delete=models.SET_NULL, null=True, related_name='owned_posters_lite')
     status = models.BooleanField(default=True)
     created = models.DateTimeField(auto_now_add=True)
-    # NOTE: FINISH ME. (24.28.24) <devbackend_24_08_views>.
-    # expires = models.DateTimeField(default=get_expire_timestamp)
+    # Expired lite posters are deleted with their images by the 'delete_expired_posters_lite' task.
+    expires = models.DateTimeField(default=get_expire_timestamp)
     deleted = models.DateTimeField(null=True, blank=True)
     phone_number = models.CharField(max_length=20, validators=[validate_phone_number])
     email = models.EmailField(max_length=255, null=True, blank=True)
@@ -117,6 +252,11 @@ class PosterLite(models.Model):
     price = models.DecimalField(max_digits=9, decimal_places=2)
     currency = models.CharField(max_length=3, validators=[validate_currency])
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires'], name='posterlite_expires_idx'),
+        ]
+
     def __repr__(self) -> str:
         return f"id: ({self.id}) header: ({self.header}) status: ({self.status})"
 
@@ -124,7 +264,8 @@ class PosterLite(models.Model):
         return self.header
 
     def save(self, *args, **kwargs):
-        self.phone_number = standardize_phone_number(self.phone_number)
+        if self.is_field_dirty('phone_number'):
+            self.phone_number = standardize_phone_number(self.phone_number)
         super().save(*args, **kwargs)
 
 
@@ -152,3 +293,65 @@ class PosterLiteImages(models.Model):
         super().delete(*args, **kwargs)
 
 # endregion
+
+# region: ARCHIVE MODELS ###
+
+class ArchivedPoster(models.Model):
+    """
+    Old or long inactive poster moved out of the hot 'Poster' table by the 'archive_posters' task
+    (see 'posters_app.business_logic.archive_logic'). Keeps the poster id, so it can be restored as it was.
+    """
+    id = models.IntegerField(primary_key=True)
+    uuid = models.UUIDField(unique=True, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_posters')
+    status = models.BooleanField()
+    created = models.DateTimeField()
+    archived = models.DateTimeField(db_default=Now())
+    phone_number = models.CharField(max_length=20)
+    email = models.EmailField(max_length=255, null=True, blank=True)
+    header = models.CharField(max_length=255)
+    description = models.TextField(max_length=10000)
+    category = models.ForeignKey('PosterCategories', on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='archived_posters')
+    price = models.DecimalField(max_digits=9, decimal_places=2)
+    currency = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', '-created'], name='archived_poster_owner_idx'),
+        ]
+
+    def __repr__(self) -> str:
+        return f"id: ({self.id}) header: ({self.header}) archived: ({self.archived})"
+
+    def __str__(self) -> str:
+        return self.header
+
+
+class ArchivedPosterImages(models.Model):
+    """Image row of an archived poster, the image file stays in the media storage."""
+    id = models.IntegerField(primary_key=True)
+    poster_id = models.ForeignKey('ArchivedPoster', on_delete=models.CASCADE, related_name='archived_images')
+    image_path = models.CharField(max_length=100)
+
+    def __str__(self) -> str:
+        return f"Image for archived poster id: ({self.poster_id_id})"
+
+# endregion
+
+
+# region: MONITORING ###
+
+class SlowQuery(models.Model):
+    """
+    Admin entry point of the slow query log. The log lives in a cache ring buffer ('posters.slow_queries'),
+    the model has no table.
+    """
+
+    class Meta:
+        managed = False
+        default_permissions = ('view',)
+        verbose_name = 'slow query'
+        verbose_name_plural = 'slow queries'
+
+# endregion
@@ -1,7 +1,33 @@
-from django.db.models.signals import post_delete, pre_delete
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, pre_delete, post_save
 from django.dispatch import receiver
-from .models import PosterImages, Poster
+from .models import PosterImages, Poster, PosterCategories
 from .business_logic.poster_image_name_logic import DEFAULT_IMAGE
+from .business_logic.page_cache_logic import invalidate_page_cache
+from posters.slow_queries import install_slow_query_log
+
+
+# Slow query log wrapper on every DB connection (primary and replicas).
+connection_created.connect(install_slow_query_log, dispatch_uid='posters.slow_queries')
+
+
+# Poster fields shown on the poster page only, the listing pages don't change with them.
+LISTING_UNAFFECTED_FIELDS = frozenset({'phone_number', 'email'})
+
+
+# Anonymous listing pages are cached as a whole, any write of their data invalidates them.
+# After the commit, so a concurrent request can't cache the page with the old data again.
+# Only saves: a 'post_delete' receiver makes Django load and signal every deleted row (no fast delete),
+# deletes invalidate in the models' 'delete' methods and in the bulk jobs.
+@receiver(post_save, sender=Poster)
+@receiver(post_save, sender=PosterImages)
+@receiver(post_save, sender=PosterCategories)
+def invalidate_anonymous_pages(sender, update_fields=None, **kwargs) -> None:
+    # Saves of tracked posters write only the changed fields ('DirtyFieldsMixin').
+    if sender is Poster and update_fields and LISTING_UNAFFECTED_FIELDS.issuperset(update_fields):
+        return
+    transaction.on_commit(invalidate_page_cache)
 
 
 
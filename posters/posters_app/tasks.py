@@ -0,0 +1,124 @@
+from __future__ import absolute_import, unicode_literals
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from .business_logic.soft_delete_logic import purge_deleted_posters_batch
+from .business_logic.archive_logic import archive_posters_batch
+from .business_logic.posters_lite_cleanup_logic import delete_expired_posters_lite_batch
+from posters.metrics import record_cleanup
+from .business_logic.session_cleanup_logic import clear_expired_sessions_batch
+from .business_logic import snapshot_logic
+
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="purge_deleted_posters")
+def purge_deleted_posters(batch_size: int | None = None, max_batches: int | None = None) -> dict[str, int]:
+    """
+    Purge soft deleted posters and their media in bounded batches (scheduled off-peak by Celery beat).
+    :Param batch_size: Posters per batch [default=settings.POSTERS_PURGE_BATCH_SIZE].
+    :Param max_batches: Max batches per run [default=settings.POSTERS_PURGE_MAX_BATCHES].
+    """
+    batch_size = batch_size or settings.POSTERS_PURGE_BATCH_SIZE
+    max_batches = max_batches or settings.POSTERS_PURGE_MAX_BATCHES
+    purged = {'posters': 0, 'images': 0, 'bytes': 0}
+
+    for _ in range(max_batches):
+        batch = purge_deleted_posters_batch(batch_size)
+        for key, value in batch.items():
+            purged[key] += value
+        if batch['posters'] < batch_size:
+            break
+
+    logger.info("Purged soft deleted posters: %s", purged)
+    return purged
+
+
+@shared_task(name="archive_posters")
+def archive_posters(batch_size: int | None = None, max_batches: int | None = None) -> dict[str, int]:
+    """
+    Move old and long inactive posters with their image rows to the archive tables in bounded batches.
+    :Param batch_size: Posters per batch [default=settings.POSTERS_ARCHIVE_BATCH_SIZE].
+    :Param max_batches: Max batches per run [default=settings.POSTERS_ARCHIVE_MAX_BATCHES].
+    """
+    batch_size = batch_size or settings.POSTERS_ARCHIVE_BATCH_SIZE
+    max_batches = max_batches or settings.POSTERS_ARCHIVE_MAX_BATCHES
+    archived = {'posters': 0, 'images': 0}
+
+    for _ in range(max_batches):
+        batch = archive_posters_batch(batch_size)
+        for key, value in batch.items():
+            archived[key] += value
+        if batch['posters'] < batch_size:
+            break
+
+    logger.info("Archived posters: %s", archived)
+    return archived
+
+
+@shared_task(name="clear_expired_sessions")
+def clear_expired_sessions(batch_size: int | None = None, max_batches: int | None = None) -> dict[str, int]:
+    """
+    Delete expired 'django_session' rows in bounded batches, detaching or deleting their 'PosterLite' rows.
+    :Param batch_size: Sessions per batch [default=settings.SESSIONS_CLEANUP_BATCH_SIZE].
+    :Param max_batches: Max batches per run [default=settings.SESSIONS_CLEANUP_MAX_BATCHES].
+    """
+    batch_size = batch_size or settings.SESSIONS_CLEANUP_BATCH_SIZE
+    max_batches = max_batches or settings.SESSIONS_CLEANUP_MAX_BATCHES
+    cleared = {'sessions': 0, 'posters_lite': 0, 'images': 0, 'bytes': 0}
+
+    for _ in range(max_batches):
+        batch = clear_expired_sessions_batch(batch_size)
+        for key, value in batch.items():
+            cleared[key] += value
+        if batch['sessions'] < batch_size:
+            break
+
+    logger.info("Cleared expired sessions: %s", cleared)
+    return cleared
+
+
+@shared_task(name="delete_expired_posters_lite")
+def delete_expired_posters_lite(batch_size: int | None = None, max_batches: int | None = None) -> dict[str, int]:
+    """
+    Delete expired lite posters with their images in bounded batches (the rows and bytes are exported as metrics).
+    :Param batch_size: Lite posters per batch [default=settings.POSTERS_LITE_CLEANUP_BATCH_SIZE].
+    :Param max_batches: Max batches per run [default=settings.POSTERS_LITE_CLEANUP_MAX_BATCHES].
+    """
+    batch_size = batch_size or settings.POSTERS_LITE_CLEANUP_BATCH_SIZE
+    max_batches = max_batches or settings.POSTERS_LITE_CLEANUP_MAX_BATCHES
+    deleted = {'posters_lite': 0, 'images': 0, 'bytes': 0}
+
+    for _ in range(max_batches):
+        batch = delete_expired_posters_lite_batch(batch_size)
+        for key, value in batch.items():
+            deleted[key] += value
+        if batch['posters_lite'] < batch_size:
+            break
+
+    record_cleanup('delete_expired_posters_lite',
+                   {'posters_lite': deleted['posters_lite'], 'posters_lite_images': deleted['images']},
+                   deleted['bytes'])
+    logger.info("Deleted expired lite posters: %s", deleted)
+    return deleted
+
+
+@shared_task(name="publish_poster_snapshot")
+def publish_poster_snapshot(poster_id: int) -> int:
+    """
+    (Re)render static snapshots of a poster page for nginx ('POSTER_SNAPSHOTS_ROOT').
+    :Param poster_id: Id of a created or edited poster.
+    """
+    return snapshot_logic.publish_poster_snapshot(poster_id)
+
+
+@shared_task(name="remove_poster_snapshot")
+def remove_poster_snapshot(poster_id: int) -> int:
+    """
+    Remove static snapshots of a deleted poster, so nginx falls back to Django (404).
+    :Param poster_id: Id of a deleted poster.
+    """
+    return snapshot_logic.remove_poster_snapshot(poster_id)
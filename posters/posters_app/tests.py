@@ -1,21 +1,69 @@
 from decimal import Decimal
 import datetime
+import io
+import json
+import os
+import pickle
+import time
+import tempfile
+import tracemalloc
 
-from django.test import TestCase, SimpleTestCase
-from posters_app.models import Poster, PosterCategories, PosterImages, PosterLite, PosterLiteImages
+from django.http import HttpResponse
+from django.test import TestCase, SimpleTestCase, RequestFactory, override_settings
+from django.conf import settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, DatabaseError
+from django.db.models.signals import post_save, post_delete
+from posters_app.models import (
+    Poster, PosterCategories, PosterImages, PosterLite, PosterLiteImages, ArchivedPoster, ArchivedPosterImages)
 from django.contrib.auth.models import User
 from django.contrib.sessions.models import Session
 from django.utils import timezone
+from django.urls import reverse
+from django.utils import translation
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.template.loader import render_to_string
 
 from .business_logic.poster_image_name_logic import GetUniqueImageName
-from .business_logic.phone_number_logic import standardize_phone_number
+from .business_logic.phone_number_logic import (
+    standardize_phone_number, PhoneNumberNormalizer, InvalidPhoneNumberException)
 from .business_logic.poster_currency_logic import validate_currency, ValidationError
 from .business_logic.posters_lite_logic import get_expire_timestamp, POSTERLITE_LIFETIME
 from .business_logic.process_images_logic import ensure_image_exists, get_fk_field_name, get_fk_field_name
 from .business_logic.view_logic import SearchQueryEngine
+from .business_logic.query_fetchers_logic import QueryFetchers
+from .business_logic.page_cache_logic import PAGE_CACHE_HEADER
+from .business_logic.snapshot_logic import publish_poster_snapshot, remove_poster_snapshot, get_snapshot_path
+from .business_logic.poster_cards_logic import render_poster_cards, make_poster_card_cache_key
+from .business_logic.pagination_logic import (
+    CountFreePaginator, ApproximateCountPaginator, make_paginator)
+from django.core.paginator import Paginator
 
 
-from .constants import DEFAULT_IMAGE_FULL_PATH
+from .constants import DEFAULT_IMAGE_FULL_PATH, RECOMMENDED_POSTERS_CACHE_KEY, CATEGORIES_CACHE_KEY
+
+from .management.commands.profile_imports import parse_importtime
+from .management.commands.load_test import percentile, summarize
+from .business_logic.cache_simulation_logic import SimulatedCache, CacheReplay, Access, read_access_log
+from .business_logic.benchmark_logic import BENCHMARKS, run_benchmarks, save_baselines, load_baselines, find_regressions
+from .business_logic.archive_logic import restore_poster
+from .business_logic.poster_transfer_logic import export_posters, CopyTextUnescaper, ImagesSource, PosterImporter
+from .tasks import purge_deleted_posters, clear_expired_sessions, archive_posters, delete_expired_posters_lite
+
+from posters.routers import (
+    PrimaryReplicaRouter, use_primary, pin_primary, unpin_primary, is_primary_pinned, PRIMARY_STICKY_SESSION_KEY)
+from posters.middleware import ReplicaRoutingMiddleware
+from posters.warmup import warmup_templates, warmup_urls, get_memory_usage
+from posters.sessions import ensure_session_key, SessionStore as RedisSessionStore
+from django.contrib.sessions.middleware import SessionMiddleware
+from posters.metrics import get_cache_key_family
+from prometheus_client import REGISTRY
+from posters.memory_profiler import AllocationTracker, MemoryProfilerMiddleware, HIGH_WATER_MARKS
+from posters.profiler import SamplingProfilerMiddleware, make_profile_token, get_category, PROFILE_SUMMARY_HEADER
+from posters.slow_queries import install_slow_query_log, get_slow_queries, clear_slow_queries
+from posters.query_budget import QueryBudget, QueryRecorder, QueryBudgetTestMixin, fingerprint_sql
 
 # Create your tests here.
 
@@ -51,6 +99,27 @@ class TestPhoneNumberLogic(SimpleTestCase):
             self.assertEqual(standardize_phone_number(
                 test_data[0]), test_data[1])
 
+    def test_normalizer_cache(self) -> None:
+        normalizer = PhoneNumberNormalizer(maxsize=4)
+        self.assertEqual(normalizer.normalize('89568457896'), '+7 956 845-78-96')
+        # The standardized number is cached as its own result: re-saving it doesn't parse it.
+        self.assertEqual(normalizer.normalize('+7 956 845-78-96'), '+7 956 845-78-96')
+        self.assertEqual(normalizer.cache_info()['misses'], 1)
+
+        self.assertRaises(InvalidPhoneNumberException, normalizer.normalize, 'not a number')
+        self.assertRaises(InvalidPhoneNumberException, normalizer.normalize, 'not a number')
+        self.assertEqual(normalizer.cache_info()['misses'], 2)
+        for number in range(4):
+            normalizer.normalize(f'8956845789{number}')
+        self.assertEqual(normalizer.cache_info()['size'], 4)
+
+    def test_normalize_many(self) -> None:
+        normalizer = PhoneNumberNormalizer()
+        self.assertEqual(
+            normalizer.normalize_many(['89568457896', 'not a number', '123', '89568457896']),
+            ['+7 956 845-78-96', None, None, '+7 956 845-78-96'])
+        self.assertEqual(normalizer.cache_info()['misses'], 3)
+
 
 class TestPosterLiteLogic(SimpleTestCase):
     def setUp(self) -> None:
@@ -94,6 +163,133 @@ class TestPosterCurrencyLogic(SimpleTestCase):
                 pass
 
 
+class TestPaginationLogic(SimpleTestCase):
+    class NoLenList(list):
+        """A list that fails the test if the paginator tries to count it."""
+
+        def __len__(self) -> int:
+            raise AssertionError('The total number of objects must not be counted!')
+
+    def setUp(self) -> None:
+        self.posters = self.NoLenList(range(1, 26))
+        return super().setUp()
+
+    def test_count_free_paginator_first_page(self) -> None:
+        page = CountFreePaginator(self.posters, 10).get_page(1)
+        self.assertEqual(list(page.object_list), list(range(1, 11)))
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+        self.assertEqual(page.next_page_number(), 2)
+
+    def test_count_free_paginator_last_page(self) -> None:
+        page = CountFreePaginator(self.posters, 10).get_page(3)
+        self.assertEqual(list(page.object_list), list(range(21, 26)))
+        self.assertFalse(page.has_next())
+        self.assertEqual(page.start_index(), 21)
+        self.assertEqual(page.end_index(), 25)
+
+    def test_count_free_paginator_falls_back_to_first_page(self) -> None:
+        paginator = CountFreePaginator(self.posters, 10)
+        self.assertEqual(paginator.get_page(100).number, 1)
+        self.assertEqual(paginator.get_page('not a number').number, 1)
+        self.assertEqual(paginator.get_page(None).number, 1)
+
+    def test_approximate_count_paginator(self) -> None:
+        paginator = ApproximateCountPaginator(self.posters, 10, count_estimate=lambda: 30)
+        page = paginator.get_page(3)
+        self.assertEqual(paginator.count, 30)
+        self.assertEqual(paginator.num_pages, 3)
+        self.assertFalse(page.has_next())
+
+    def test_approximate_count_pagination_renders_no_page_range(self) -> None:
+        # The estimate may count rows the listing doesn't show, links past the real end are not rendered.
+        page = ApproximateCountPaginator(self.posters, 10, count_estimate=lambda: 1000).get_page(2)
+        html = render_to_string('posters_app/pagination.html', {'page_obj': page})
+        self.assertIn('?page=3', html)
+        self.assertNotIn('?page=100', html)
+        self.assertNotIn('?page=4', html)
+        self.assertIn('~1000 posters', html)
+
+    def test_make_paginator(self) -> None:
+        self.assertIs(type(make_paginator(self.posters, 10, mode='exact')), Paginator)
+        self.assertIs(type(make_paginator(self.posters, 10, mode='count_free')), CountFreePaginator)
+        self.assertIs(type(make_paginator(
+            self.posters, 10, count_estimate=lambda: 25, mode='approximate')), ApproximateCountPaginator)
+        # Search results can't be estimated.
+        self.assertIs(type(make_paginator(self.posters, 10, mode='approximate')), CountFreePaginator)
+        with self.assertRaises(ValueError):
+            make_paginator(self.posters, 10, mode='unknown')
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], REPLICA_ROUTED_APPS=('posters_app',))
+class TestReplicaRouting(SimpleTestCase):
+    def setUp(self) -> None:
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        return super().setUp()
+
+    def route_request(self, request) -> str:
+        """Pass the request through the middleware and return the DB alias a Poster read is routed to."""
+        middleware = ReplicaRoutingMiddleware(lambda request: self.router.db_for_read(Poster))
+        return middleware(request)
+
+    def test_reads_go_to_replica(self) -> None:
+        self.assertEqual(self.router.db_for_read(Poster), 'replica_1')
+        self.assertEqual(self.router.db_for_read(PosterCategories), 'replica_1')
+
+    def test_writes_and_other_apps_go_to_primary(self) -> None:
+        self.assertEqual(self.router.db_for_write(Poster), 'default')
+        self.assertEqual(self.router.db_for_read(User), 'default')
+        self.assertEqual(self.router.db_for_read(Session), 'default')
+        self.assertTrue(self.router.allow_migrate('default', 'posters_app'))
+        self.assertFalse(self.router.allow_migrate('replica_1', 'posters_app'))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self) -> None:
+        self.assertEqual(self.router.db_for_read(Poster), 'default')
+
+    def test_use_primary(self) -> None:
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Poster), 'default')
+        self.assertEqual(self.router.db_for_read(Poster), 'replica_1')
+
+    def test_unsafe_requests_read_from_primary(self) -> None:
+        request = self.factory.post('/')
+        request.session = {}
+        self.assertEqual(self.route_request(request), 'default')
+
+    def test_sticky_primary_window(self) -> None:
+        request = self.factory.get('/')
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = 'session key'
+        request.session = {}
+        self.assertEqual(self.route_request(request), 'replica_1')
+
+        unpin_primary(pin_primary(request, seconds=60))
+        self.assertIn(PRIMARY_STICKY_SESSION_KEY, request.session)
+        self.assertEqual(self.route_request(request), 'default')
+
+        unpin_primary(pin_primary(request, seconds=-1))
+        self.assertEqual(self.route_request(request), 'replica_1')
+
+    def test_pin_primary_does_not_outlive_request(self) -> None:
+        def view(request):
+            pin_primary(request, seconds=60)
+            return self.router.db_for_read(Poster)
+
+        request = self.factory.get('/')
+        request.session = {}
+        self.assertEqual(ReplicaRoutingMiddleware(view)(request), 'default')
+        self.assertFalse(is_primary_pinned())
+
+        # Outside a request the caller resets the pin.
+        request = self.factory.get('/')
+        request.session = {}
+        token = pin_primary(request, seconds=60)
+        self.assertTrue(is_primary_pinned())
+        unpin_primary(token)
+        self.assertFalse(is_primary_pinned())
+
+
 class TestPosterModels(TestCase):
     def setUp(self) -> None:
         PosterCategories.objects.create(name='Goods')
@@ -398,4 +594,999 @@ class TestViewLogic(TestCase):
         self.assertIn(self.poster1, filtered_queryset)
         self.assertIn(self.poster2, filtered_queryset)
         self.assertIn(self.poster3, filtered_queryset)
-        self.assertIn(self.poster4, filtered_queryset)
\ No newline at end of file
+        self.assertIn(self.poster4, filtered_queryset)
+
+class TestQueryPlans(TestCase):
+    """
+    Run 'EXPLAIN' on every 'QueryFetchers' method against a seeded DB and fail if
+    a sequential scan or a sort appears on the hot paths.
+    Sequential scans are disabled for the session, so the planner chooses plans
+    the same way it would on a large table, instead of scanning a tiny seeded heap.
+    """
+    FORBIDDEN_NODES = ('Seq Scan', 'Sort', 'Incremental Sort')
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.categories = [PosterCategories.objects.create(name=f'Category {i}') for i in range(5)]
+        cls.user = User.objects.create(username='query_plans')
+        posters = Poster.objects.bulk_create([
+            Poster(
+                owner=cls.user,
+                status=bool(i % 4),
+                phone_number='+7 926 584-75-23',
+                header=f'Poster {i}',
+                description=f'Description of the poster {i}',
+                category=cls.categories[i % len(cls.categories)],
+                price=Decimal(i),
+                currency='USD',
+            ) for i in range(500)
+        ])
+        PosterImages.objects.bulk_create([
+            PosterImages(poster_id=poster, image_path=f'poster_images/{poster.id}.jpg') for poster in posters
+        ])
+        cls.poster = posters[1]
+
+    def setUp(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute('SET enable_seqscan = off')
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute('RESET enable_seqscan')
+        return super().tearDown()
+
+    def get_plan_nodes(self, plan: dict) -> list[str]:
+        """Flatten the JSON plan into a list of node types."""
+        nodes = [plan['Node Type']]
+        for sub_plan in plan.get('Plans', []):
+            nodes += self.get_plan_nodes(sub_plan)
+        return nodes
+
+    def assertNoSeqScanOrSort(self, fetch) -> None:
+        """
+        Execute the fetch function, 'EXPLAIN' every executed query and check the plan nodes.
+        :Param fetch: A function executing one or more queries.
+        """
+        with CaptureQueriesContext(connection) as context:
+            fetch()
+
+        self.assertTrue(context.captured_queries)
+        for query in context.captured_queries:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {query['sql']}")
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            nodes = self.get_plan_nodes(plan[0]['Plan'])
+            for forbidden_node in self.FORBIDDEN_NODES:
+                self.assertNotIn(forbidden_node, nodes, msg=f"{query['sql']}\n{nodes}")
+
+    def test_fetch_posters(self) -> None:
+        self.assertNoSeqScanOrSort(lambda: list(QueryFetchers.fetch_posters()[:10]))
+
+    def test_fetch_poster_by_id(self) -> None:
+        self.assertNoSeqScanOrSort(lambda: QueryFetchers.fetch_poster_by_id(self.poster.id))
+
+    def test_fetch_posters_by_category(self) -> None:
+        self.assertNoSeqScanOrSort(lambda: list(
+            QueryFetchers.fetch_posters_by_category(self.categories[0].name)[:10]))
+
+    def test_fetch_categories_and_count_posters(self) -> None:
+        self.assertNoSeqScanOrSort(lambda: list(QueryFetchers.fetch_categories_and_count_posters()))
+
+    def test_fetch_users_posters(self) -> None:
+        self.assertNoSeqScanOrSort(lambda: list(QueryFetchers.fetch_users_posters(self.user.id)[:10]))
+
+    def test_fetch_estimated_rows_count(self) -> None:
+        self.assertNoSeqScanOrSort(lambda: QueryFetchers.fetch_estimated_rows_count(Poster))
+
+    @override_settings(POSTERS_LISTING_WINDOW_DAYS=30)
+    def test_listing_window(self) -> None:
+        Poster.objects.filter(id=self.poster.id).update(created=timezone.now() - datetime.timedelta(days=31))
+        category = self.poster.category
+
+        self.assertNotIn(self.poster.id, QueryFetchers.fetch_posters().values_list('id', flat=True))
+        self.assertNotIn(self.poster.id, QueryFetchers.fetch_posters_by_category(category.name).values_list('id', flat=True))
+        windowed_count = QueryFetchers.fetch_categories_and_count_posters().get(id=category.id).posters_in_category
+        self.assertEqual(windowed_count, QueryFetchers.fetch_posters_by_category(category.name).count())
+        self.assertEqual(QueryFetchers.fetch_poster_by_id(self.poster.id).id, self.poster.id)
+
+        with override_settings(POSTERS_LISTING_WINDOW_DAYS=0):
+            self.assertIn(self.poster.id, QueryFetchers.fetch_posters().values_list('id', flat=True))
+        # Restored posters are listed again (they keep their 'created').
+        Poster.objects.filter(id=self.poster.id).update(restored=timezone.now())
+        self.assertIn(self.poster.id, QueryFetchers.fetch_posters().values_list('id', flat=True))
+
+
+class TestQueryBudget(SimpleTestCase):
+    def test_fingerprint_sql(self) -> None:
+        self.assertEqual(
+            fingerprint_sql('SELECT * FROM "poster"  WHERE "id" = %s AND "name" = \'x\' LIMIT 21'),
+            'SELECT * FROM "poster" WHERE "id" = ? AND "name" = ? LIMIT ?')
+        self.assertEqual(
+            fingerprint_sql('SELECT * FROM "poster" WHERE "id" IN (%s, %s, %s)'),
+            fingerprint_sql('SELECT * FROM "poster" WHERE "id" IN (1, 2)'))
+
+    def test_recorder_violations(self) -> None:
+        recorder = QueryRecorder()
+        for poster_id in range(6):
+            recorder.queries.append((f'SELECT * FROM "image" WHERE "poster_id" = {poster_id}', 0.001))
+
+        self.assertEqual(recorder.count, 6)
+        self.assertEqual(len(recorder.repeated_queries(threshold=5)), 1)
+        self.assertFalse(recorder.get_violations(QueryBudget(queries=10)) == [])  # N+1 is reported.
+        self.assertEqual(len(recorder.get_violations(QueryBudget(queries=3, db_time_ms=1))), 3)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestViewsQueryBudgets(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.category = PosterCategories.objects.create(name='Hardware')
+        cls.user = User.objects.create(username='query_budgets')
+        cls.posters = [
+            Poster.objects.create(
+                owner=cls.user,
+                phone_number='+79265847523',
+                header=f'Poster {i}',
+                description='Query budgets',
+                category=cls.category,
+                price=Decimal(i),
+                currency='USD',
+            ) for i in range(15)
+        ]
+        for poster in cls.posters:
+            PosterImages.objects.create(poster_id=poster, image_path=f'poster_images/{poster.id}.jpg')
+
+    def setUp(self) -> None:
+        translation.activate('en')
+        return super().setUp()
+
+    def test_home_page(self) -> None:
+        self.assertWithinQueryBudget(reverse('posters_app:home'))
+        self.assertWithinQueryBudget(reverse('posters_app:home') + '?page=2&query=Poster')
+
+    def test_categories(self) -> None:
+        self.assertWithinQueryBudget(reverse('posters_app:categories'))
+        self.assertWithinQueryBudget(reverse('posters_app:list_posters_in_category', args=['Hardware']))
+
+    @override_settings(POSTERS_PAGINATION_MODE='approximate')
+    def test_approximate_pagination(self) -> None:
+        # Totals come from the estimates (reltuples, the cached category counts), not 'COUNT(*)'.
+        for url in (reverse('posters_app:home'), reverse('posters_app:list_posters_in_category', args=['Hardware'])):
+            response = self.assertWithinQueryBudget(url)
+            self.assertRegex(response.content.decode(), r'~\d+ posters?<')
+
+    def test_poster_view(self) -> None:
+        self.assertWithinQueryBudget(reverse('posters_app:poster_view', args=[self.posters[0].id]))
+
+    def test_edit_poster(self) -> None:
+        self.client.force_login(self.user)
+        self.assertWithinQueryBudget(reverse('posters_app:edit_poster', args=[self.posters[0].id]))
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    MEDIA_ROOT=tempfile.mkdtemp())
+class TestSoftDelete(TestCase):
+    def setUp(self) -> None:
+        translation.activate('en')
+        category = PosterCategories.objects.create(name='Hardware')
+        self.owner = User.objects.create(username='soft_delete_owner')
+        self.other_user = User.objects.create(username='soft_delete_other')
+        self.posters = [
+            Poster.objects.create(
+                owner=self.owner,
+                phone_number='+79265847523',
+                header=f'Poster {i}',
+                description='Soft delete',
+                category=category,
+                price=Decimal(i),
+                currency='USD',
+            ) for i in range(3)
+        ]
+        self.image_paths = []
+        for poster in self.posters:
+            image_path = default_storage.save(f'poster_images/{poster.uuid}.jpg', ContentFile(b'image bytes'))
+            PosterImages.objects.create(poster_id=poster, image_path=image_path)
+            self.image_paths.append(image_path)
+        return super().setUp()
+
+    def test_delete_is_a_single_update(self) -> None:
+        poster = self.posters[0]
+        self.client.force_login(self.owner)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('posters_app:delete_poster_by_id', args=[poster.id]))
+
+        self.assertRedirects(response, reverse('posters_app:home'), fetch_redirect_response=False)
+        self.assertFalse([query for query in context.captured_queries if 'DELETE' in query['sql']])
+        poster.refresh_from_db()
+        self.assertIsNotNone(poster.deleted)
+        self.assertFalse(poster.status)
+        self.assertTrue(PosterImages.objects.filter(poster_id=poster).exists())
+        self.assertTrue(default_storage.exists(self.image_paths[0]))
+        self.assertNotIn(poster, Poster.alive.all())
+        self.assertIsNone(QueryFetchers.fetch_poster_by_id(poster.id))
+        self.assertNotIn(poster, QueryFetchers.fetch_users_posters(self.owner.id))
+
+    def test_delete_someone_else_poster(self) -> None:
+        self.client.force_login(self.other_user)
+        response = self.client.post(reverse('posters_app:delete_poster_by_id', args=[self.posters[0].id]))
+        self.assertContains(response, 'Not your poster')
+        self.assertIn(self.posters[0], Poster.alive.all())
+
+        response = self.client.post(reverse('posters_app:delete_poster_by_id', args=[10 ** 6]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_purge_deleted_posters(self) -> None:
+        Poster.objects.filter(id__in=[self.posters[0].id, self.posters[1].id]).soft_delete()
+        # Only posters deleted before the purge delay are purged.
+        Poster.objects.filter(id=self.posters[0].id).update(
+            deleted=timezone.now() - datetime.timedelta(days=30))
+
+        purged = purge_deleted_posters(batch_size=1, max_batches=5)
+
+        self.assertEqual(purged['posters'], 1)
+        self.assertEqual(purged['images'], 1)
+        self.assertEqual(purged['bytes'], len(b'image bytes'))
+        self.assertFalse(Poster.objects.filter(id=self.posters[0].id).exists())
+        self.assertFalse(PosterImages.objects.filter(poster_id=self.posters[0].id).exists())
+        self.assertFalse(default_storage.exists(self.image_paths[0]))
+        self.assertTrue(Poster.objects.filter(id=self.posters[1].id).exists())
+        self.assertTrue(default_storage.exists(self.image_paths[1]))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestSessionsLazyCreation(TestCase):
+    def setUp(self) -> None:
+        translation.activate('en')
+        return super().setUp()
+
+    def test_read_only_traffic_is_session_free(self) -> None:
+        for url in (reverse('posters_app:home'), reverse('posters_app:categories')):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    def test_ensure_session_key(self) -> None:
+        request = RequestFactory().get('/')
+        SessionMiddleware(lambda request: None).process_request(request)
+        self.assertIsNone(request.session.session_key)
+
+        session_key = ensure_session_key(request)
+        self.assertTrue(Session.objects.filter(session_key=session_key).exists())
+        # The existing session is reused.
+        self.assertEqual(ensure_session_key(request), session_key)
+        # The key can be referenced by a foreign key.
+        PosterLite.objects.create(owner_id=session_key, phone_number='+79265847523', header='Lite',
+                                  description='-', price=Decimal(1), currency='USD')
+
+
+@override_settings(
+    SESSION_ENGINE='posters.sessions',
+    SESSION_CACHE_ALIAS='sessions',
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+    })
+class TestSessionsRedisEngine(TestCase):
+    def test_session_data_is_not_stored_in_db(self) -> None:
+        session = RedisSessionStore()
+        session['user_email'] = 'chabrovs.dev@gmail.com'
+        session.save()
+
+        self.assertFalse(Session.objects.exists())
+        self.assertEqual(RedisSessionStore(session.session_key)['user_email'], 'chabrovs.dev@gmail.com')
+
+    def test_owner_sessions_have_a_slim_db_record(self) -> None:
+        request = RequestFactory().get('/')
+        SessionMiddleware(lambda request: None).process_request(request)
+        session_key = ensure_session_key(request)
+        request.session['user_email'] = 'chabrovs.dev@gmail.com'
+        request.session.save()
+
+        record = Session.objects.get(session_key=session_key)
+        self.assertEqual(record.session_data, '')
+        self.assertGreater(record.expire_date, timezone.now())
+        # The record is created once per session.
+        with self.assertNumQueries(0):
+            self.assertEqual(ensure_session_key(request), session_key)
+        PosterLite.objects.create(owner_id=session_key, phone_number='+79265847523', header='Lite',
+                                  description='-', price=Decimal(1), currency='USD')
+
+    def test_cycle_key_without_db_record_skips_the_db(self) -> None:
+        session = RedisSessionStore()
+        session['user_email'] = 'chabrovs.dev@gmail.com'
+        session.save()
+        old_key = session.session_key
+
+        with self.assertNumQueries(0):
+            session.cycle_key()
+        self.assertNotEqual(session.session_key, old_key)
+        self.assertEqual(session['user_email'], 'chabrovs.dev@gmail.com')
+
+    def test_cycle_key_moves_the_db_record(self) -> None:
+        session = RedisSessionStore()
+        session.create()
+        session.ensure_db_record()
+        session.save()
+        old_key = session.session_key
+
+        session.cycle_key()
+        self.assertLessEqual(Session.objects.get(session_key=old_key).expire_date, timezone.now())
+        self.assertGreater(Session.objects.get(session_key=session.session_key).expire_date, timezone.now())
+
+    def test_delete_expires_the_db_record(self) -> None:
+        session = RedisSessionStore()
+        session.create()
+        session.ensure_db_record()
+        session.save()
+
+        session.delete()
+        self.assertLessEqual(Session.objects.get(session_key=session.session_key).expire_date, timezone.now())
+        self.assertEqual(RedisSessionStore(session.session_key).load(), {})
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestSessionsExpiredCleanup(TestCase):
+    def setUp(self) -> None:
+        now = timezone.now()
+        self.expired = [
+            Session.objects.create(session_key=f'expired{i}', session_data='', expire_date=now - datetime.timedelta(days=1))
+            for i in range(3)
+        ]
+        self.active = Session.objects.create(session_key='active', session_data='', expire_date=now + datetime.timedelta(days=1))
+        category = PosterCategories.objects.create(name='Hardware')
+        self.posters_lite = [
+            PosterLite.objects.create(
+                owner=session,
+                client=session,
+                phone_number='+79265553322',
+                header='An old phone',
+                description='I would like to sell my old phone',
+                category=category,
+                price=Decimal(180),
+                currency='GBP',
+            ) for session in (self.expired[0], self.active)
+        ]
+        self.image_path = default_storage.save('poster_lite_images/expired.jpg', ContentFile(b'image bytes'))
+        PosterLiteImages.objects.create(poster_id=self.posters_lite[0], image_path=self.image_path)
+        return super().setUp()
+
+    def test_expired_sessions_are_cleared_in_batches(self) -> None:
+        cleared = clear_expired_sessions(batch_size=2)
+
+        self.assertEqual(cleared['sessions'], 3)
+        self.assertEqual(cleared['posters_lite'], 1)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['active'])
+        orphan = PosterLite.objects.get(id=self.posters_lite[0].id)
+        self.assertIsNone(orphan.owner_id)
+        self.assertIsNone(orphan.client_id)
+        self.assertEqual(PosterLite.objects.get(id=self.posters_lite[1].id).owner_id, 'active')
+
+    @override_settings(SESSIONS_CLEANUP_ORPHANS_POLICY='delete')
+    def test_orphans_are_deleted_with_images(self) -> None:
+        cleared = clear_expired_sessions()
+
+        self.assertEqual(cleared['images'], 1)
+        self.assertFalse(PosterLite.objects.filter(id=self.posters_lite[0].id).exists())
+        self.assertTrue(PosterLite.objects.filter(id=self.posters_lite[1].id).exists())
+        self.assertFalse(default_storage.exists(self.image_path))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'page_cache'}})
+class TestViewsAnonymousPageCache(TestCase):
+    def setUp(self) -> None:
+        translation.activate('en')
+        self.category = PosterCategories.objects.create(name='Hardware')
+        self.owner = User.objects.create(username='page_cache_owner')
+        self.poster = Poster.objects.create(
+            owner=self.owner,
+            phone_number='+79265847523',
+            header='Cached poster',
+            description='Page cache',
+            category=self.category,
+            price=Decimal(1),
+            currency='USD',
+        )
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        from django.core.cache import cache
+        cache.clear()
+        return super().tearDown()
+
+    def test_anonymous_pages_are_cached(self) -> None:
+        for url in (reverse('posters_app:home'), reverse('posters_app:categories'),
+                    reverse('posters_app:list_posters_in_category', args=('Hardware',))):
+            response = self.client.get(url)
+            self.assertEqual(response[PAGE_CACHE_HEADER], 'MISS')
+            with self.assertNumQueries(0):
+                cached_response = self.client.get(url)
+            self.assertEqual(cached_response[PAGE_CACHE_HEADER], 'HIT')
+            self.assertEqual(cached_response.content, response.content)
+            self.assertIn('Cookie', cached_response['Vary'])
+            self.assertNotIn(settings.CSRF_COOKIE_NAME, cached_response.cookies)
+            self.assertNotIn(b'csrfmiddlewaretoken', cached_response.content)
+
+    def test_cache_key_varies_on_language_page_and_query(self) -> None:
+        url = reverse('posters_app:home')
+        self.client.get(url)
+        self.assertEqual(self.client.get(url, {'page': 2})[PAGE_CACHE_HEADER], 'MISS')
+        self.assertEqual(self.client.get(url, {'query': 'cached'})[PAGE_CACHE_HEADER], 'MISS')
+        self.assertEqual(self.client.get(url, {'utm_source': 'mail'})[PAGE_CACHE_HEADER], 'HIT')
+        with translation.override('ru'):
+            self.assertEqual(self.client.get(reverse('posters_app:home'))[PAGE_CACHE_HEADER], 'MISS')
+
+    def test_poster_writes_invalidate_pages(self) -> None:
+        url = reverse('posters_app:home')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.poster.header = 'Updated poster'
+            self.poster.save()
+
+        self.assertEqual(self.client.get(url)[PAGE_CACHE_HEADER], 'MISS')
+        self.assertEqual(self.client.get(url)[PAGE_CACHE_HEADER], 'HIT')
+
+    def test_poster_deletes_invalidate_pages(self) -> None:
+        # No delete receivers, the batch jobs keep the fast delete path.
+        for model in (Poster, PosterImages, PosterCategories):
+            self.assertFalse(post_delete.has_listeners(model))
+
+        url = reverse('posters_app:home')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.poster.delete()
+
+        self.assertEqual(self.client.get(url)[PAGE_CACHE_HEADER], 'MISS')
+
+    def test_authenticated_users_are_not_cached(self) -> None:
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('posters_app:home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(PAGE_CACHE_HEADER, response)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'poster_cards'}})
+class TestViewsPosterCards(TestCase):
+    def setUp(self) -> None:
+        translation.activate('en')
+        owner = User.objects.create(username='poster_cards_owner')
+        for i in range(4):
+            Poster.objects.create(
+                owner=owner,
+                phone_number='+79265847523',
+                header=f'Card {i}',
+                description='Poster cards',
+                price=Decimal(i),
+                currency='USD',
+            )
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        from django.core.cache import cache
+        cache.clear()
+        return super().tearDown()
+
+    def test_cards_are_rendered_once_per_version(self) -> None:
+        from django.core.cache import cache
+        posters = list(QueryFetchers.fetch_posters())
+        cards = render_poster_cards(posters)
+        self.assertEqual(len(cards), 4)
+        self.assertIn('Card 3', cards[0])
+        self.assertIn(reverse('posters_app:poster_view', args=(posters[0].id,)), cards[0])
+        self.assertEqual(cache.get(make_poster_card_cache_key(posters[0])), cards[0])
+
+        # A new version of the poster gets a new card.
+        posters[0].header = 'Updated card'
+        self.assertIsNone(cache.get(make_poster_card_cache_key(posters[0])))
+        self.assertIn('Updated card', render_poster_cards(posters)[0])
+
+    def test_home_page_renders_cards(self) -> None:
+        self.client.force_login(User.objects.get(username='poster_cards_owner'))
+        response = self.client.get(reverse('posters_app:home'))
+        self.assertEqual(len(response.context['poster_cards']), 4)
+        self.assertContains(response, 'class="thumbnail"', count=4)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    POSTER_SNAPSHOTS_ROOT=tempfile.mkdtemp())
+class TestPosterSnapshots(TestCase):
+    def setUp(self) -> None:
+        category = PosterCategories.objects.create(name='Hardware')
+        self.poster = Poster.objects.create(
+            owner=User.objects.create(username='snapshot_owner'),
+            phone_number='+79265847523',
+            header='Snapshot poster',
+            description='Static snapshot',
+            category=category,
+            price=Decimal(1),
+            currency='USD',
+        )
+        return super().setUp()
+
+    def test_publish_and_remove(self) -> None:
+        self.assertEqual(publish_poster_snapshot(self.poster.id), len(settings.LANGUAGES))
+        for language, _ in settings.LANGUAGES:
+            path = get_snapshot_path(self.poster.id, language)
+            self.assertTrue(path.endswith(f'/{language}/posters/poster/{self.poster.id}/index.html'))
+            with open(path, encoding='utf-8') as snapshot_file:
+                snapshot = snapshot_file.read()
+            self.assertIn('Snapshot poster', snapshot)
+            # Rendered as an anonymous visitor sees the page.
+            self.assertNotIn('csrfmiddlewaretoken', snapshot)
+            self.assertNotIn(reverse('posters_app:edit_poster', args=(self.poster.id,)), snapshot)
+
+        self.assertEqual(remove_poster_snapshot(self.poster.id), len(settings.LANGUAGES))
+        self.assertFalse(os.path.exists(get_snapshot_path(self.poster.id, 'en')))
+
+    def test_deleted_posters_are_not_published(self) -> None:
+        publish_poster_snapshot(self.poster.id)
+        Poster.objects.filter(id=self.poster.id).soft_delete()
+
+        self.assertEqual(publish_poster_snapshot(self.poster.id), 0)
+        self.assertFalse(os.path.exists(get_snapshot_path(self.poster.id, 'en')))
+
+
+class TestProfileImports(SimpleTestCase):
+    def test_parse_importtime(self) -> None:
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     phonenumbers.util\n"
+            "import time:      2500 |       2620 |   phonenumbers\n"
+            "some other output\n"
+        )
+        self.assertEqual(parse_importtime(stderr), [
+            ('phonenumbers.util', 120, 120),
+            ('phonenumbers', 2500, 2620),
+        ])
+
+
+class TestWarmup(SimpleTestCase):
+    def test_warmup_steps(self) -> None:
+        warmup_templates()
+        warmup_urls()
+
+    def test_memory_usage(self) -> None:
+        usage = get_memory_usage()
+        if usage:
+            self.assertGreater(usage['rss'], 0)
+            self.assertEqual(usage['shared'] + usage['private'], usage['rss'])
+
+
+class TestLoadTestReport(SimpleTestCase):
+    def test_percentile(self) -> None:
+        latencies = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(latencies, 50), 50.0)
+        self.assertEqual(percentile(latencies, 95), 95.0)
+        self.assertEqual(percentile(latencies, 99), 99.0)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_summarize(self) -> None:
+        summary = summarize([30.0, 10.0, 20.0], errors=1, duration=2.0)
+        self.assertEqual(summary['requests'], 3)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['throughput_rps'], 1.5)
+        self.assertEqual(summary['p50_ms'], 20.0)
+        self.assertEqual(summary['p99_ms'], 30.0)
+
+
+class TestBenchmarks(TestCase):
+    def test_benchmarks_run(self) -> None:
+        results = run_benchmarks(repeat=1, min_duration=0.001)
+        self.assertEqual(set(results), {benchmark.name for benchmark in BENCHMARKS})
+        for result in results.values():
+            self.assertGreater(result['us'], 0)
+            self.assertGreater(result['normalized'], 0)
+
+    def test_find_regressions(self) -> None:
+        results = {'fast': {'us': 1.0, 'normalized': 1.0}, 'slow': {'us': 2.0, 'normalized': 2.0},
+                   'new': {'us': 9.0, 'normalized': 9.0}}
+        baselines = {'fast': 1.1, 'slow': 1.0}
+        self.assertEqual(find_regressions(results, baselines, threshold=1.3), {'slow': 2.0})
+
+    def test_save_baselines(self) -> None:
+        path = os.path.join(tempfile.mkdtemp(), 'baselines.json')
+        save_baselines({'a': {'us': 1.0, 'normalized': 0.123456}}, path)
+        save_baselines({'b': {'us': 1.0, 'normalized': 2.0}}, path)
+        self.assertEqual(load_baselines(path), {'a': 0.1235, 'b': 2.0})
+
+
+class TestCacheSimulation(SimpleTestCase):
+    def test_simulated_cache_expiry_and_eviction(self) -> None:
+        cache_backend = SimulatedCache(max_memory=250, policy='allkeys-lru')
+        cache_backend.set('a', bytes(100), 10)
+        cache_backend.set('b', bytes(100), 100)
+        cache_backend.advance(5)
+        self.assertEqual(cache_backend.get('a'), bytes(100))
+        cache_backend.advance(11)
+        self.assertIsNone(cache_backend.get('a'))
+        self.assertEqual(cache_backend.used_memory, 101)
+        cache_backend.set('c', bytes(100), 100)
+        cache_backend.set('d', bytes(100), 100)
+        self.assertLessEqual(cache_backend.used_memory, 250)
+        self.assertEqual(cache_backend.stats['evictions'], 1)
+
+    def test_read_access_log(self) -> None:
+        lines = [
+            '10.0.0.1 - - [12/May/2024:18:30:15 +0000] "GET /en/posters/?page=2 HTTP/1.1" 200 5120 "-" "curl"',
+            '10.0.0.1 - - [12/May/2024:18:30:16 +0000] "POST /en/posters/create_poster/ HTTP/1.1" 302 0 "-" "curl"',
+            '10.0.0.1 - - [12/May/2024:18:30:17 +0000] "GET /ru/posters/get_poster_image/7 HTTP/1.1" 200 9 "-" "-"',
+            '10.0.0.1 - - [12/May/2024:18:30:18 +0000] "GET /en/posters/poster/3 HTTP/1.1" 404 9 "-" "-"',
+        ]
+        self.assertEqual(list(read_access_log(lines)), [
+            Access(0.0, 'home', {}),
+            Access(2.0, 'image', {'image_id': '7'}),
+        ])
+
+    def test_replay(self) -> None:
+        cache_replay = CacheReplay(SimulatedCache(), timeouts={'image': 60})
+        cache_replay.replay([Access(0, 'image', {'image_id': '1'}), Access(30, 'image', {'image_id': '1'}),
+                             Access(100, 'image', {'image_id': '1'}), Access(101, 'home')])
+        report = cache_replay.report()
+        self.assertEqual(report['layers']['image']['fetches'], 2)
+        self.assertEqual(report['layers']['image']['hit_ratio'], round(1 / 3, 4))
+        # Image row lookups (3) and the home page fetches (2).
+        self.assertEqual(report['db_queries'], 5)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   POSTERS_METRICS_ENABLED=True)
+class TestViewsMetrics(TestCase):
+    def test_metrics_endpoint(self) -> None:
+        translation.activate('en')
+        self.client.get(reverse('posters_app:categories'))
+        self.client.get(reverse('posters_app:get_image_by_image_id', args=(0,)))
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        metrics = response.content.decode()
+        self.assertIn('posters_http_request_duration_seconds_count{method="GET",status="200",view="posters_app:categories"}', metrics)
+        self.assertIn('posters_db_queries_total{view="posters_app:categories"}', metrics)
+        self.assertIn('posters_cache_requests_total{family="categories_cached",result="miss"}', metrics)
+        self.assertIn('posters_image_bytes_served_total{endpoint="get_image_by_image_id"}', metrics)
+
+    def test_metrics_endpoint_is_internal(self) -> None:
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.7').status_code, 404)
+
+    def test_cache_key_family(self) -> None:
+        self.assertEqual(get_cache_key_family('image_by_id=/media/poster_images/a.jpg'), 'image_by_id')
+        self.assertEqual(get_cache_key_family('recommended_posters_cached'), 'recommended_posters_cached')
+
+
+class TestSamplingProfiler(SimpleTestCase):
+    @staticmethod
+    def slow_view(request):
+        deadline = time.perf_counter() + 0.03
+        while time.perf_counter() < deadline:
+            pass
+        return HttpResponse('ok')
+
+    def test_signed_request_is_profiled(self) -> None:
+        output_dir = tempfile.mkdtemp()
+        middleware = SamplingProfilerMiddleware(self.slow_view)
+        with override_settings(PROFILER_OUTPUT_DIR=output_dir, PROFILER_SAMPLE_RATE=0.0):
+            response = middleware(RequestFactory().get('/', HTTP_X_PROFILE=make_profile_token()))
+            self.assertIn('python=', response[PROFILE_SUMMARY_HEADER])
+            with open(os.path.join(output_dir, 'unresolved.collapsed')) as collapsed_file:
+                self.assertIn('posters_app.tests:slow_view', collapsed_file.read())
+
+            response = middleware(RequestFactory().get('/', HTTP_X_PROFILE='profile:forged:signature'))
+            self.assertNotIn(PROFILE_SUMMARY_HEADER, response)
+            response = middleware(RequestFactory().get('/'))
+            self.assertNotIn(PROFILE_SUMMARY_HEADER, response)
+
+    def test_get_category(self) -> None:
+        self.assertEqual(get_category(['django.template.base:render', 'django.db.models.query:__iter__']), 'orm')
+        self.assertEqual(get_category(['django.core.cache.backends.locmem:get', 'django.db.models.base:__setstate__']), 'cache')
+        self.assertEqual(get_category(['posters_app.views:get_context_data']), 'python')
+
+
+class TestMemoryProfiler(SimpleTestCase):
+    def tearDown(self) -> None:
+        tracemalloc.stop()
+        return super().tearDown()
+
+    def test_allocation_tracker(self) -> None:
+        with AllocationTracker(top_sites=5) as tracker:
+            buffered = bytes(2 * 1024 * 1024)
+            del buffered
+            retained = [bytearray(256 * 1024)]
+        self.assertGreaterEqual(tracker.peak, 2 * 1024 * 1024)
+        self.assertGreaterEqual(tracker.retained, 256 * 1024)
+        self.assertIn('tests.py', tracker.sites[0][0])
+        self.assertTrue(retained)
+
+    @override_settings(MEMORY_PROFILER_ENABLED=True, MEMORY_PROFILER_TOP_SITES=0)
+    def test_middleware_high_water_mark(self) -> None:
+        middleware = MemoryProfilerMiddleware(lambda request: HttpResponse(bytes(1024 * 1024)))
+        middleware(RequestFactory().get('/'))
+        self.assertGreaterEqual(HIGH_WATER_MARKS[('view', 'unresolved')], 1024 * 1024)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'slow_queries'}},
+                   SLOW_QUERY_LOG_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_EXPLAIN_RATE=1.0)
+class TestSlowQueryLog(TestCase):
+    def setUp(self) -> None:
+        install_slow_query_log(sender=None, connection=connection)
+        clear_slow_queries()
+
+    def test_fetcher_queries_are_logged_with_plans(self) -> None:
+        list(QueryFetchers.fetch_posters().filter(price__gte=0)[:5])
+        entry = next(entry for entry in get_slow_queries() if entry['fetcher'] == 'QueryFetchers.fetch_posters')
+        self.assertEqual(entry['database'], 'default')
+        self.assertIn('Execution Time', entry['explain'])
+
+    def test_admin_page(self) -> None:
+        user = User.objects.create_superuser(username='slow_query_admin', password='password')
+        self.client.force_login(user)
+        translation.activate('en')
+        response = self.client.get(reverse('admin:posters_app_slowquery_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Slow queries')
+        self.assertContains(response, 'view:admin:posters_app_slowquery_changelist')
+
+
+@override_settings(POSTERS_ARCHIVE_INACTIVE_DAYS=90, POSTERS_ARCHIVE_AGE_DAYS=730)
+class TestPostersArchive(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username='archive_owner')
+        self.posters = {}
+        for name, status, age_days in (('inactive', False, 100), ('old', True, 800), ('recent', False, 10), ('active', True, 100)):
+            poster = Poster.objects.create(owner=self.user, status=status, phone_number='+79265847523',
+                                           header=name, description=name, price=Decimal(1), currency='USD')
+            PosterImages.objects.create(poster_id=poster, image_path=f'poster_images/{name}.jpg')
+            Poster.objects.filter(id=poster.id).update(created=timezone.now() - datetime.timedelta(days=age_days))
+            self.posters[name] = poster
+        return super().setUp()
+
+    def test_archive_and_restore(self) -> None:
+        self.assertEqual(archive_posters(batch_size=1), {'posters': 2, 'images': 2})
+        self.assertCountEqual(ArchivedPoster.objects.values_list('header', flat=True), ['inactive', 'old'])
+        self.assertCountEqual(Poster.objects.values_list('header', flat=True), ['recent', 'active'])
+        archived_image = ArchivedPosterImages.objects.get(poster_id=self.posters['old'].id)
+        self.assertEqual(archived_image.image_path, 'poster_images/old.jpg')
+
+        self.client.force_login(self.user)
+        translation.activate('en')
+        response = self.client.get(reverse('user_account_app:view_user_account'))
+        self.assertContains(response, 'Archived posters')
+
+        poster = restore_poster(self.posters['old'].id)
+        self.assertEqual((poster.uuid, poster.header), (self.posters['old'].uuid, 'old'))
+        self.assertEqual(list(poster.poster_images.values_list('image_path', flat=True)), ['poster_images/old.jpg'])
+        self.assertFalse(ArchivedPoster.objects.filter(id=poster.id).exists())
+        # The restored poster is not archived again by the next run.
+        self.assertEqual(archive_posters(), {'posters': 0, 'images': 0})
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'archive'}})
+    def test_archive_and_restore_invalidate_listing_caches(self) -> None:
+        from django.core.cache import cache
+        for move in (lambda: archive_posters(), lambda: restore_poster(self.posters['old'].id)):
+            cache.set_many({RECOMMENDED_POSTERS_CACHE_KEY: 'cached', CATEGORIES_CACHE_KEY: 'cached'})
+            with self.captureOnCommitCallbacks(execute=True):
+                move()
+            self.assertEqual(cache.get_many([RECOMMENDED_POSTERS_CACHE_KEY, CATEGORIES_CACHE_KEY]), {})
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestPostersLiteExpiry(TestCase):
+    def setUp(self) -> None:
+        now = timezone.now()
+        self.posters_lite = [
+            PosterLite.objects.create(
+                phone_number='+79265553322',
+                header='An old phone',
+                description='I would like to sell my old phone',
+                price=Decimal(180),
+                currency='GBP',
+                expires=expires,
+            ) for expires in (now - datetime.timedelta(hours=1), now - datetime.timedelta(minutes=1), now + datetime.timedelta(days=1))
+        ]
+        self.image_path = default_storage.save('poster_lite_images/expired.jpg', ContentFile(b'image bytes'))
+        PosterLiteImages.objects.create(poster_id=self.posters_lite[0], image_path=self.image_path)
+        return super().setUp()
+
+    def test_new_poster_lite_expires(self) -> None:
+        self.assertAlmostEqual((PosterLite(price=Decimal(1)).expires - timezone.now()).total_seconds(),
+                               POSTERLITE_LIFETIME.total_seconds(), delta=5)
+
+    def test_expired_posters_lite_are_deleted_in_batches(self) -> None:
+        labels = {'task': 'delete_expired_posters_lite', 'table': 'posters_lite'}
+        deleted_before = REGISTRY.get_sample_value('posters_cleanup_rows_total', labels) or 0
+
+        deleted = delete_expired_posters_lite(batch_size=1)
+
+        self.assertEqual(deleted, {'posters_lite': 2, 'images': 1, 'bytes': len(b'image bytes')})
+        self.assertEqual(list(PosterLite.objects.values_list('id', flat=True)), [self.posters_lite[2].id])
+        self.assertFalse(default_storage.exists(self.image_path))
+        self.assertEqual(REGISTRY.get_sample_value('posters_cleanup_rows_total', labels) - deleted_before, 2)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   MEDIA_ROOT=tempfile.mkdtemp())
+class TestPostersTransfer(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username='transfer_owner')
+        category = PosterCategories.objects.create(name='Hardware')
+        for i in range(3):
+            poster = Poster.objects.create(
+                owner=self.user, category=category if i else None, phone_number='+79265847523',
+                header=f'Poster {i}', description='A "quoted", multi-line\ndescription with a \\ backslash',
+                price=Decimal('10.50'), currency='USD')
+            PosterImages.objects.create(poster_id=poster, image_path=f'photo_{i}.jpg')
+        self.images_dir = tempfile.mkdtemp()
+        for i in range(3):
+            with open(os.path.join(self.images_dir, f'photo_{i}.jpg'), 'wb') as image_file:
+                image_file.write(b'image bytes')
+        return super().setUp()
+
+    def export(self, file_format: str) -> str:
+        path = os.path.join(tempfile.mkdtemp(), f'posters.{file_format}')
+        with open(path, 'wb') as output:
+            self.assertEqual(export_posters(output, file_format), 3)
+        return path
+
+    def get_posters(self) -> list[tuple]:
+        return list(Poster.objects.order_by('header').values_list(
+            'uuid', 'header', 'description', 'phone_number', 'category__name', 'price'))
+
+    def test_export_import_round_trip(self) -> None:
+        expected = self.get_posters()
+
+        # CSV with the image files in a directory (stored to the media storage).
+        path = self.export('csv')
+        Poster.objects.all().delete()
+        call_command('import_posters', path, '--images', self.images_dir, '--workers', '2', stdout=io.StringIO())
+        self.assertEqual(self.get_posters(), expected)
+        image_path = PosterImages.objects.get(poster_id__header='Poster 1').image_path.name
+        self.assertTrue(image_path.startswith('poster_images/imported/photo_1'))
+
+        # NDJSON with the image paths of the media storage.
+        path = self.export('ndjson')
+        Poster.objects.all().delete()
+        call_command('import_posters', path, '--workers', '0', stdout=io.StringIO())
+        self.assertEqual(self.get_posters(), expected)
+        self.assertEqual(PosterImages.objects.get(poster_id__header='Poster 1').image_path.name, image_path)
+
+        # Already imported posters are skipped.
+        output = io.StringIO()
+        call_command('import_posters', path, '--workers', '0', stdout=output)
+        self.assertIn('skipped 3 already imported', output.getvalue())
+        for image_path in PosterImages.objects.values_list('image_path', flat=True):
+            default_storage.delete(image_path)
+
+    def test_invalid_records_are_rejected(self) -> None:
+        path = os.path.join(tempfile.mkdtemp(), 'posters.ndjson')
+        with open(path, 'w') as input_file:
+            input_file.write(json.dumps({'owner': 'transfer_owner', 'phone_number': '12', 'header': 'Bad phone',
+                                         'description': '-', 'price': '1', 'currency': 'USD'}) + '\n')
+            input_file.write(json.dumps({'owner': 'nobody', 'phone_number': '+79265847523', 'header': 'No owner',
+                                         'description': '-', 'price': '1', 'currency': 'USD'}) + '\n')
+        output = io.StringIO()
+        call_command('import_posters', path, '--workers', '0', stdout=output)
+        self.assertIn('rejected 2 invalid', output.getvalue())
+
+    def test_shared_source_images_are_stored_per_poster(self) -> None:
+        path = os.path.join(tempfile.mkdtemp(), 'posters.ndjson')
+        with open(path, 'w') as input_file:
+            for header in ('First', 'Second'):
+                input_file.write(json.dumps({'owner': 'transfer_owner', 'phone_number': '+79265847523', 'header': header,
+                                             'description': '-', 'price': '1', 'currency': 'USD',
+                                             'images': ['photo_0.jpg']}) + '\n')
+        call_command('import_posters', path, '--images', self.images_dir, '--workers', '0', stdout=io.StringIO())
+
+        first_image = PosterImages.objects.get(poster_id__header='First')
+        second_image = PosterImages.objects.get(poster_id__header='Second')
+        self.assertNotEqual(first_image.image_path.name, second_image.image_path.name)
+        first_image.delete()
+        self.assertTrue(default_storage.exists(second_image.image_path.name))
+        second_image.delete()
+
+    def test_values_failing_copy_are_rejected(self) -> None:
+        valid = {'owner': 'transfer_owner', 'phone_number': '+79265847523', 'header': 'Valid',
+                 'description': '-', 'price': '1', 'currency': 'USD', 'status': 'f', 'created': '2024-01-02 03:04:05+00'}
+        invalid = [{'status': 'maybe'}, {'created': 'yesterday'}, {'header': 'x' * 256},
+                   {'email': 'x' * 250 + '@mail.ru'}, {'price': '1e10'}, {'price': 'NaN'}]
+        path = os.path.join(tempfile.mkdtemp(), 'posters.ndjson')
+        with open(path, 'w') as input_file:
+            for changes in [{}] + invalid:
+                input_file.write(json.dumps({**valid, **changes}) + '\n')
+
+        output = io.StringIO()
+        call_command('import_posters', path, '--workers', '0', stdout=output)
+        self.assertIn(f'rejected {len(invalid)} invalid', output.getvalue())
+        poster = Poster.objects.get(header='Valid')
+        self.assertFalse(poster.status)
+        self.assertEqual(poster.created, datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc))
+
+    def test_stored_images_are_deleted_on_rollback(self) -> None:
+        class FailingImporter(PosterImporter):
+            def copy_batch(self, rows, images):
+                for names in images.values():
+                    list(map(self.images_source.store, names))
+                raise DatabaseError('COPY failed')
+
+        importer = FailingImporter(ImagesSource(self.images_dir), default_owner='transfer_owner')
+        records = [{'phone_number': '+79265847523', 'header': 'Poster', 'description': '-', 'price': '1',
+                    'currency': 'USD', 'images': ['photo_0.jpg']}]
+        with self.assertRaises(DatabaseError):
+            list(importer.import_records(records))
+        self.assertEqual(importer.images_source.stored, [])
+        self.assertEqual(default_storage.listdir('poster_images/imported')[1], [])
+
+    def test_copy_text_unescaper_split_pairs(self) -> None:
+        output = io.BytesIO()
+        unescaper = CopyTextUnescaper(output)
+        for chunk in (b'{"a": "x\\', b'\\n\\\\', b'\\"}\n'):
+            unescaper.write(chunk)
+        self.assertEqual(output.getvalue(), b'{"a": "x\\n\\\\"}\n')
+
+
+class TestPostersDirtyFields(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username='dirty_fields_owner')
+        poster = Poster.objects.create(owner=self.user, phone_number='89265847523', header='Poster',
+                                       description='x' * 5000, price=Decimal(10), currency='USD')
+        self.poster = Poster.objects.get(id=poster.id)
+        return super().setUp()
+
+    def test_unchanged_poster_is_not_written(self) -> None:
+        self.assertEqual(self.poster.phone_number, '+7 926 584-75-23')
+        with self.assertNumQueries(0):
+            self.poster.save()
+        # The same number typed differently is standardized back to the stored value.
+        self.poster.phone_number = '+79265847523'
+        with self.assertNumQueries(0):
+            self.poster.save()
+
+    def test_only_changed_fields_are_written(self) -> None:
+        changes = []
+
+        def record_changes(sender, instance, update_fields, **kwargs) -> None:
+            changes.append((instance.get_dirty_fields(), update_fields))
+
+        post_save.connect(record_changes, sender=Poster)
+        self.addCleanup(post_save.disconnect, record_changes, sender=Poster)
+
+        self.poster.header = 'New header'
+        with CaptureQueriesContext(connection) as context:
+            self.poster.save()
+        update_sql = context.captured_queries[-1]['sql']
+        self.assertIn('"header"', update_sql)
+        self.assertNotIn('"description"', update_sql)
+        self.assertEqual(changes, [({'header': 'Poster'}, frozenset({'header'}))])
+        self.assertEqual(self.poster.get_dirty_fields(), {})
+        self.assertEqual(Poster.objects.get(id=self.poster.id).header, 'New header')
+
+    def test_partial_save_keeps_other_edits_dirty(self) -> None:
+        self.poster.header = 'New header'
+        self.poster.description = 'New description'
+        self.poster.save(update_fields=['header'])
+        self.assertEqual(self.poster.get_dirty_fields(), {'description': 'x' * 5000})
+
+        self.poster.save()
+        poster = Poster.objects.get(id=self.poster.id)
+        self.assertEqual((poster.header, poster.description), ('New header', 'New description'))
+
+    def test_partial_refresh_keeps_other_edits_dirty(self) -> None:
+        self.poster.header = 'New header'
+        self.poster.refresh_from_db(fields=['description'])
+        self.assertTrue(self.poster.is_field_dirty('header'))
+
+        # Loading a deferred field refreshes only that field.
+        poster = Poster.objects.only('id', 'header').get(id=self.poster.id)
+        poster.header = 'Deferred edit'
+        self.assertEqual(poster.description, 'x' * 5000)
+        poster.save()
+        self.assertEqual(Poster.objects.get(id=self.poster.id).header, 'Deferred edit')
+
+    def test_snapshot_skips_deferred_fields_and_pickles(self) -> None:
+        poster = Poster.objects.only('id', 'header').get(id=self.poster.id)
+        self.assertEqual(poster.get_dirty_fields(), {})
+        unpickled = pickle.loads(pickle.dumps(self.poster))
+        self.assertIn('description', unpickled.get_dirty_fields())
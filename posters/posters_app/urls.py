@@ -1,5 +1,6 @@
 from django.urls import path
 from . import views
+from posters.query_budget import QueryBudget
 
 
 urlpatterns = [
@@ -15,3 +16,18 @@ urlpatterns = [
     # path('get_poster_image/', views.get_image_by_image_id, {'image_id': None}, name='get_default_image'),
     path('get_poster_image/<path:image_path>', views.get_image_by_image_path, name='get_image_by_image_path')
 ]
+
+
+# Max ORM queries per request (checked by 'posters.middleware.QueryBudgetMiddleware').
+QUERY_BUDGETS = {
+    'home': QueryBudget(queries=3),
+    'categories': QueryBudget(queries=2),
+    'list_posters_in_category': QueryBudget(queries=3),
+    'create_poster': QueryBudget(queries=15),
+    'edit_poster': QueryBudget(queries=15),
+    'delete_poster_by_id': QueryBudget(queries=10),
+    'user_posters': QueryBudget(queries=4),
+    'poster_view': QueryBudget(queries=2),
+    'get_image_by_image_id': QueryBudget(queries=2),
+    'get_image_by_image_path': QueryBudget(queries=2),
+}
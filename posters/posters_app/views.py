@@ -1,4 +1,4 @@
-from typing_extensions import Any, Generator
+from typing_extensions import Any, Callable
 from django.db.models.query import QuerySet
 from django.shortcuts import get_object_or_404, redirect, render, HttpResponse
 from django.views.generic import TemplateView, ListView
@@ -7,13 +7,23 @@ from django.urls import reverse
 from django.core.cache import cache
 from django.views.decorators.cache import never_cache, cache_control
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
+from django.db import transaction
 from django.core.paginator import Paginator, Page
 from django.core.cache import cache
 from django.utils.translation import gettext as _
+from django.utils.functional import cached_property
+
+from posters.routers import pin_primary
+from posters.metrics import record_image_bytes
 
 from .models import Poster, PosterImages
+from .tasks import publish_poster_snapshot, remove_poster_snapshot
 from .forms import CreatePosterForm, PosterImageFormSet, EditPosterForm, SearchForm, EditPosterImageFormSet
 from .business_logic.view_logic import FrequentQueries, SearchQueryEngine
+from .business_logic.pagination_logic import make_paginator
+from .business_logic.page_cache_logic import AnonymousPageCacheMixin, invalidate_page_cache
+from .business_logic.poster_cards_logic import render_poster_cards
 from .business_logic.process_images_logic import (
     get_image_by_image_id_response,
     get_image_by_image_path_response,
@@ -26,22 +36,27 @@ from .constants import (
 )
 
 
-class HomePageView(TemplateView):
+class HomePageView(AnonymousPageCacheMixin, TemplateView):
     template_name = 'posters_app/index.html'
+    page_cache_name = 'home'
 
-    def __init__(self, **kwargs: Any) -> None:
-        self.recommended_posters = FrequentQueries.get_recommended_posters()
-        super().__init__(**kwargs)
+    @cached_property
+    def recommended_posters(self) -> QuerySet:
+        # Not fetched on the anonymous page cache hits.
+        return FrequentQueries.get_recommended_posters()
 
-    def get_page(self, queryset: QuerySet, chunk_size: int, page_number: int) -> Page:
+    def get_page(self, queryset: QuerySet, chunk_size: int, page_number: int,
+                 count_estimate: Callable[[], int] | None = None) -> Page:
         """
         Makes a page for displaying QuerySet elements by chunks 
         in pages using Django built-in pagination tool.
+        The paginator class depends on the 'POSTERS_PAGINATION_MODE' setting.
         :Param queryset: Set of posters.
         :Param chunk_size: Number of element (posters) on the page.
         :Param page number: Page number. E.g. '?page=1'.
+        :Param count_estimate: A callable returning the estimated number of posters [default=None].
         """
-        paginator = Paginator(queryset, chunk_size)
+        paginator = make_paginator(queryset, chunk_size, count_estimate=count_estimate)
         page_obj = paginator.get_page(page_number)
 
         return page_obj
@@ -59,27 +74,28 @@ class HomePageView(TemplateView):
                 self.recommended_posters, search)
             return self.get_page(search_result, chunk_size, page_number)
 
-        return self.get_page(self.recommended_posters, chunk_size, page_number)
-
-    def chucked(self, queryset: QuerySet, chuck_size: int) -> Generator[QuerySet]:
-        for i in range(0, len(queryset), chuck_size):
-            yield queryset[i:i + chuck_size]
+        return self.get_page(
+            self.recommended_posters, chunk_size, page_number,
+            count_estimate=FrequentQueries.get_estimated_posters_count
+        )
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context['recommended_posters_row'] = self.chucked(
-            self.recommended_posters, 3)
         context['page_obj'] = self.smart_pagination(
             self.request.GET.get('page'), 9,
             self.request.GET.get('query')
         )
+        # One precomputed (fragment cached) card list, the template only lays it out.
+        context['poster_cards'] = render_poster_cards(context['page_obj'].object_list)
+        context['query'] = self.request.GET.get('query')
         context['form'] = SearchForm()
 
         return context
 
 
-class PosterCategoriesView(TemplateView):
+class PosterCategoriesView(AnonymousPageCacheMixin, TemplateView):
     template_name = 'posters_app/categories.html'
+    page_cache_name = 'categories'
 
     def get_queryset(self):
         # Cache
@@ -92,10 +108,11 @@ class PosterCategoriesView(TemplateView):
         return context
 
 
-class CategoryView(ListView):
+class CategoryView(AnonymousPageCacheMixin, ListView):
     """View all posters in category <str:category_name> with optional search."""
 
     template_name = 'posters_app/category.html'
+    page_cache_name = 'list_posters_in_category'
     context_object_name = 'posters'
     model = Poster
     paginate_by = 10
@@ -111,12 +128,26 @@ class CategoryView(ListView):
         search_query = self.request.GET.get('query')
         return SearchQueryEngine.apply_search_filter(queryset, search_query)
 
+    def get_paginator(self, queryset: QuerySet, per_page: int, orphans: int = 0,
+                      allow_empty_first_page: bool = True, **kwargs: Any) -> Paginator:
+        """
+        Make a paginator according to the 'POSTERS_PAGINATION_MODE' setting.
+        Totals are estimated from the cached per category counts, search results are paginated without totals.
+        """
+        category_name = self.kwargs.get('category_name')
+        count_estimate = None
+        if not self.request.GET.get('query'):
+            count_estimate = lambda: FrequentQueries.get_posters_in_category_count(category_name)
+
+        return make_paginator(queryset, per_page, count_estimate=count_estimate)
+
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         """Add extra context data for the category and search form."""
 
         context = super().get_context_data(**kwargs)
         context['form'] = SearchForm()
         context['category_name'] = self.kwargs.get('category_name')
+        context['query'] = self.request.GET.get('query')
         return context
 
 
@@ -153,6 +184,10 @@ def create_poster(request):
             # Cache validation
             cache.delete(RECOMMENDED_POSTERS_CACHE_KEY)
             cache.delete(CATEGORIES_CACHE_KEY)
+            # Read your writes: the author reads from the primary DB while replicas catch up.
+            pin_primary(request)
+            if settings.POSTER_SNAPSHOTS_ENABLED:
+                transaction.on_commit(lambda: publish_poster_snapshot.delay(poster.id))
 
             return redirect(success_url)
         else:
@@ -168,20 +203,20 @@ def create_poster(request):
 @never_cache
 @login_required
 def delete_poster_by_id(request, poster_id: int):
-    poster = get_object_or_404(Poster, id=poster_id)
+    # Soft delete: a single-row UPDATE. Rows and image files are purged by the 'purge_deleted_posters' task.
+    deleted = Poster.alive.filter(id=poster_id, owner=request.user.id).soft_delete()
 
-    if poster.owner != request.user:
+    if not deleted:
+        get_object_or_404(Poster.alive, id=poster_id)
         return HttpResponse(f"Not your poster")
 
-    poster_images = PosterImages.objects.filter(poster_id=poster_id)
-
-    for poster_image in poster_images:
-        poster_image.delete()
-
-    poster.delete()
-    # Cache validation
+    # Cache validation ('QuerySet.update' sends no signals).
     cache.delete(RECOMMENDED_POSTERS_CACHE_KEY)
     cache.delete(CATEGORIES_CACHE_KEY)
+    invalidate_page_cache()
+    pin_primary(request)
+    if settings.POSTER_SNAPSHOTS_ENABLED:
+        transaction.on_commit(lambda: remove_poster_snapshot.delay(poster_id))
 
     return redirect('posters_app:home')
 
@@ -190,10 +225,10 @@ def delete_poster_by_id(request, poster_id: int):
 @login_required
 def edit_poster(request, poster_id: int):
     success_url = reverse('posters_app:poster_view', args=(poster_id,))
-    poster = get_object_or_404(Poster, id=poster_id)
+    poster = get_object_or_404(Poster.alive, id=poster_id)
     poster_images = PosterImages.objects.filter(poster_id=poster)
 
-    if poster.owner != request.user:
+    if poster.owner_id != request.user.id:
         return HttpResponse("Cannot edit someone else's poster!")
 
     if request.method == 'POST':
@@ -206,6 +241,8 @@ def edit_poster(request, poster_id: int):
                 _['You can upload a maximum of 10 images.'])
 
         if form.is_valid() and formset.is_valid():
+            # The valid form has set the fields of the poster, unchanged ones are not written.
+            changed = bool(poster.get_dirty_fields()) or formset.has_changed()
             form.save()
 
             process_formset_with_images_for_model(
@@ -214,6 +251,9 @@ def edit_poster(request, poster_id: int):
                 related_field='poster_images',
                 image_model=PosterImages
             )
+            pin_primary(request)
+            if settings.POSTER_SNAPSHOTS_ENABLED and changed:
+                transaction.on_commit(lambda: publish_poster_snapshot.delay(poster.id))
 
             return redirect(success_url)
         else:
@@ -228,8 +268,12 @@ def edit_poster(request, poster_id: int):
 
 @cache_control(max_age=15)
 def get_image_by_image_id(request, image_id: int | None):
-    return get_image_by_image_id_response(image_id)
+    response = get_image_by_image_id_response(image_id)
+    record_image_bytes('get_image_by_image_id', response)
+    return response
 
 
 def get_image_by_image_path(request, image_path):
-    return get_image_by_image_path_response(image_path)
+    response = get_image_by_image_path_response(image_path)
+    record_image_bytes('get_image_by_image_path', response)
+    return response
@@ -1,9 +1,7 @@
 import uuid
-import redis
 from django.conf import settings
 from typing_extensions import Any
 from abc import ABC, abstractmethod
-from email_service.tasks import send_verification_code_task
 import os
 
 
@@ -75,6 +73,9 @@ class RedisVerificationEntryHandler(VerificationEntryHandler):
         Connect to redis via a redis link.
         :Param redis_url: A URL to redis. Correct format example is "redis://localhost:6379/3".
         """
+        # Imported on the first use, modules importing 'auth_logic' (forms, views) don't pay for it.
+        import redis
+
         super().__init__()
         if not redis_url:
             redis_url = settings.REDIS_LOCATION
@@ -82,6 +83,8 @@ class RedisVerificationEntryHandler(VerificationEntryHandler):
         self.redisClient = redis.Redis.from_url(redis_url)
 
     def cache_entry(self, credentials: str, code: int | str, ttl: int = 240) -> None:
+        import redis
+
         try:
             self.redisClient.set(credentials, code, ex=ttl)
         except redis.RedisError as e:
@@ -136,6 +139,9 @@ class EmailVerification(VerificationCodeSender):
         self.entry_handler = entry_handler
 
     def send_code(self, email: str) -> None:
+        # Imported on the first use, the email task module (and the mail backend) isn't needed at import time.
+        from email_service.tasks import send_verification_code_task
+
         verification_code = self.code_generator.generate_code()
         self.entry_handler.cache_entry(
             credentials=email, code=verification_code)
@@ -1,5 +1,4 @@
 from __future__ import absolute_import, unicode_literals
-import redis.client
 # Import shared_task decorator.
 from celery import shared_task
 
@@ -1,3 +1,39 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import translation
+
+from posters_app.models import Poster, PosterCategories, PosterImages
+from posters.query_budget import QueryBudgetTestMixin
 
 # Create your tests here.
+
+
+class TestUserAccountQueryBudgets(QueryBudgetTestMixin, TestCase):
+    def setUp(self) -> None:
+        category = PosterCategories.objects.create(name='Hardware')
+        self.user = User.objects.create(username='account_owner', email='owner@example.com')
+        for i in range(10):
+            poster = Poster.objects.create(
+                owner=self.user,
+                phone_number='+79265847523',
+                header=f'Poster {i}',
+                description='My poster',
+                category=category,
+                price=Decimal(i),
+                currency='USD',
+            )
+            PosterImages.objects.create(poster_id=poster, image_path=f'poster_images/{poster.id}.jpg')
+        self.client.force_login(self.user)
+        translation.activate('en')
+        return super().setUp()
+
+    def test_view_user_account(self) -> None:
+        """The number of queries must not grow with the number of the user's posters (N+1)."""
+        response = self.assertWithinQueryBudget(reverse('user_account_app:view_user_account'))
+        self.assertContains(response, 'Poster 9')
+
+    def test_user_profile_edit(self) -> None:
+        self.assertWithinQueryBudget(reverse('user_account_app:user_profile_edit'))
@@ -1,5 +1,6 @@
 from django.urls import path
 from . import views
+from posters.query_budget import QueryBudget
 
 
 urlpatterns = [
@@ -13,4 +14,16 @@ urlpatterns = [
     path("user_logout", views.user_logout, name='user_logout'),
 ]
 
+# Max ORM queries per request (checked by 'posters.middleware.QueryBudgetMiddleware').
+QUERY_BUDGETS = {
+    'user_sign_up': QueryBudget(queries=8),
+    'user_email_login': QueryBudget(queries=4),
+    'user_email_login_code_verification': QueryBudget(queries=10),
+    'user_profile_edit': QueryBudget(queries=5),
+    'view_user_account': QueryBudget(queries=5),
+    'deactivate_user_account': QueryBudget(queries=5),
+    'delete_user_account': QueryBudget(queries=20),
+    'user_logout': QueryBudget(queries=5),
+}
+
 #NOTE: Now default URLs for password change, password_reset, etc..
\ No newline at end of file
@@ -30,7 +30,8 @@ def view_user_account(request):
         (field.name, getattr(request.user, field.name)) for field in request.user._meta.fields]
     context = {
         "user_fields": user_fields,
-        "users_posters": FrequentQueries.get_users_posters(user_id=request.user.id)
+        "users_posters": FrequentQueries.get_users_posters(user_id=request.user.id),
+        "users_archived_posters": FrequentQueries.get_users_archived_posters(user_id=request.user.id),
     }
     return render(request, template_name, context)
 